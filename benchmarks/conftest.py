@@ -0,0 +1,68 @@
+"""
+Fixtures of the benchmark suite (run with ``pytest benchmarks``).
+"""
+
+from __future__ import annotations
+
+from typing import Iterator
+
+import pytest
+
+from benchmarks.fake_ckan import FakeCKAN
+from montreal_aqi_api import api
+from montreal_aqi_api._internal.retry import RetryPolicy
+
+# Latency of the fake portal for network-bound scenarios (seconds)
+NETWORK_LATENCY = 0.01
+
+
+def _reset_client() -> None:
+    api._api_cache.clear()
+    api._circuit_breaker.reset()
+
+
+def _use(fake: FakeCKAN, monkeypatch: pytest.MonkeyPatch) -> FakeCKAN:
+    monkeypatch.setattr(api, "API_URL", fake.url)
+    # Retry quickly so failure scenarios measure the client, not the sleeps
+    monkeypatch.setattr(
+        api, "_retry_policy", RetryPolicy(base_delay=0.001, max_delay=0.01)
+    )
+    api.disable_disk_cache()
+    _reset_client()
+    return fake
+
+
+@pytest.fixture(scope="session")
+def fake_portal() -> Iterator[FakeCKAN]:
+    """Portal with 100 stations and 3 hours of data, answering in 10 ms."""
+    with FakeCKAN(stations=100, hours=3, latency=NETWORK_LATENCY) as fake:
+        yield fake
+
+
+@pytest.fixture(scope="session")
+def flaky_portal() -> Iterator[FakeCKAN]:
+    """Same portal, failing 20% of the requests with a 503."""
+    with FakeCKAN(
+        stations=100, hours=3, latency=NETWORK_LATENCY, failure_rate=0.2
+    ) as fake:
+        yield fake
+
+
+@pytest.fixture
+def portal(fake_portal: FakeCKAN, monkeypatch: pytest.MonkeyPatch) -> FakeCKAN:
+    """Point the API client at the fake portal, with a cold cache."""
+    yield _use(fake_portal, monkeypatch)
+    _reset_client()
+
+
+@pytest.fixture
+def flaky(flaky_portal: FakeCKAN, monkeypatch: pytest.MonkeyPatch) -> FakeCKAN:
+    """Point the API client at the flaky portal, with a cold cache."""
+    yield _use(flaky_portal, monkeypatch)
+    _reset_client()
+
+
+@pytest.fixture
+def cold_cache() -> object:
+    """Setup function clearing the response cache before each round."""
+    return _reset_client
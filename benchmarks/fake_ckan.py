@@ -0,0 +1,236 @@
+"""
+Local stand-in for the CKAN ``datastore_search`` endpoint of the Montreal
+open data portal, for benchmarks.
+
+It serves synthetic RSQA data (station list and hourly pollutant records)
+with configurable size, latency and failure rate. Filters (including list
+values), ``fields``, ``offset``, ``limit`` and ``result.total`` behave like
+CKAN's. Run it standalone to point other tools at it::
+
+    python -m benchmarks.fake_ckan --stations 100 --hours 24 --latency 0.05
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import TracebackType
+from typing import Any, Dict, List
+from urllib.parse import parse_qs, urlsplit
+
+from montreal_aqi_api.config import RESID_IQA_PAR_STATION_EN_TEMPS_REEL, RESID_LIST
+
+POLLUTANTS = ["O3", "NO2", "PM", "CO", "SO2"]
+
+
+def make_station_records(stations: int) -> List[Dict[str, Any]]:
+    """Return the records of the station list resource."""
+    return [
+        {
+            "numero_station": str(station),
+            "nom": f"Station {station}",
+            "adresse": f"{station} rue Sainte-Catherine",
+            "arrondissement_ville": "Ville-Marie",
+            "statut": "ouvert" if station % 10 else "fermé",
+        }
+        for station in range(1, stations + 1)
+    ]
+
+
+def make_aqi_records(
+    stations: int,
+    hours: int,
+    *,
+    pollutants: int = len(POLLUTANTS),
+    end: datetime | None = None,
+    seed: int = 0,
+) -> List[Dict[str, Any]]:
+    """
+    Return ``stations`` x ``hours`` x ``pollutants`` real-time AQI records.
+
+    Hours go back from ``end`` (default: the current hour); values are
+    strings, as published by the portal.
+    """
+    rng = random.Random(seed)
+    end = end or datetime.now().replace(minute=0, second=0, microsecond=0)
+    records: List[Dict[str, Any]] = []
+    for offset in range(hours - 1, -1, -1):
+        moment = end - timedelta(hours=offset)
+        for station in range(1, stations + 1):
+            for pollutant in POLLUTANTS[:pollutants]:
+                records.append(
+                    {
+                        "stationId": str(station),
+                        "date": moment.date().isoformat(),
+                        "heure": str(moment.hour),
+                        "pollutant": pollutant,
+                        "valeur": str(rng.randint(0, 80)),
+                    }
+                )
+    return records
+
+
+class FakeCKAN:
+    """
+    Threaded fake ``datastore_search`` server on a free local port.
+
+    Args:
+        stations: Number of stations (every tenth one is closed).
+        hours: Hours of history per station.
+        pollutants: Pollutants per station and hour (1 to 5).
+        latency: Seconds added to every response.
+        failure_rate: Fraction of requests answered with a 503.
+        seed: Seed of the synthetic values and of the failures.
+    """
+
+    def __init__(
+        self,
+        *,
+        stations: int = 15,
+        hours: int = 3,
+        pollutants: int = len(POLLUTANTS),
+        latency: float = 0.0,
+        failure_rate: float = 0.0,
+        seed: int = 0,
+    ) -> None:
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.resources = {
+            RESID_LIST: make_station_records(stations),
+            RESID_IQA_PAR_STATION_EN_TEMPS_REEL: make_aqi_records(
+                stations, hours, pollutants=pollutants, seed=seed
+            ),
+        }
+        self.requests = 0
+        self.failures = 0
+
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self._server.daemon_threads = True
+        self._server.fake = self  # type: ignore[attr-defined]
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/api/3/action/datastore_search"
+
+    def __enter__(self) -> FakeCKAN:
+        self.start()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.stop()
+
+    def start(self) -> None:
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, args=(0.05,), daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _should_fail(self) -> bool:
+        with self._lock:
+            self.requests += 1
+            if self.failure_rate and self._rng.random() < self.failure_rate:
+                self.failures += 1
+                return True
+        return False
+
+    def search(self, query: Dict[str, List[str]]) -> Dict[str, Any] | None:
+        """Return the datastore_search result of a query, or None if unknown."""
+        records = self.resources.get(query.get("resource_id", [""])[0])
+        if records is None:
+            return None
+
+        filters = json.loads(query.get("filters", ["{}"])[0])
+        for key, value in filters.items():
+            allowed = {str(v) for v in value} if isinstance(value, list) else {value}
+            records = [r for r in records if str(r.get(key)) in allowed]
+
+        total = len(records)
+        offset = int(query.get("offset", ["0"])[0])
+        limit = int(query.get("limit", ["100"])[0])
+        page = records[offset : offset + limit]
+
+        fields = query.get("fields")
+        if fields:
+            page = [{f: r[f] for f in fields if f in r} for r in page]
+
+        return {"records": page, "total": total}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately: do not let Nagle delay the body
+    disable_nagle_algorithm = True
+
+    def do_GET(self) -> None:
+        fake: FakeCKAN = self.server.fake  # type: ignore[attr-defined]
+        if fake.latency:
+            time.sleep(fake.latency)
+
+        if fake._should_fail():
+            self._send(HTTPStatus.SERVICE_UNAVAILABLE, {"success": False})
+            return
+
+        result = fake.search(parse_qs(urlsplit(self.path).query))
+        if result is None:
+            self._send(HTTPStatus.NOT_FOUND, {"success": False})
+            return
+        self._send(HTTPStatus.OK, {"success": True, "result": result})
+
+    def _send(self, status: HTTPStatus, payload: Dict[str, Any]) -> None:
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Fake CKAN datastore_search")
+    parser.add_argument("--stations", type=int, default=15)
+    parser.add_argument("--hours", type=int, default=3)
+    parser.add_argument("--pollutants", type=int, default=len(POLLUTANTS))
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    with FakeCKAN(
+        stations=args.stations,
+        hours=args.hours,
+        pollutants=args.pollutants,
+        latency=args.latency,
+        failure_rate=args.failure_rate,
+    ) as fake:
+        print(f"Serving {fake.url} (Ctrl+C to stop)")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Import-time benchmark of the CLI cold start.
+
+Runs ``python -X importtime`` in fresh interpreters and reports the median
+cumulative import time of a module and its heaviest dependencies::
+
+    python benchmarks/importtime.py
+    python benchmarks/importtime.py --module montreal_aqi_api.api --runs 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import subprocess
+import sys
+
+
+def _importtime(module: str) -> dict[str, int]:
+    """Return the cumulative import time (µs) of each module imported."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    timings: dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        timings[name.strip()] = int(cumulative)
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--module", default="montreal_aqi_api.cli")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    runs = [_importtime(args.module) for _ in range(args.runs)]
+
+    total = statistics.median(run[args.module] for run in runs)
+    print(f"{args.module}: {total / 1000:.1f} ms (median of {args.runs} runs)")
+
+    heaviest = sorted(runs[-1].items(), key=lambda item: item[1], reverse=True)[
+        : args.top
+    ]
+    for name, cumulative in heaviest:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
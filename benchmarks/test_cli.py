@@ -0,0 +1,46 @@
+"""
+CLI cold-start benchmarks, each round in a fresh interpreter.
+"""
+
+from __future__ import annotations
+
+import subprocess
+import sys
+
+import pytest
+
+pytestmark = pytest.mark.benchmark(group="cli")
+
+_STATION_SCRIPT = """
+import sys
+from montreal_aqi_api import api
+api.API_URL = sys.argv[1]
+from montreal_aqi_api.cli import main
+sys.argv = ["montreal-aqi", "--station", "1", "--no-cache"]
+main()
+"""
+
+
+def _run(*args: str) -> str:
+    result = subprocess.run(
+        [sys.executable, *args], capture_output=True, text=True, check=True
+    )
+    return result.stdout
+
+
+def test_cli_version(benchmark):
+    """`montreal-aqi --version`: interpreter start, imports and argparse."""
+    output = benchmark.pedantic(
+        _run,
+        args=("-c", "from montreal_aqi_api.cli import main; main()", "--version"),
+        rounds=10,
+    )
+    assert output.strip()
+
+
+def test_cli_station(benchmark, fake_portal):
+    """`montreal-aqi --station 1`: cold start plus one request."""
+    output = benchmark.pedantic(
+        _run, args=("-c", _STATION_SCRIPT, fake_portal.url), rounds=10
+    )
+    assert '"type": "station"' in output
@@ -0,0 +1,79 @@
+"""
+Client benchmarks against the fake portal: cache lookups, fan-out, failures.
+"""
+
+from __future__ import annotations
+
+import pytest
+
+from montreal_aqi_api import api
+from montreal_aqi_api.config import RESID_IQA_PAR_STATION_EN_TEMPS_REEL
+from montreal_aqi_api.service import (
+    get_all_stations_aqi,
+    get_station_aqi,
+    get_stations_aqi,
+)
+
+pytestmark = pytest.mark.benchmark(group="fetch")
+
+
+def test_fetch_warm_cache(benchmark, portal):
+    """Cache hit of _fetch, without any request."""
+    filters = {"stationId": "1"}
+    api._fetch(RESID_IQA_PAR_STATION_EN_TEMPS_REEL, filters=filters)
+    requests_before = portal.requests
+
+    records = benchmark(
+        api._fetch, RESID_IQA_PAR_STATION_EN_TEMPS_REEL, filters=filters
+    )
+
+    assert records
+    assert portal.requests == requests_before
+
+
+def test_get_station_aqi_cold(benchmark, portal, cold_cache):
+    """One station, cache cleared before each round (one request)."""
+    station = benchmark.pedantic(
+        get_station_aqi, args=("1",), setup=cold_cache, rounds=20
+    )
+    assert station is not None
+
+
+def test_get_station_aqi_warm(benchmark, portal):
+    """One station, served from the response cache."""
+    get_station_aqi("1")
+    assert benchmark(get_station_aqi, "1") is not None
+
+
+@pytest.mark.parametrize("stations", [1, 15, 100])
+def test_get_stations_aqi_fan_out(benchmark, portal, cold_cache, stations):
+    """Parallel per-station queries (5 workers) with a cold cache."""
+    station_ids = [str(station) for station in range(1, stations + 1)]
+    benchmark.extra_info["stations"] = stations
+
+    results = benchmark.pedantic(
+        get_stations_aqi, args=(station_ids,), setup=cold_cache, rounds=5
+    )
+
+    assert all(station is not None for station in results)
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_get_all_stations_aqi_cold(benchmark, portal, cold_cache, stream):
+    """Bulk pull of the 100 stations with a cold cache."""
+    stations = benchmark.pedantic(
+        get_all_stations_aqi, kwargs={"stream": stream}, setup=cold_cache, rounds=5
+    )
+    assert len(stations) == 100
+
+
+def test_get_stations_aqi_with_failures(benchmark, flaky, cold_cache):
+    """15 stations while 20% of the requests fail (retried)."""
+    station_ids = [str(station) for station in range(1, 16)]
+
+    results = benchmark.pedantic(
+        get_stations_aqi, args=(station_ids,), setup=cold_cache, rounds=5
+    )
+
+    benchmark.extra_info["failed_requests"] = flaky.failures
+    assert sum(station is not None for station in results) >= 10
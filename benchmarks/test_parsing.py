@@ -0,0 +1,71 @@
+"""
+Parsing benchmarks: scalar vs vectorized pollutants, historical batches.
+"""
+
+from __future__ import annotations
+
+import pytest
+
+from benchmarks.fake_ckan import make_aqi_records
+from montreal_aqi_api._internal import vectorized
+from montreal_aqi_api._internal.parsing import parse_pollutants
+from montreal_aqi_api.batch import StationBatch
+from montreal_aqi_api.history import HistoryStore
+
+
+def _by_station(records):
+    grouped = {}
+    for record in records:
+        grouped.setdefault(record["stationId"], []).append(record)
+    return grouped
+
+
+@pytest.mark.parametrize("stations", [1, 15, 100])
+def test_parse_pollutants(benchmark, stations):
+    """Scalar parser, one call per station."""
+    records_by_station = _by_station(make_aqi_records(stations, 1))
+    benchmark.extra_info["stations"] = stations
+
+    def parse():
+        return [parse_pollutants(records) for records in records_by_station.values()]
+
+    assert len(benchmark(parse)) == stations
+
+
+@pytest.mark.skipif(not vectorized.HAS_NUMPY, reason="numpy is not installed")
+@pytest.mark.parametrize("stations", [1, 15, 100])
+def test_parse_pollutants_batch(benchmark, stations):
+    """Vectorized parser, one call for every station."""
+    records_by_station = _by_station(make_aqi_records(stations, 1))
+    benchmark.extra_info["stations"] = stations
+
+    def parse():
+        table = vectorized.parse_pollutants_batch(records_by_station)
+        return [table.pollutants(station_id) for station_id in records_by_station]
+
+    assert len(benchmark(parse)) == stations
+
+
+@pytest.mark.parametrize("hours", [24, 24 * 7, 24 * 30])
+def test_station_batch_from_records(benchmark, hours):
+    """Historical batch of 15 stations in a StationBatch."""
+    records = make_aqi_records(15, hours)
+    benchmark.extra_info.update(hours=hours, records=len(records))
+
+    batch = benchmark(StationBatch.from_records, records)
+
+    assert len(batch) == 15 * hours
+
+
+@pytest.mark.parametrize("hours", [24, 24 * 7])
+def test_history_ingest(benchmark, tmp_path, hours):
+    """Ingest 15 stations of history into a fresh SQLite store."""
+    records = make_aqi_records(15, hours)
+    benchmark.extra_info.update(hours=hours, records=len(records))
+    paths = iter(range(10**6))
+
+    def ingest():
+        with HistoryStore(tmp_path / f"history-{next(paths)}.sqlite3") as store:
+            return store.ingest(records)
+
+    assert benchmark(ingest) == len(records)
@@ -1,10 +1,48 @@
-from montreal_aqi_api.pollutants import Pollutant
-from montreal_aqi_api.service import get_station_aqi, list_open_stations
-from montreal_aqi_api.station import Station
+"""
+Montreal AQI client.
+
+Public names are imported on first access (PEP 562), so ``import
+montreal_aqi_api`` and the CLI start without loading ``requests``.
+"""
+
+from __future__ import annotations
+
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+from montreal_aqi_api._version import __version__
+
+if TYPE_CHECKING:
+    from montreal_aqi_api.pollutants import Pollutant
+    from montreal_aqi_api.service import get_station_aqi, list_open_stations
+    from montreal_aqi_api.station import Station
+
+# Public name -> module defining it
+_LAZY_ATTRIBUTES = {
+    "get_station_aqi": "montreal_aqi_api.service",
+    "list_open_stations": "montreal_aqi_api.service",
+    "Station": "montreal_aqi_api.station",
+    "Pollutant": "montreal_aqi_api.pollutants",
+}
 
 __all__ = [
     "get_station_aqi",
     "list_open_stations",
     "Station",
     "Pollutant",
+    "__version__",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module_name), name)
+    # Cache it so later lookups skip __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
@@ -0,0 +1,245 @@
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Generic, Protocol, TypeVar
+
+logger = logging.getLogger(__name__)
+
+V = TypeVar("V")
+
+
+class EvictionPolicy(Protocol):
+    """Decides which entry leaves a full cache."""
+
+    def on_hit(self, entries: OrderedDict[str, Any], key: str) -> None:
+        """Update the entry order after a cache hit."""
+
+    def select_victim(self, entries: OrderedDict[str, Any]) -> str:
+        """Return the key of the entry to evict."""
+
+
+class LRUPolicy:
+    """Evict the least recently used entry."""
+
+    def on_hit(self, entries: OrderedDict[str, Any], key: str) -> None:
+        entries.move_to_end(key)
+
+    def select_victim(self, entries: OrderedDict[str, Any]) -> str:
+        return next(iter(entries))
+
+
+class FIFOPolicy:
+    """Evict the oldest inserted entry, regardless of hits."""
+
+    def on_hit(self, entries: OrderedDict[str, Any], key: str) -> None:
+        pass
+
+    def select_victim(self, entries: OrderedDict[str, Any]) -> str:
+        return next(iter(entries))
+
+
+def approximate_size(value: Any) -> int:
+    """Approximate the memory footprint of a JSON-like value, in bytes."""
+    try:
+        return len(json.dumps(value, ensure_ascii=False, default=str))
+    except (TypeError, ValueError):
+        return 0
+
+
+class _Entry(Generic[V]):
+    __slots__ = ("stored_at", "expires_at", "value", "size")
+
+    def __init__(
+        self, stored_at: float, expires_at: float | None, value: V, size: int
+    ) -> None:
+        self.stored_at = stored_at
+        self.expires_at = expires_at
+        self.value = value
+        self.size = size
+
+
+class ResponseCache(Generic[V]):
+    """
+    Thread-safe TTL cache with pluggable eviction.
+
+    Entries expire ``ttl`` seconds after they are stored, unless stored with an
+    explicit expiry time. Expired entries stay available to ``get_stale`` for
+    ``stale_ttl`` more seconds (e.g. to revalidate them), then are dropped when
+    read and by periodic sweeps on writes. When the cache holds more than
+    ``max_entries`` entries or ``max_bytes`` bytes (as measured by ``sizeof``),
+    the eviction policy picks the entries to drop.
+    """
+
+    def __init__(
+        self,
+        *,
+        ttl: float,
+        max_entries: int,
+        max_bytes: int | None = None,
+        policy: EvictionPolicy | None = None,
+        sizeof: Callable[[Any], int] = approximate_size,
+        sweep_interval: float = 60.0,
+        stale_ttl: float = 0.0,
+    ) -> None:
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.policy: EvictionPolicy = policy if policy is not None else LRUPolicy()
+        self._sizeof = sizeof
+        self._sweep_interval = sweep_interval
+
+        self._entries: OrderedDict[str, _Entry[V]] = OrderedDict()
+        self._lock = threading.RLock()
+        self._bytes = 0
+        self._last_sweep = time.time()
+
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def __contains__(self, key: object) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    @property
+    def size_bytes(self) -> int:
+        """Approximate size of the cached values, in bytes."""
+        return self._bytes
+
+    def get(self, key: str, now: float | None = None) -> V | None:
+        """Return the value cached under ``key``, or None if missing or expired."""
+        now = time.time() if now is None else now
+        with self._lock:
+            entry = self._lookup(key, now)
+            if entry is None or now >= self._expiry(entry):
+                return None
+            self.policy.on_hit(self._entries, key)
+            return entry.value
+
+    def get_stale(self, key: str, now: float | None = None) -> V | None:
+        """Return the value cached under ``key`` even if expired, or None."""
+        now = time.time() if now is None else now
+        with self._lock:
+            entry = self._lookup(key, now)
+            return None if entry is None else entry.value
+
+    def set(
+        self,
+        key: str,
+        value: V,
+        now: float | None = None,
+        expires_at: float | None = None,
+    ) -> None:
+        """
+        Cache ``value`` under ``key``, evicting entries if over budget.
+
+        The entry expires ``ttl`` seconds after ``now``, or at ``expires_at``
+        when given.
+        """
+        now = time.time() if now is None else now
+        size = self._sizeof(value) if self.max_bytes is not None else 0
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = _Entry(now, expires_at, value, size)
+            self._bytes += size
+
+            if now - self._last_sweep >= self._sweep_interval:
+                self._sweep(now)
+            self._enforce_limits(keep=key)
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def sweep(self, now: float | None = None) -> int:
+        """Drop every entry past its stale window and return how many."""
+        now = time.time() if now is None else now
+        with self._lock:
+            return self._sweep(now)
+
+    def configure(
+        self,
+        *,
+        ttl: float | None = None,
+        max_entries: int | None = None,
+        max_bytes: int | None = None,
+        policy: EvictionPolicy | None = None,
+        stale_ttl: float | None = None,
+    ) -> None:
+        """Change the cache limits in place, evicting entries if needed."""
+        with self._lock:
+            if ttl is not None:
+                self.ttl = ttl
+            if stale_ttl is not None:
+                self.stale_ttl = stale_ttl
+            if max_entries is not None:
+                self.max_entries = max_entries
+            if max_bytes is not None:
+                self.max_bytes = max_bytes
+                # Entries stored without a byte budget were not measured
+                for entry in self._entries.values():
+                    if not entry.size:
+                        entry.size = self._sizeof(entry.value)
+                self._bytes = sum(e.size for e in self._entries.values())
+            if policy is not None:
+                self.policy = policy
+            self._enforce_limits()
+
+    def _expiry(self, entry: _Entry[V]) -> float:
+        if entry.expires_at is not None:
+            return entry.expires_at
+        return entry.stored_at + self.ttl
+
+    def _is_dead(self, entry: _Entry[V], now: float) -> bool:
+        return now >= self._expiry(entry) + self.stale_ttl
+
+    def _lookup(self, key: str, now: float) -> _Entry[V] | None:
+        entry = self._entries.get(key)
+        if entry is not None and self._is_dead(entry, now):
+            logger.debug("Cache entry expired: %s", key)
+            self._remove(key)
+            self.expirations += 1
+            return None
+        return entry
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+    def _sweep(self, now: float) -> int:
+        expired = [
+            key for key, entry in self._entries.items() if self._is_dead(entry, now)
+        ]
+        for key in expired:
+            self._remove(key)
+        self.expirations += len(expired)
+        self._last_sweep = now
+        if expired:
+            logger.debug("Cache sweep dropped %d expired entries", len(expired))
+        return len(expired)
+
+    def _over_budget(self) -> bool:
+        if len(self._entries) > self.max_entries:
+            return True
+        return self.max_bytes is not None and self._bytes > self.max_bytes
+
+    def _enforce_limits(self, keep: str | None = None) -> None:
+        while self._entries and self._over_budget():
+            victim = self.policy.select_victim(self._entries)
+            if victim == keep and len(self._entries) == 1:
+                # A single value larger than the byte budget is still served
+                break
+            self._remove(victim)
+            self.evictions += 1
+            logger.debug("Cache over budget, evicted entry: %s", victim)
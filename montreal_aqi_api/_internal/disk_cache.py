@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+CACHE_FILENAME = "responses.sqlite3"
+
+# Expired rows are purged once every N writes (amortizes the DELETE)
+_PURGE_EVERY_N_WRITES = 50
+
+
+def default_cache_dir() -> Path:
+    """Return the XDG cache directory used for the persistent cache."""
+    base = os.environ.get("XDG_CACHE_HOME") or str(Path.home() / ".cache")
+    return Path(base) / "montreal-aqi-api"
+
+
+class DiskCache:
+    """
+    SQLite-backed response cache shared across processes.
+
+    The database runs in WAL mode with a busy timeout so concurrent readers
+    and writers from several processes do not fail on locks. Any SQLite error
+    is logged and treated as a cache miss: the persistent cache never breaks
+    fetching.
+    """
+
+    def __init__(
+        self, cache_dir: str | Path, *, ttl: float, stale_ttl: float = 0.0
+    ) -> None:
+        self.path = Path(cache_dir) / CACHE_FILENAME
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        # Connect lazily so merely enabling the cache touches no file
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, stored_at REAL NOT NULL, "
+                "expires_at REAL NOT NULL, body TEXT NOT NULL)"
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def get(
+        self, key: str, now: float | None = None
+    ) -> tuple[float, float, Any] | None:
+        """
+        Return ``(stored_at, expires_at, value)`` for an entry, or None.
+
+        Expired entries are still returned during their ``stale_ttl`` window;
+        callers compare ``expires_at`` with the current time.
+        """
+        now = time.time() if now is None else now
+        try:
+            with self._lock:
+                row = (
+                    self._connect()
+                    .execute(
+                        "SELECT stored_at, expires_at, body FROM responses "
+                        "WHERE key = ?",
+                        (key,),
+                    )
+                    .fetchone()
+                )
+        except (sqlite3.Error, OSError) as exc:
+            logger.warning("Persistent cache read failed (%s): %s", self.path, exc)
+            return None
+
+        if row is None:
+            return None
+        stored_at, expires_at, body = row
+        if now >= expires_at + self.stale_ttl:
+            return None
+
+        try:
+            return stored_at, expires_at, json.loads(body)
+        except ValueError:
+            logger.debug("Ignoring corrupt persistent cache entry: %s", key)
+            return None
+
+    def set(
+        self,
+        key: str,
+        value: Any,
+        now: float | None = None,
+        expires_at: float | None = None,
+    ) -> None:
+        """Store ``value`` under ``key``, expiring after ``ttl`` or at ``expires_at``."""
+        now = time.time() if now is None else now
+        if expires_at is None:
+            expires_at = now + self.ttl
+        body = json.dumps(value, ensure_ascii=False)
+        try:
+            with self._lock:
+                conn = self._connect()
+                conn.execute(
+                    "INSERT OR REPLACE INTO responses "
+                    "(key, stored_at, expires_at, body) VALUES (?, ?, ?, ?)",
+                    (key, now, expires_at, body),
+                )
+                self._writes += 1
+                if self._writes % _PURGE_EVERY_N_WRITES == 0:
+                    conn.execute(
+                        "DELETE FROM responses WHERE expires_at < ?",
+                        (now - self.stale_ttl,),
+                    )
+                conn.commit()
+        except (sqlite3.Error, OSError) as exc:
+            logger.warning("Persistent cache write failed (%s): %s", self.path, exc)
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        try:
+            with self._lock:
+                conn = self._connect()
+                conn.execute("DELETE FROM responses")
+                conn.commit()
+        except (sqlite3.Error, OSError) as exc:
+            logger.warning("Persistent cache clear failed (%s): %s", self.path, exc)
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,125 @@
+"""
+JSON encoding of the contract payloads.
+
+The output is byte for byte the one of ``json.dumps(obj, ensure_ascii=False)``
+(compact) or ``json.dumps(obj, ensure_ascii=False, indent=2)`` (pretty),
+whichever backend encodes it:
+
+- Compact payloads are encoded by the stdlib C encoder, or spliced from
+  pre-encoded parts (:class:`Encoded`, e.g. ``Station.to_json_bytes()``)
+  without building their dict at all.
+  orjson writes no spaces after separators, so it is not used there.
+- Pretty payloads, which the stdlib encodes in pure Python, are encoded by
+  orjson when it is installed, unless they hold a float orjson would format
+  differently (exponents, NaN, infinities).
+"""
+
+from __future__ import annotations
+
+import json
+import math
+from importlib.util import find_spec
+from typing import Any, Callable, Iterable, Iterator, Mapping
+
+# orjson is only imported by the first pretty payload, to keep imports fast
+HAS_ORJSON = find_spec("orjson") is not None
+orjson: Any = None
+
+_SEPARATOR = b", "
+
+
+class Encoded(Mapping[str, Any]):
+    """
+    JSON object payload along with its compact encoding.
+
+    :func:`dumps` writes ``encoded`` as is. The members are built by
+    ``build`` on first read (e.g. pretty output), except the ``head`` ones,
+    which are known up front. Use ``dict(payload)`` for a mutable copy.
+    """
+
+    __slots__ = ("_build", "_data", "_head", "encoded")
+
+    def __init__(
+        self,
+        head: Mapping[str, Any],
+        build: Callable[[], Mapping[str, Any]],
+        encoded: bytes,
+    ) -> None:
+        self.encoded = encoded
+        self._head = head
+        self._build = build
+        self._data: Mapping[str, Any] | None = None
+
+    def _members(self) -> Mapping[str, Any]:
+        if self._data is None:
+            self._data = {**self._head, **self._build()}
+        return self._data
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._head:
+            return self._head[key]
+        return self._members()[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._members())
+
+    def __len__(self) -> int:
+        return len(self._members())
+
+    def __repr__(self) -> str:
+        return f"Encoded({self.encoded!r})"
+
+
+def _import_orjson() -> None:
+    global orjson
+
+    if orjson is None:
+        import orjson as _orjson
+
+        orjson = _orjson
+
+
+def _orjson_compatible(obj: Any) -> bool:
+    """Return False if orjson would not format a float of ``obj`` like json."""
+    if isinstance(obj, float):
+        # json writes 1e-05 and 1e+16 where orjson writes 0.00001 and 1e16
+        return math.isfinite(obj) and (obj == 0 or 1e-4 <= abs(obj) < 1e16)
+    if isinstance(obj, dict):
+        return all(_orjson_compatible(value) for value in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return all(_orjson_compatible(value) for value in obj)
+    return True
+
+
+def dumps(obj: Any, *, pretty: bool = False) -> bytes:
+    """Encode ``obj`` as UTF-8 JSON, compact or indented by 2 spaces."""
+    if isinstance(obj, Encoded):
+        if not pretty:
+            return obj.encoded
+        obj = dict(obj)
+    if not pretty:
+        return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+    if HAS_ORJSON and _orjson_compatible(obj):
+        _import_orjson()
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+        except TypeError:
+            # e.g. non-string keys or integers over 64 bits
+            pass
+    return json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+
+
+def merge(head: Mapping[str, Any], encoded_object: bytes) -> bytes:
+    """Encode ``head`` followed by the members of an encoded JSON object."""
+    if not head:
+        return encoded_object
+    encoded_head = dumps(head)
+    if encoded_object == b"{}":
+        return encoded_head
+    return encoded_head[:-1] + _SEPARATOR + encoded_object[1:]
+
+
+def array(items: Iterable[bytes]) -> bytes:
+    """Encode a JSON array from encoded items."""
+    return b"[" + _SEPARATOR.join(items) + b"]"
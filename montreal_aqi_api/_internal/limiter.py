@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+logger = logging.getLogger(__name__)
+
+# Weight of a new sample when the latency baseline drifts up
+_BASELINE_DRIFT = 0.01
+
+
+class AdaptiveLimiter:
+    """
+    AIMD limit on the number of requests in flight to the API.
+
+    Each request holds a slot while it is sent (see :meth:`slot`) and reports
+    its latency and outcome with :meth:`record`:
+
+    - A fast success raises the limit additively, by about one slot per
+      ``limit`` successes (one per round of requests).
+    - A failure, or a latency above ``latency_tolerance`` times the baseline
+      (the lowest latency seen, slowly drifting up), multiplies the limit by
+      ``backoff``, at most once per round trip so a burst of errors from the
+      same round only counts once.
+
+    The limit stays between ``min_limit`` and ``max_limit``.
+    """
+
+    def __init__(
+        self,
+        *,
+        initial: int,
+        min_limit: int,
+        max_limit: int,
+        latency_tolerance: float = 2.0,
+        latency_slack: float = 0.1,
+        backoff: float = 0.5,
+    ) -> None:
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_tolerance = latency_tolerance
+        self.latency_slack = latency_slack
+        self.backoff = backoff
+        self.initial = initial
+
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._limit = float(initial)
+        self._baseline: float | None = None
+        self._last_decrease = 0.0
+        self.decreases = 0
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget the observed latencies and go back to the initial limit."""
+        with self._cond:
+            self._limit = float(min(max(self.initial, self.min_limit), self.max_limit))
+            self._baseline = None
+            self._last_decrease = 0.0
+            self.decreases = 0
+            self._cond.notify_all()
+
+    @property
+    def limit(self) -> int:
+        """Current number of requests allowed in flight."""
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        """Number of requests currently holding a slot."""
+        return self._in_flight
+
+    @property
+    def baseline(self) -> float | None:
+        """Reference latency of an uncongested request, in seconds."""
+        return self._baseline
+
+    def acquire(self) -> None:
+        """Wait for a free slot."""
+        with self._cond:
+            while self._in_flight >= int(self._limit):
+                self._cond.wait()
+            self._in_flight += 1
+
+    def release(self) -> None:
+        """Free a slot."""
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify()
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        """Hold a slot for the duration of the block."""
+        self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def record(self, latency: float, ok: bool) -> None:
+        """Adjust the limit from the latency and outcome of a request."""
+        with self._cond:
+            baseline = self._baseline
+            if ok:
+                if baseline is None or latency < baseline:
+                    self._baseline = latency
+                else:
+                    self._baseline = baseline + (latency - baseline) * _BASELINE_DRIFT
+
+            slow = baseline is not None and latency > max(
+                baseline * self.latency_tolerance, baseline + self.latency_slack
+            )
+
+            if ok and not slow:
+                self._limit = min(self.max_limit, self._limit + 1.0 / self._limit)
+            else:
+                now = time.monotonic()
+                if now - self._last_decrease >= latency:
+                    self._limit = max(self.min_limit, self._limit * self.backoff)
+                    self._last_decrease = now
+                    self.decreases += 1
+                    logger.debug(
+                        "Concurrency limit lowered to %d (%s, %.2f s)",
+                        self.limit,
+                        "slow" if ok else "failed",
+                        latency,
+                    )
+
+            # A higher limit may let waiting requests through
+            self._cond.notify_all()
+
+    def configure(
+        self,
+        *,
+        min_limit: int | None = None,
+        max_limit: int | None = None,
+        latency_tolerance: float | None = None,
+    ) -> None:
+        """Change the bounds and tolerance; the current limit is clamped."""
+        with self._cond:
+            if min_limit is not None:
+                self.min_limit = min_limit
+            if max_limit is not None:
+                self.max_limit = max_limit
+            if latency_tolerance is not None:
+                self.latency_tolerance = latency_tolerance
+            self._limit = float(min(max(self._limit, self.min_limit), self.max_limit))
+            self._cond.notify_all()
@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import timezone
+from email.utils import parsedate_to_datetime
+from typing import Iterator
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+def parse_retry_after(value: str | None, now: float | None = None) -> float | None:
+    """
+    Return the delay requested by a ``Retry-After`` header, in seconds.
+
+    The header holds either a number of seconds or an HTTP date. Returns None
+    when it is missing or malformed.
+    """
+    if not value:
+        return None
+
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+
+    now = time.time() if now is None else now
+    return max(0.0, retry_at.timestamp() - now)
+
+
+@dataclass(frozen=True, slots=True)
+class RetryPolicy:
+    """
+    How failed requests are retried.
+
+    Delays grow exponentially from ``base_delay`` up to ``max_delay``, with
+    "full jitter" (a random delay between 0 and the exponential bound) so that
+    concurrent clients do not retry in lockstep. Only connection errors,
+    timeouts and the statuses in ``retry_statuses`` are retried. A
+    ``Retry-After`` header replaces the computed delay, still capped at
+    ``max_delay`` so a worker thread is never held indefinitely.
+    """
+
+    max_attempts: int = 3
+    base_delay: float = 1.0
+    max_delay: float = 30.0
+    jitter: bool = True
+    retry_statuses: frozenset[int] = frozenset({429, 500, 502, 503, 504})
+
+    def is_retryable_status(self, status: int | None) -> bool:
+        """Return True if a response with this HTTP status should be retried."""
+        # Errors without a known status (e.g. raised by hand) are retried
+        return status is None or status in self.retry_statuses
+
+    def delay(self, attempt: int, retry_after: float | None = None) -> float:
+        """Return the delay before retrying after the given (0-based) attempt."""
+        if retry_after is not None:
+            return min(retry_after, self.max_delay)
+
+        bound = min(self.max_delay, self.base_delay * 2**attempt)
+        if self.jitter:
+            # Jitter only spreads retries out: not security-sensitive
+            return random.uniform(0, bound)  # nosec B311
+        return bound
+
+
+class CircuitBreaker:
+    """
+    Thread-safe circuit breaker shared by every request to the API.
+
+    After ``failure_threshold`` consecutive failed requests the circuit opens
+    and requests fail fast for ``cooldown`` seconds. A single probe request is
+    then let through (half-open): its success closes the circuit, its failure
+    opens it for another cool-down. Send requests within :meth:`request` so a
+    probe that ends without an outcome frees the half-open slot.
+    """
+
+    def __init__(self, *, failure_threshold: int, cooldown: float) -> None:
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        # Incremented by each probe, to tell whether it is still the current one
+        self._probes = 0
+
+        self.opened = 0
+
+    @property
+    def state(self) -> str:
+        """Current state: "closed", "open" or "half_open"."""
+        with self._lock:
+            if self._state == OPEN and time.time() - self._opened_at >= self.cooldown:
+                return HALF_OPEN
+            return self._state
+
+    @property
+    def failures(self) -> int:
+        """Number of consecutive failures."""
+        return self._failures
+
+    def allow(self) -> bool:
+        """Return True if a request may be sent now."""
+        return self._admit()[0]
+
+    def _admit(self) -> tuple[bool, int | None]:
+        """Return whether a request may be sent now, and its probe number."""
+        with self._lock:
+            if self._state == CLOSED:
+                return True, None
+            if self._state == OPEN:
+                if time.time() - self._opened_at < self.cooldown:
+                    return False, None
+                self._state = HALF_OPEN
+                self._probing = False
+            # Half-open: only one probe at a time
+            if self._probing:
+                return False, None
+            self._probing = True
+            self._probes += 1
+            return True, self._probes
+
+    @contextmanager
+    def request(self) -> Iterator[bool]:
+        """
+        Yield whether a request may be sent now, for the span of the request.
+
+        If the request is the half-open probe and exits without recording
+        its outcome (an unexpected error, a cancelled task, a closed
+        generator), the probe slot is freed so the next request probes.
+        """
+        allowed, probe = self._admit()
+        try:
+            yield allowed
+        finally:
+            if probe is not None:
+                with self._lock:
+                    if self._probing and self._probes == probe:
+                        logger.debug("Circuit probe ended without an outcome")
+                        self._probing = False
+
+    def record_success(self) -> None:
+        """Record a successful request, closing the circuit."""
+        with self._lock:
+            if self._state != CLOSED:
+                logger.info("Circuit closed: Montreal open data API is back")
+            self._state = CLOSED
+            self._failures = 0
+            self._probing = False
+
+    def record_failure(self) -> None:
+        """Record a failed request, opening the circuit if needed."""
+        with self._lock:
+            self._failures += 1
+            self._probing = False
+            if self._state == HALF_OPEN or (
+                self._state == CLOSED and self._failures >= self.failure_threshold
+            ):
+                self._state = OPEN
+                self._opened_at = time.time()
+                self.opened += 1
+                logger.warning(
+                    "Circuit opened after %d consecutive failures, "
+                    "failing fast for %.0f seconds",
+                    self._failures,
+                    self.cooldown,
+                )
+
+    def reset(self) -> None:
+        """Close the circuit and forget past failures."""
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+            self._probing = False
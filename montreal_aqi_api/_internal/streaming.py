@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import codecs
+import json
+import logging
+from typing import Any, Dict, Iterable, Iterator
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = " \t\n\r"
+
+# Depth of the "records" array in {"result": {"records": [...]}}
+_RECORDS_DEPTH = 2
+
+
+class StreamFormatError(ValueError):
+    """The streamed body is not a well-formed datastore_search response."""
+
+
+class RecordStream:
+    """
+    Incrementally decode the records of a datastore_search response.
+
+    Iterating yields each object of ``result.records`` as soon as it has been
+    received, so memory holds one chunk and one record at a time instead of
+    the raw body, the decoded tree and the record list together. Everything
+    else in the body is kept as a small skeleton (with ``records`` emptied),
+    decoded into :attr:`payload` once the stream is exhausted.
+
+    Args:
+        chunks: Body chunks, as bytes (decoded as UTF-8) or str.
+    """
+
+    def __init__(self, chunks: Iterable[bytes | str]) -> None:
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._json = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+        self._skeleton: list[str] = []
+        self.payload: Dict[str, Any] | None = None
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        found = self._scan_to_records()
+        if found:
+            yield from self._iter_records()
+            self._scan_to_end()
+        self._decode_skeleton(found)
+
+    def _read(self) -> bool:
+        """Append the next chunk to the buffer; return False at end of stream."""
+        if self._eof:
+            return False
+        # Drop what has been consumed so the buffer stays one chunk long
+        self._buffer = self._buffer[self._pos :]
+        self._pos = 0
+        for chunk in self._chunks:
+            if isinstance(chunk, bytes):
+                chunk = self._decoder.decode(chunk)
+            if chunk:
+                self._buffer += chunk
+                return True
+        self._buffer += self._decoder.decode(b"", final=True)
+        self._eof = True
+        return bool(self._buffer)
+
+    def _next_char(self) -> str | None:
+        while self._pos >= len(self._buffer):
+            if not self._read():
+                return None
+        char = self._buffer[self._pos]
+        self._pos += 1
+        return char
+
+    def _scan_to_records(self) -> bool:
+        """
+        Copy the body into the skeleton up to the records array.
+
+        Returns True when positioned right after ``"records": [``.
+        """
+        depth = 0
+        in_string = False
+        escaped = False
+        string: list[str] = []
+        last_string: str | None = None
+
+        while True:
+            char = self._next_char()
+            if char is None:
+                return False
+            self._skeleton.append(char)
+
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif char == "\\":
+                    escaped = True
+                elif char == '"':
+                    in_string = False
+                    last_string = "".join(string)
+                    continue
+                string.append(char)
+                continue
+
+            if char == '"':
+                in_string = True
+                string = []
+            elif char in "{[":
+                if char == "[" and depth == _RECORDS_DEPTH and last_string == "records":
+                    return True
+                depth += 1
+            elif char in "}]":
+                depth -= 1
+            if char not in _WHITESPACE and char != ":" and char != '"':
+                last_string = None
+
+    def _iter_records(self) -> Iterator[Dict[str, Any]]:
+        expect_value = True
+        while True:
+            char = self._peek_significant()
+            if char is None:
+                raise StreamFormatError("Truncated records array")
+            if char == "]":
+                self._pos += 1
+                self._skeleton.append("]")
+                return
+            if char == ",":
+                if expect_value:
+                    raise StreamFormatError("Unexpected ',' in records array")
+                self._pos += 1
+                expect_value = True
+                continue
+            if not expect_value:
+                raise StreamFormatError("Missing ',' in records array")
+
+            record = self._decode_value()
+            if not isinstance(record, dict):
+                raise StreamFormatError("Record is not an object")
+            expect_value = False
+            yield record
+
+    def _peek_significant(self) -> str | None:
+        while True:
+            while self._pos < len(self._buffer):
+                char = self._buffer[self._pos]
+                if char not in _WHITESPACE:
+                    return char
+                self._pos += 1
+            if not self._read():
+                return None
+
+    def _decode_value(self) -> Any:
+        while True:
+            try:
+                value, end = self._json.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError as exc:
+                # Most likely the value continues in the next chunk
+                if not self._read():
+                    raise StreamFormatError(str(exc)) from exc
+                continue
+            if end == len(self._buffer) and not self._eof:
+                # A value ending with the buffer may continue in the next chunk
+                # (e.g. a number), unless it is a complete object or array
+                if not isinstance(value, (dict, list)):
+                    self._read()
+                    continue
+            self._pos = end
+            return value
+
+    def _scan_to_end(self) -> None:
+        while True:
+            self._skeleton.append(self._buffer[self._pos :])
+            self._pos = len(self._buffer)
+            if not self._read():
+                return
+
+    def _decode_skeleton(self, found: bool) -> None:
+        skeleton = "".join(self._skeleton)
+        self._skeleton = []
+        try:
+            payload = json.loads(skeleton)
+        except ValueError as exc:
+            raise StreamFormatError("Invalid JSON response") from exc
+        if not found or not isinstance(payload, dict):
+            raise StreamFormatError("Unexpected API response format")
+        self.payload = payload
@@ -0,0 +1,247 @@
+from __future__ import annotations
+
+import logging
+from importlib.util import find_spec
+from typing import Any, Dict, List, Mapping, Sequence, Tuple
+
+from montreal_aqi_api._internal.parsing import _get_first, normalize_pollutant_code
+from montreal_aqi_api.config import REFERENCE_VALUES
+from montreal_aqi_api.pollutants import Pollutant
+
+logger = logging.getLogger(__name__)
+
+# NumPy is only imported by the first batch, to keep imports fast
+HAS_NUMPY = find_spec("numpy") is not None
+np: Any = None
+
+# AQI of the (station, pollutant) cells without any valid record
+_MISSING = -(2**62)
+
+
+def _pollutant_metadata(code: str) -> Tuple[str, str, float] | None:
+    """Return (fullname, unit, reference) of a pollutant, or None if unknown."""
+    ref_info = REFERENCE_VALUES.get(code)
+    if ref_info is None:
+        return None
+
+    fullname = ref_info.get("fullname")
+    reference = ref_info.get("ref")
+    unit = ref_info.get("unit")
+
+    if (
+        not isinstance(fullname, str)
+        or not isinstance(reference, (int, float))
+        or not isinstance(unit, str)
+    ):
+        return None
+    return fullname, unit, float(reference)
+
+
+def _import_numpy() -> None:
+    global np
+    if np is None:
+        if not HAS_NUMPY:
+            raise ImportError("parse_pollutants_batch requires numpy")
+        import numpy
+
+        np = numpy
+
+
+def _to_float(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float("nan")
+
+
+class PollutantTable:
+    """
+    Pollutant sub-indices of many stations, as (station x pollutant) arrays.
+
+    Built by :func:`parse_pollutants_batch`. Reductions are computed once in
+    NumPy for the whole batch; ``Pollutant`` objects are only created by
+    :meth:`pollutants`, for the stations actually read.
+
+    Attributes:
+        station_ids: Row labels.
+        codes: Column labels (normalized pollutant codes).
+        aqi: Highest AQI per cell (int64); cells without data are masked by
+            ``present``.
+        concentration: Concentration of each cell (float64).
+        present: Boolean mask of the cells with at least one valid record.
+    """
+
+    def __init__(
+        self,
+        station_ids: List[str],
+        codes: List[str],
+        metadata: List[Tuple[str, str, float]],
+        aqi: Any,
+        first_seen: Any,
+    ) -> None:
+        self.station_ids = station_ids
+        self.codes = codes
+        self._metadata = metadata
+        self._rows = {station_id: row for row, station_id in enumerate(station_ids)}
+
+        self.aqi = aqi
+        self.present = aqi != _MISSING
+        references = np.array([meta[2] for meta in metadata], dtype=np.float64)
+        self.concentration = (aqi / 100.0) * references
+
+        # Column order of each station: the order codes first appear in its
+        # records, like the insertion order of the scalar parser's dict
+        self._first_seen = first_seen
+        self._station_aqi, self._dominant = self._reduce()
+
+    def _reduce(self) -> Tuple[Any, Any]:
+        """Per-station max AQI and dominant pollutant column (-1 if none)."""
+        if not self.codes:
+            empty = np.full(len(self.station_ids), -1, dtype=np.int64)
+            return empty, empty
+
+        station_aqi = self.aqi.max(axis=1)
+        # Ties go to the pollutant seen first, as with max() over the dict
+        is_max = self.present & (self.aqi == station_aqi[:, None])
+        order = np.where(is_max, self._first_seen, np.iinfo(np.int64).max)
+        dominant = np.where(self.present.any(axis=1), order.argmin(axis=1), -1)
+        return station_aqi, dominant
+
+    def __len__(self) -> int:
+        return len(self.station_ids)
+
+    def __contains__(self, station_id: object) -> bool:
+        row = self._rows.get(station_id)  # type: ignore[arg-type]
+        return row is not None and bool(self._dominant[row] >= 0)
+
+    def station_aqi(self, station_id: str) -> int | None:
+        """Return the AQI (max sub-index) of a station, or None without data."""
+        row = self._rows.get(station_id)
+        if row is None or self._dominant[row] < 0:
+            return None
+        return int(self._station_aqi[row])
+
+    def main_pollutant(self, station_id: str) -> str | None:
+        """Return the dominant pollutant code of a station, or None."""
+        row = self._rows.get(station_id)
+        if row is None or self._dominant[row] < 0:
+            return None
+        return self.codes[int(self._dominant[row])]
+
+    def pollutants(self, station_id: str) -> Dict[str, Pollutant]:
+        """Materialize the pollutants of one station, as ``parse_pollutants``."""
+        row = self._rows.get(station_id)
+        if row is None:
+            return {}
+
+        columns = np.flatnonzero(self.present[row])
+        columns = columns[np.argsort(self._first_seen[row, columns], kind="stable")]
+
+        pollutants: Dict[str, Pollutant] = {}
+        for column in columns.tolist():
+            code = self.codes[column]
+            fullname, unit, _ = self._metadata[column]
+            pollutants[code] = Pollutant(
+                name=code,
+                fullname=fullname,
+                unit=unit,
+                aqi=int(self.aqi[row, column]),
+                concentration=float(self.concentration[row, column]),
+            )
+        return pollutants
+
+
+def parse_pollutants_batch(
+    records_by_station: Mapping[str, Sequence[Mapping[str, Any]]],
+) -> PollutantTable:
+    """
+    Parse the records of many stations at once.
+
+    Gives the same pollutants as calling ``parse_pollutants()`` on each
+    station's records, but converts the values to column arrays and does the
+    per-(station, pollutant) max and the per-station argmax in NumPy.
+
+    Raises:
+        ImportError: If NumPy is not installed.
+    """
+    _import_numpy()
+
+    station_ids = list(records_by_station)
+    codes: List[str] = []
+    metadata: List[Tuple[str, str, float]] = []
+    columns: Dict[str, int | None] = {}
+
+    rows: List[int] = []
+    cols: List[int] = []
+    raw_values: List[Any] = []
+
+    for row, station_id in enumerate(station_ids):
+        for record in records_by_station[station_id]:
+            code_raw = _get_first(record, "polluant", "pollutant")
+            if not isinstance(code_raw, str):
+                continue
+
+            column = columns.get(code_raw, -1)
+            if column == -1:
+                # Resolve each raw code once per batch
+                code = normalize_pollutant_code(code_raw)
+                meta = _pollutant_metadata(code)
+                if meta is None:
+                    column = None
+                elif code in codes:
+                    column = codes.index(code)
+                else:
+                    column = len(codes)
+                    codes.append(code)
+                    metadata.append(meta)
+                columns[code_raw] = column
+            if column is None:
+                continue
+
+            rows.append(row)
+            cols.append(column)
+            raw_values.append(_get_first(record, "indice", "valeur"))
+
+    values = _parse_values(raw_values)
+    # Values beyond int64 are dropped rather than overflowing
+    valid = np.isfinite(values) & (np.abs(values) < -_MISSING)
+
+    row_index = np.asarray(rows, dtype=np.intp)[valid]
+    col_index = np.asarray(cols, dtype=np.intp)[valid]
+    # int(float(x)) truncates toward zero
+    aqi_values = np.trunc(values[valid]).astype(np.int64)
+
+    shape = (len(station_ids), len(codes))
+    aqi = np.full(shape, _MISSING, dtype=np.int64)
+    np.maximum.at(aqi, (row_index, col_index), aqi_values)
+
+    first_seen = np.full(shape, np.iinfo(np.int64).max, dtype=np.int64)
+    np.minimum.at(
+        first_seen,
+        (row_index, col_index),
+        np.arange(len(aqi_values), dtype=np.int64),
+    )
+
+    logger.debug(
+        "Parsed %d pollutant records for %d stations",
+        len(aqi_values),
+        len(station_ids),
+    )
+
+    return PollutantTable(station_ids, codes, metadata, aqi, first_seen)
+
+
+def _parse_values(raw_values: List[Any]) -> Any:
+    """Convert raw AQI values to float64, NaN where float() would fail."""
+    try:
+        values = np.asarray(raw_values, dtype=np.float64)
+    except (TypeError, ValueError):
+        values = None
+    if values is None or values.shape != (len(raw_values),):
+        # Some value is not a plain number or numeric string
+        values = np.fromiter(
+            (_to_float(value) for value in raw_values),
+            dtype=np.float64,
+            count=len(raw_values),
+        )
+    return values
@@ -0,0 +1,2 @@
+# Keep in sync with [project] version in pyproject.toml
+__version__ = "0.7.2"
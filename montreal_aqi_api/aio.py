@@ -0,0 +1,501 @@
+"""
+Asyncio client for the Montreal open data API.
+
+Requires the optional ``aiohttp`` dependency::
+
+    pip install "montreal-aqi-api[aio]"
+
+The client shares the response cache, the Station cache, the retry policy and
+the circuit breaker of the blocking functions in
+:mod:`montreal_aqi_api.service`. Identical concurrent queries of one client
+share a single request. Unlike the blocking API, latest-hour queries always
+use ``datastore_search`` (no SQL push-down, see ``api.configure_queries``).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+from functools import partial
+from types import TracebackType
+from typing import Any, Callable, Dict, List, Mapping, TypeVar
+
+try:
+    import aiohttp
+except ImportError as exc:  # pragma: no cover - depends on the environment
+    raise ImportError(
+        'montreal_aqi_api.aio requires aiohttp: pip install "montreal-aqi-api[aio]"'
+    ) from exc
+
+from montreal_aqi_api import api, metrics
+from montreal_aqi_api.config import (
+    API_REQUEST_LIMIT,
+    API_TIMEOUT_SECONDS,
+    API_URL,
+    ASYNC_LIMIT_PER_HOST,
+    ASYNC_POOL_SIZE,
+    RESID_IQA_PAR_STATION_EN_TEMPS_REEL,
+    RESID_LIST,
+    USER_AGENT,
+)
+from montreal_aqi_api.exceptions import APIInvalidResponse, APIServerUnreachable
+from montreal_aqi_api.service import _station_from_records
+from montreal_aqi_api.station import Station
+
+logger = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+
+async def _cache_io(func: Callable[..., _T], *args: Any) -> _T:
+    """
+    Run a response cache operation, off the event loop if it may hit disk.
+
+    With the disk cache enabled, lookups and stores are SQLite queries that
+    can wait on the lock of another process.
+    """
+    if api._disk_cache is None:
+        return func(*args)
+    return await asyncio.to_thread(func, *args)
+
+
+class AsyncClient:
+    """
+    Asyncio client backed by a pooled ``aiohttp.ClientSession``.
+
+    Use it as an async context manager so the connection pool is closed::
+
+        async with AsyncClient() as client:
+            station = await client.get_station_aqi("80")
+
+    Args:
+        pool_size: Maximum number of open connections in the pool.
+        limit_per_host: Maximum number of concurrent connections to the portal.
+        timeout: Total timeout of a single request, in seconds.
+    """
+
+    def __init__(
+        self,
+        *,
+        pool_size: int = ASYNC_POOL_SIZE,
+        limit_per_host: int = ASYNC_LIMIT_PER_HOST,
+        timeout: float = API_TIMEOUT_SECONDS,
+    ) -> None:
+        self._pool_size = pool_size
+        self._limit_per_host = limit_per_host
+        self._timeout = timeout
+        self._session: aiohttp.ClientSession | None = None
+        # Background refreshes of stale responses, keyed by cache key
+        self._refreshes: Dict[str, asyncio.Task[List[Dict[str, Any]]]] = {}
+        # Queries currently being fetched, keyed by cache key (single-flight)
+        self._inflight: Dict[str, asyncio.Task[List[Dict[str, Any]]]] = {}
+
+    async def __aenter__(self) -> AsyncClient:
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """Cancel pending requests and refreshes, and close the connection pool."""
+        tasks = [*self._refreshes.values(), *self._inflight.values()]
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        # The session is created lazily so it binds to the running event loop
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self._pool_size,
+                limit_per_host=self._limit_per_host,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                headers={"User-Agent": USER_AGENT},
+                timeout=aiohttp.ClientTimeout(total=self._timeout),
+            )
+        return self._session
+
+    async def _request(
+        self, request_params: list[tuple[str, str]], headers: Dict[str, str]
+    ) -> tuple[int, Mapping[str, str], str]:
+        """Perform a single GET request and return its status, headers and body."""
+        session = self._get_session()
+        async with session.get(
+            API_URL, params=request_params, headers=headers
+        ) as response:
+            response.raise_for_status()
+            return response.status, response.headers, await response.text()
+
+    async def _fetch(
+        self,
+        resource_id: str,
+        filters: Dict[str, Any] | None = None,
+        sort: str | None = None,
+        distinct: bool = False,
+        fields: List[str] | None = None,
+        offset: int = 0,
+        limit: int | None = None,
+    ) -> List[Dict[str, Any]]:
+        cache_key = api._cache_key(
+            resource_id, filters, sort, distinct, fields, offset, limit
+        )
+
+        cached_records = await _cache_io(api._get_cached, cache_key, resource_id)
+        if cached_records is not None:
+            return cached_records
+
+        if api._serve_stale:
+            stale = api._get_stale(cache_key)
+            if stale is not None:
+                self._refresh_in_background(
+                    cache_key,
+                    resource_id,
+                    filters,
+                    sort,
+                    distinct,
+                    fields,
+                    offset,
+                    limit,
+                )
+                return api.StaleRecords(stale.records)
+
+        # Single-flight: only the first caller for a query hits the API
+        task = self._inflight.get(cache_key)
+        if task is not None:
+            metrics.COALESCED_REQUESTS.inc()
+            logger.debug(
+                "Waiting for in-flight request for resource_id=%s", resource_id
+            )
+        else:
+            task = asyncio.create_task(
+                self._fetch_from_api(
+                    cache_key,
+                    resource_id,
+                    filters,
+                    sort,
+                    distinct,
+                    fields,
+                    offset,
+                    limit,
+                )
+            )
+            self._inflight[cache_key] = task
+            task.add_done_callback(partial(self._end_inflight, cache_key))
+        # A cancelled caller does not cancel the request of the other waiters
+        return await asyncio.shield(task)
+
+    def _end_inflight(
+        self, cache_key: str, task: asyncio.Task[List[Dict[str, Any]]]
+    ) -> None:
+        self._inflight.pop(cache_key, None)
+        if not task.cancelled():
+            # Retrieved, so a request left without waiters logs no warning
+            task.exception()
+
+    def _refresh_in_background(
+        self,
+        cache_key: str,
+        resource_id: str,
+        filters: Dict[str, Any] | None,
+        sort: str | None,
+        distinct: bool,
+        fields: List[str] | None,
+        offset: int,
+        limit: int | None,
+    ) -> None:
+        """Serve a stale response and schedule at most one refresh per query."""
+        logger.debug("Serving stale data for resource_id=%s", resource_id)
+        api._count_stale_response()
+
+        if cache_key in self._refreshes:
+            return
+        api._count_background_refresh()
+
+        task = asyncio.create_task(
+            self._fetch_from_api(
+                cache_key, resource_id, filters, sort, distinct, fields, offset, limit
+            )
+        )
+        self._refreshes[cache_key] = task
+
+        def done(task: asyncio.Task[List[Dict[str, Any]]]) -> None:
+            self._refreshes.pop(cache_key, None)
+            if not task.cancelled() and task.exception() is not None:
+                logger.warning(
+                    "Background refresh failed for resource_id=%s, "
+                    "serving stale data: %s",
+                    resource_id,
+                    task.exception(),
+                )
+
+        task.add_done_callback(done)
+
+    async def _fetch_from_api(
+        self,
+        cache_key: str,
+        resource_id: str,
+        filters: Dict[str, Any] | None,
+        sort: str | None,
+        distinct: bool,
+        fields: List[str] | None,
+        offset: int,
+        limit: int | None,
+    ) -> List[Dict[str, Any]]:
+        """Fetch a query from the API (with retries) and cache the records."""
+        with api._circuit_request():
+            api._count_api_request(resource_id)
+
+            logger.info(
+                "Fetching data from Montreal open data API (resource_id=%s)",
+                resource_id,
+            )
+
+            now = time.time()
+            start_time = time.time()
+            request_params = api._build_request_params(
+                resource_id, filters, sort, distinct, fields, offset, limit
+            )
+
+            # Revalidate an expired response instead of downloading it again
+            stale = api._get_stale(cache_key)
+            headers = api._conditional_headers(stale)
+
+            for attempt in range(api._retry_policy.max_attempts):
+                try:
+                    with metrics.stage("http", attempt=attempt):
+                        status, response_headers, body = await self._request(
+                            request_params, headers
+                        )
+                    break  # Success, exit retry loop
+                except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
+                    error_status, retry_after = None, None
+                    if isinstance(exc, aiohttp.ClientResponseError):
+                        error_status = exc.status
+                        if exc.headers is not None:
+                            retry_after = exc.headers.get("Retry-After")
+                    await asyncio.sleep(
+                        api._retry_delay(exc, attempt, error_status, retry_after)
+                    )
+            else:
+                # Only reachable when the policy allows no attempts
+                raise APIServerUnreachable("Montreal open data API unreachable")
+
+            api._record_success()
+
+        fetch_time = time.time() - start_time
+        logger.debug("API request took %.2f seconds", fetch_time)
+
+        etag, last_modified = api._response_validators(response_headers)
+
+        if stale is not None and status == 304:
+            logger.debug("Cached data not modified for resource_id=%s", resource_id)
+            api._count_revalidation()
+            records = stale.records
+            total = stale.total
+            etag = etag or stale.etag
+            last_modified = last_modified or stale.last_modified
+        else:
+            api._count_response_bytes(resource_id, len(body))
+            try:
+                with metrics.stage("decode"):
+                    payload = json.loads(body)
+            except ValueError as exc:
+                raise APIInvalidResponse("Invalid JSON response") from exc
+
+            records = api._parse_records(payload)
+            total = api._parse_total(payload)
+
+        # Cache the result
+        await _cache_io(
+            api._store_cached, cache_key, records, now, etag, last_modified, total
+        )
+
+        return records
+
+    async def fetch_all(
+        self,
+        resource_id: str,
+        *,
+        filters: Dict[str, Any] | None = None,
+        sort: str | None = None,
+        distinct: bool = False,
+        fields: List[str] | None = None,
+        page_size: int = API_REQUEST_LIMIT,
+    ) -> List[Dict[str, Any]]:
+        """
+        Return every record of a datastore query, paging automatically.
+
+        Once the first page has given the total number of records, the other
+        pages are fetched concurrently (bounded by the connection pool) and
+        merged in order. Each page is cached on its own.
+        """
+        first = await self._fetch(
+            resource_id, filters, sort, distinct, fields, 0, page_size
+        )
+        pages = [first]
+        offset = page_size
+
+        if len(first) == page_size:
+            total = api._cached_total(
+                api._cache_key(
+                    resource_id, filters, sort, distinct, fields, 0, page_size
+                )
+            )
+            if total is not None and total > offset:
+                offsets = range(offset, total, page_size)
+                pages.extend(
+                    await asyncio.gather(
+                        *(
+                            self._fetch(
+                                resource_id,
+                                filters,
+                                sort,
+                                distinct,
+                                fields,
+                                o,
+                                page_size,
+                            )
+                            for o in offsets
+                        )
+                    )
+                )
+                offset = offsets[-1] + page_size
+
+            # Without a total, or if the resource grew, page until a short page
+            while len(pages[-1]) == page_size:
+                pages.append(
+                    await self._fetch(
+                        resource_id, filters, sort, distinct, fields, offset, page_size
+                    )
+                )
+                offset += page_size
+
+        records = [record for page in pages for record in page]
+        if any(isinstance(page, api.StaleRecords) for page in pages):
+            return api.StaleRecords(records)
+        return records
+
+    async def fetch_latest_station_records(
+        self, station_id: str
+    ) -> List[Dict[str, Any]]:
+        """
+        Return the latest available records for a given station ID.
+
+        Stations primed by a bulk pull, the poller or a blocking query are
+        served from the cache.
+        """
+        cached = await _cache_io(
+            api._get_cached,
+            api._station_cache_key(station_id),
+            RESID_IQA_PAR_STATION_EN_TEMPS_REEL,
+        )
+        if cached is not None:
+            return api._filter_latest_hour(cached, station_id)
+
+        records = await self.fetch_all(
+            RESID_IQA_PAR_STATION_EN_TEMPS_REEL,
+            filters={"stationId": station_id},
+            fields=api.STATION_RECORD_FIELDS,
+        )
+
+        if not records:
+            logger.warning("No records found for station %s", station_id)
+            return []
+
+        latest_records = api._filter_latest_hour(records, station_id)
+        if isinstance(records, api.StaleRecords):
+            return api.StaleRecords(latest_records)
+        return latest_records
+
+    async def get_station_aqi(self, station_id: str) -> Station | None:
+        """
+        Return the latest AQI data for a given station.
+
+        Shares the Station cache of ``service.get_station_aqi()``.
+        """
+        records = await self.fetch_latest_station_records(station_id)
+        if not records:
+            logger.info("No records found for station %s", station_id)
+            return None
+
+        return _station_from_records(station_id, records)
+
+    async def get_stations_aqi(self, station_ids: list[str]) -> list[Station | None]:
+        """
+        Return AQI data for multiple stations using concurrent requests.
+
+        Concurrency towards the portal is bounded by the connection pool's
+        per-host limit.
+
+        Returns:
+            List of Station objects (or None if data unavailable for a station).
+            Order corresponds to input station_ids order.
+        """
+        outcomes = await asyncio.gather(
+            *(self.get_station_aqi(station_id) for station_id in station_ids),
+            return_exceptions=True,
+        )
+
+        results: list[Station | None] = []
+        for station_id, outcome in zip(station_ids, outcomes):
+            if isinstance(outcome, Exception):
+                logger.warning(
+                    "Failed to fetch AQI for station %s: %s", station_id, outcome
+                )
+                results.append(None)
+            elif isinstance(outcome, BaseException):
+                raise outcome
+            else:
+                results.append(outcome)
+
+        logger.info(
+            "Fetched AQI data for %d stations (%d successful)",
+            len(station_ids),
+            sum(1 for r in results if r is not None),
+        )
+
+        return results
+
+    async def list_open_stations(self) -> list[dict[str, Any]]:
+        """List all currently open monitoring stations."""
+        records = await self.fetch_all(
+            RESID_LIST,
+            filters=api.OPEN_STATION_FILTERS,
+            fields=api.OPEN_STATION_FIELDS,
+        )
+
+        stations = api._open_stations_from_records(records)
+
+        logger.info("Found %d open stations", len(stations))
+        return stations
+
+
+async def get_station_aqi(station_id: str) -> Station | None:
+    """Return the latest AQI data for a given station, using a one-off client."""
+    async with AsyncClient() as client:
+        return await client.get_station_aqi(station_id)
+
+
+async def get_stations_aqi(station_ids: list[str]) -> list[Station | None]:
+    """Return AQI data for multiple stations, using a one-off client."""
+    async with AsyncClient() as client:
+        return await client.get_stations_aqi(station_ids)
+
+
+async def list_open_stations() -> list[dict[str, Any]]:
+    """List all currently open monitoring stations, using a one-off client."""
+    async with AsyncClient() as client:
+        return await client.list_open_stations()
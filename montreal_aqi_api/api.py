@@ -2,85 +2,674 @@ from __future__ import annotations
 
 import json
 import logging
+import threading
 import time
-from collections import OrderedDict
-from typing import Any, Dict, List, Union
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from functools import partial
+from pathlib import Path
+from typing import (
+    Any,
+    Callable,
+    Container,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Union,
+)
 from urllib.parse import urlencode
+from zoneinfo import ZoneInfo
 
 import requests
 
 from montreal_aqi_api.config import (
+    API_REQUEST_LIMIT,
     API_TIMEOUT_SECONDS,
     API_URL,
+    CACHE_MAX_BYTES,
+    CACHE_MAX_ENTRIES,
+    CACHE_MAX_FRESHNESS_SECONDS,
+    CACHE_SERVE_STALE,
+    CACHE_STALE_TTL_SECONDS,
+    CACHE_SWEEP_INTERVAL_SECONDS,
     CACHE_TTL_SECONDS,
+    CIRCUIT_COOLDOWN_SECONDS,
+    CIRCUIT_FAILURE_THRESHOLD,
+    CONCURRENCY_INITIAL,
+    CONCURRENCY_LATENCY_TOLERANCE,
+    CONCURRENCY_MAX,
+    CONCURRENCY_MIN,
+    HTTP_POOL_SIZE,
     MAX_RETRIES,
+    PAGE_FETCH_WORKERS,
+    QUERY_USE_SQL,
     RETRY_BACKOFF_SECONDS,
+    RETRY_MAX_BACKOFF_SECONDS,
+    RETRY_STATUS_CODES,
     RESID_IQA_PAR_STATION_EN_TEMPS_REEL,
     RESID_LIST,
+    STATION_FILTER_CHUNK_SIZE,
+    STREAM_CHUNK_SIZE,
+    TIMEZONE,
     USER_AGENT,
 )
-from montreal_aqi_api.exceptions import APIInvalidResponse, APIServerUnreachable
+from montreal_aqi_api._internal.cache import (
+    EvictionPolicy,
+    ResponseCache,
+    approximate_size,
+)
+from montreal_aqi_api._internal.disk_cache import DiskCache, default_cache_dir
+from montreal_aqi_api._internal.limiter import AdaptiveLimiter
+from montreal_aqi_api._internal.retry import (
+    OPEN,
+    CircuitBreaker,
+    RetryPolicy,
+    parse_retry_after,
+)
+from montreal_aqi_api._internal.streaming import RecordStream, StreamFormatError
+from montreal_aqi_api import metrics
+from montreal_aqi_api.exceptions import (
+    APIInvalidResponse,
+    APIServerUnreachable,
+    CircuitOpenError,
+    MontrealAQIError,
+)
+from montreal_aqi_api.transport import (
+    RequestsTransport,
+    Transport,
+    TransportError,
+    TransportResponse,
+)
 
 logger = logging.getLogger(__name__)
 
 Params = Dict[str, Union[str, int, float, bool]]
 
-# In-memory cache with size limit (FIFO eviction)
-# Using OrderedDict to maintain insertion order for cache eviction
-_api_cache: OrderedDict[str, tuple[float, List[Dict[str, Any]]]] = OrderedDict()
-_cache_max_size = 100  # Maximum number of cached queries
+# Columns needed for station AQI data
+STATION_RECORD_FIELDS = ["stationId", "date", "heure", "pollutant", "valeur"]
+
+# Columns and filter needed for the open station list
+OPEN_STATION_FIELDS = ["numero_station", "nom", "adresse", "arrondissement_ville"]
+OPEN_STATION_FILTERS = {"statut": "ouvert"}
+
+# Cache key of the latest-hour records of every station (streamed bulk pulls)
+LATEST_RECORDS_CACHE_KEY = f"{RESID_IQA_PAR_STATION_EN_TEMPS_REEL}:latest"
+
+
+@dataclass(frozen=True, slots=True)
+class CachedResponse:
+    """
+    Records of a datastore query, the HTTP validators sent with them, and the
+    total number of records matching the query (``result.total``), if known.
+    """
+
+    records: List[Dict[str, Any]]
+    etag: str | None = None
+    last_modified: str | None = None
+    total: int | None = None
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            "records": self.records,
+            "etag": self.etag,
+            "last_modified": self.last_modified,
+            "total": self.total,
+        }
+
+    @classmethod
+    def from_json(cls, data: Mapping[str, Any]) -> CachedResponse:
+        return cls(
+            records=data["records"],
+            etag=data.get("etag"),
+            last_modified=data.get("last_modified"),
+            total=data.get("total"),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class _Request:
+    """
+    A cacheable API query: its endpoint and query string parameters (built
+    only when a request is actually sent).
+
+    HTTP statuses in ``expected_statuses`` are still raised as errors, but
+    logged at debug level (e.g. while probing for an optional endpoint).
+    """
+
+    resource_id: str
+    build_params: Callable[[], list[tuple[str, str]]]
+    url: str | None = None
+    expected_statuses: Container[int] = ()
+
 
-# Metrics
-total_api_requests = 0
-cache_hits = 0
-cache_misses = 0
+class StaleRecords(List[Dict[str, Any]]):
+    """
+    Records served from an expired cache entry (see ``configure_cache``).
+
+    Behaves as a plain list; its type tells callers the data may be outdated.
+    """
+
+
+# Thread-safe in-memory cache of responses (TTL + LRU eviction). Expired
+# entries are kept for CACHE_STALE_TTL_SECONDS so they can be revalidated.
+_api_cache: ResponseCache[CachedResponse] = ResponseCache(
+    ttl=CACHE_TTL_SECONDS,
+    max_entries=CACHE_MAX_ENTRIES,
+    max_bytes=CACHE_MAX_BYTES,
+    sizeof=lambda response: approximate_size(response.records),
+    sweep_interval=CACHE_SWEEP_INTERVAL_SECONDS,
+    stale_ttl=CACHE_STALE_TTL_SECONDS,
+)
+
+# Optional persistent cache shared across processes (see enable_disk_cache)
+_disk_cache: DiskCache | None = None
+
+# Stale-while-revalidate / stale-if-error mode (see configure_cache)
+_serve_stale = CACHE_SERVE_STALE
+
+# SQL push-down of latest-hour queries (see configure_queries). Whether the
+# portal allows datastore_search_sql is unknown (None) until first tried.
+_use_sql = QUERY_USE_SQL
+_sql_available: bool | None = None
+# Answers of datastore_search_sql when the portal does not allow SQL queries
+# (CKAN answers 400 for a disabled or unknown action). Any other client error
+# (e.g. 409 for an SQL error) only makes that query use datastore_search.
+_SQL_UNAVAILABLE_STATUSES = (400, 403, 404)
+_SQL_CLIENT_ERRORS = range(400, 500)
+
+# Retry policy and circuit breaker shared by every request (see configure_retries)
+_retry_policy = RetryPolicy(
+    max_attempts=MAX_RETRIES,
+    base_delay=RETRY_BACKOFF_SECONDS,
+    max_delay=RETRY_MAX_BACKOFF_SECONDS,
+    retry_statuses=frozenset(RETRY_STATUS_CODES),
+)
+_circuit_breaker = CircuitBreaker(
+    failure_threshold=CIRCUIT_FAILURE_THRESHOLD, cooldown=CIRCUIT_COOLDOWN_SECONDS
+)
+
+# Requests in flight to the API, adapted to its latency and errors
+# (see configure_concurrency)
+_concurrency_limiter = AdaptiveLimiter(
+    initial=CONCURRENCY_INITIAL,
+    min_limit=CONCURRENCY_MIN,
+    max_limit=CONCURRENCY_MAX,
+    latency_tolerance=CONCURRENCY_LATENCY_TOLERANCE,
+)
+
+# Queries currently being fetched, keyed by cache key. Concurrent callers
+# asking for the same query wait on the first caller's pending result
+# (single-flight) instead of issuing duplicate requests.
+_inflight: Dict[str, Future[List[Dict[str, Any]]]] = {}
+_inflight_lock = threading.Lock()
 
 # Configure a requests session for all queries
 # Use the UA configured in config instead of python-request's own
 requests_session = requests.Session()
 requests_session.headers.update({"User-Agent": USER_AGENT})
 
+# Every request goes through this transport (see configure_transport)
+_transport: Transport = RequestsTransport(requests_session, pool_size=HTTP_POOL_SIZE)
 
-def _fetch(
+
+def _cache_key(
     resource_id: str,
     filters: Dict[str, Any] | None = None,
     sort: str | None = None,
     distinct: bool = False,
     fields: List[str] | None = None,
     offset: int = 0,
-) -> List[Dict[str, Any]]:
-    global total_api_requests, cache_hits, cache_misses
-
-    # Create a cache key that includes filters, sort, distinct, fields, and offset
-    cache_key = resource_id
-    if filters or sort or distinct or fields or offset:
-        cache_params = {
-            "filters": filters,
-            "sort": sort,
-            "distinct": distinct,
-            "fields": fields,
-            "offset": offset,
-        }
-        cache_key = f"{resource_id}:{str(sorted(cache_params.items()))}"
+    limit: int | None = None,
+) -> str:
+    """Return the cache key for a datastore query."""
+    # Create a cache key that includes filters, sort, distinct, fields, offset
+    # and limit
+    if not (filters or sort or distinct or fields or offset or limit):
+        return resource_id
 
-    now = time.time()
-    if cache_key in _api_cache:
-        cached_time, cached_records = _api_cache[cache_key]
-        if now - cached_time < CACHE_TTL_SECONDS:
-            logger.debug("Using cached data for resource_id=%s", resource_id)
-            cache_hits += 1
-            return cached_records
-        else:
-            logger.debug("Cache expired for resource_id=%s", resource_id)
+    cache_params = {
+        "filters": filters,
+        "sort": sort,
+        "distinct": distinct,
+        "fields": fields,
+        "offset": offset,
+        "limit": limit,
+    }
+    return f"{resource_id}:{str(sorted(cache_params.items()))}"
+
+
+def _get_cached(cache_key: str, resource_id: str) -> List[Dict[str, Any]] | None:
+    """Return fresh cached records for a query, or None (counted as a miss)."""
+    cached = _api_cache.get(cache_key)
+    if cached is not None:
+        logger.debug("Using cached data for resource_id=%s", resource_id)
+        metrics.CACHE_LOOKUPS.inc(resource=resource_id, result="hit")
+        return cached.records
+
+    disk_cache = _disk_cache
+    if disk_cache is not None:
+        disk_entry = disk_cache.get(cache_key)
+        if disk_entry is not None:
+            stored_at, expires_at, data = disk_entry
+            cached = CachedResponse.from_json(data)
+            # Keep the original timestamps so the entry expires on schedule
+            # (expired entries are kept in memory for revalidation)
+            _api_cache.set(cache_key, cached, now=stored_at, expires_at=expires_at)
+            if time.time() < expires_at:
+                logger.debug("Using persisted data for resource_id=%s", resource_id)
+                metrics.CACHE_LOOKUPS.inc(resource=resource_id, result="disk_hit")
+                return cached.records
+
+    metrics.CACHE_LOOKUPS.inc(resource=resource_id, result="miss")
+    return None
 
-    cache_misses += 1
-    total_api_requests += 1
 
-    logger.info(
-        "Fetching data from Montreal open data API (resource_id=%s)", resource_id
+def _get_stale(cache_key: str) -> CachedResponse | None:
+    """Return an expired response that can still be revalidated, or None."""
+    return _api_cache.get_stale(cache_key)
+
+
+def _conditional_headers(stale: CachedResponse | None) -> Dict[str, str]:
+    """Return the headers revalidating a stale response, if it has validators."""
+    headers: Dict[str, str] = {}
+    if stale is not None:
+        if stale.etag:
+            headers["If-None-Match"] = stale.etag
+        if stale.last_modified:
+            headers["If-Modified-Since"] = stale.last_modified
+    return headers
+
+
+def _response_validators(headers: Mapping[str, Any]) -> tuple[str | None, str | None]:
+    """Return the (ETag, Last-Modified) validators of a response."""
+    etag = headers.get("ETag")
+    last_modified = headers.get("Last-Modified")
+    return (
+        etag if isinstance(etag, str) else None,
+        last_modified if isinstance(last_modified, str) else None,
     )
 
-    start_time = time.time()
+
+def _count_api_request(resource_id: str) -> None:
+    """Count a request actually sent to the Montreal open data API."""
+    metrics.API_REQUESTS.inc(resource=resource_id)
+
+
+def _count_response_bytes(resource_id: str, size: int | None) -> None:
+    """Count the bytes of a response body, when known."""
+    if size:
+        metrics.RESPONSE_BYTES.inc(size, resource=resource_id)
+
+
+def _count_revalidation() -> None:
+    """Count a stale response confirmed unchanged by the API (304)."""
+    metrics.REVALIDATED_RESPONSES.inc()
+
+
+@contextmanager
+def _circuit_request() -> Iterator[None]:
+    """
+    Wrap a request until its outcome is recorded (see CircuitBreaker.request).
+
+    Raises:
+        CircuitOpenError: Instead of sending a request while the circuit is open.
+    """
+    with _circuit_breaker.request() as allowed:
+        if not allowed:
+            logger.debug("Circuit open, not sending request")
+            raise CircuitOpenError("Montreal open data API unreachable (circuit open)")
+        yield
+
+
+def _record_success() -> None:
+    """Record that the API answered a request."""
+    _circuit_breaker.record_success()
+
+
+def _retry_delay(
+    exc: Exception,
+    attempt: int,
+    status: int | None,
+    retry_after: str | None,
+    *,
+    expected: bool = False,
+) -> float:
+    """
+    Return how long to wait before retrying a request that failed.
+
+    Args:
+        exc: Error raised by the failed attempt.
+        attempt: 0-based number of the failed attempt.
+        status: HTTP status of the response, if any.
+        retry_after: ``Retry-After`` header of the response, if any.
+        expected: The status is an expected answer: log a rejection at debug
+            level instead of as an error.
+
+    Raises:
+        APIInvalidResponse: The API rejected the query (non-retryable status).
+        APIServerUnreachable: No attempts left.
+        CircuitOpenError: The circuit opened meanwhile.
+    """
+    policy = _retry_policy
+
+    if not policy.is_retryable_status(status):
+        # The API is reachable, it rejected this query: retrying cannot help
+        _circuit_breaker.record_success()
+        logger.log(
+            logging.DEBUG if expected else logging.ERROR,
+            "API request rejected with HTTP %s: %s",
+            status,
+            exc,
+        )
+        raise APIInvalidResponse(
+            f"Montreal open data API returned HTTP {status}"
+        ) from exc
+
+    if attempt >= policy.max_attempts - 1:
+        logger.error(
+            "API request failed after %d attempts: %s", policy.max_attempts, exc
+        )
+        _circuit_breaker.record_failure()
+        raise APIServerUnreachable("Montreal open data API unreachable") from exc
+
+    if _circuit_breaker.state == OPEN:
+        # Other requests exhausted their retries: stop holding this thread
+        raise CircuitOpenError(
+            "Montreal open data API unreachable (circuit open)"
+        ) from exc
+
+    delay = policy.delay(attempt, parse_retry_after(retry_after))
+    logger.warning(
+        "API request failed (attempt %d/%d): %s. Retrying in %.1f seconds...",
+        attempt + 1,
+        policy.max_attempts,
+        exc,
+        delay,
+    )
+    metrics.RETRIES.inc(status=status or "none")
+    return delay
+
+
+def _count_stale_response() -> None:
+    """Count an expired response served while it is being refreshed."""
+    metrics.STALE_RESPONSES.inc()
+
+
+def _count_background_refresh() -> None:
+    """Count a refresh of a stale response started in the background."""
+    metrics.BACKGROUND_REFRESHES.inc()
+
+
+def _next_update_time(records: List[Dict[str, Any]]) -> float | None:
+    """
+    Return the earliest time at which newer real-time records can be published.
+
+    Records are published hourly: once a station has reported its latest
+    ``heure``, the next one cannot appear before the top of the following
+    hour. With several stations, the station lagging the most decides.
+    """
+    tz = ZoneInfo(TIMEZONE)
+    latest_per_station: Dict[Any, datetime] = {}
+
+    for record in records:
+        station_id = record.get("stationId")
+        raw_date = record.get("date")
+        if station_id is None or not isinstance(raw_date, str):
+            continue
+        try:
+            observed = datetime.combine(
+                date.fromisoformat(raw_date), datetime.min.time(), tzinfo=tz
+            ) + timedelta(hours=int(record["heure"]))
+        except (KeyError, ValueError, TypeError):
+            continue
+        current = latest_per_station.get(station_id)
+        if current is None or observed > current:
+            latest_per_station[station_id] = observed
+
+    if not latest_per_station:
+        return None
+
+    return (min(latest_per_station.values()) + timedelta(hours=1)).timestamp()
+
+
+def _freshness_deadline(records: List[Dict[str, Any]], fetched_at: float) -> float:
+    """
+    Return when cached records should be considered expired.
+
+    That is at least the cache TTL after the fetch, and no earlier than the next
+    possible hourly update for real-time records (capped at
+    CACHE_MAX_FRESHNESS_SECONDS), since refetching before it cannot return
+    anything new.
+    """
+    deadline = fetched_at + _api_cache.ttl
+
+    next_update = _next_update_time(records)
+    if next_update is not None:
+        next_update = min(next_update, fetched_at + CACHE_MAX_FRESHNESS_SECONDS)
+        deadline = max(deadline, next_update)
+
+    return deadline
+
+
+def _store_cached(
+    cache_key: str,
+    records: List[Dict[str, Any]],
+    fetched_at: float,
+    etag: str | None = None,
+    last_modified: str | None = None,
+    total: int | None = None,
+) -> None:
+    """Cache records fetched at ``fetched_at`` with their validators."""
+    response = CachedResponse(
+        records, etag=etag, last_modified=last_modified, total=total
+    )
+    expires_at = _freshness_deadline(records, fetched_at)
+
+    _api_cache.set(cache_key, response, now=fetched_at, expires_at=expires_at)
+
+    disk_cache = _disk_cache
+    if disk_cache is not None:
+        disk_cache.set(
+            cache_key, response.to_json(), now=fetched_at, expires_at=expires_at
+        )
+
+
+def enable_disk_cache(cache_dir: str | Path | None = None) -> Path:
+    """
+    Persist cached responses in an SQLite database shared across processes.
+
+    Short-lived processes (cron jobs, CLI invocations) then start with a warm
+    cache. Entries honor the TTL of the in-memory cache (CACHE_TTL_SECONDS).
+
+    Args:
+        cache_dir: Directory holding the database. Defaults to
+            ``$XDG_CACHE_HOME/montreal-aqi-api`` (``~/.cache/montreal-aqi-api``).
+
+    Returns:
+        Path of the database file.
+    """
+    global _disk_cache
+
+    disable_disk_cache()
+    directory = Path(cache_dir) if cache_dir is not None else default_cache_dir()
+    _disk_cache = DiskCache(
+        directory, ttl=_api_cache.ttl, stale_ttl=_api_cache.stale_ttl
+    )
+    logger.debug("Persistent cache enabled at %s", _disk_cache.path)
+    return _disk_cache.path
+
+
+def disable_disk_cache() -> None:
+    """Stop using the persistent cache (the database file is kept)."""
+    global _disk_cache
+
+    if _disk_cache is not None:
+        _disk_cache.close()
+        _disk_cache = None
+
+
+def configure_cache(
+    *,
+    ttl: float | None = None,
+    max_entries: int | None = None,
+    max_bytes: int | None = None,
+    policy: EvictionPolicy | None = None,
+    stale_ttl: float | None = None,
+    serve_stale: bool | None = None,
+) -> None:
+    """
+    Change the in-memory response cache settings.
+
+    Args:
+        ttl: Seconds a cached response stays valid.
+        max_entries: Maximum number of cached queries.
+        max_bytes: Approximate maximum size of the cached records, in bytes.
+        policy: Eviction policy, such as the LRUPolicy (default) or FIFOPolicy
+            classes from ``montreal_aqi_api._internal.cache``.
+        stale_ttl: Seconds an expired response is kept to revalidate it.
+        serve_stale: When True, an expired response still within ``stale_ttl``
+            is returned immediately as ``StaleRecords`` while it is refreshed
+            in a background thread; it keeps being served if the refresh
+            fails. Latency then no longer depends on the API.
+    """
+    global _serve_stale
+
+    if serve_stale is not None:
+        _serve_stale = serve_stale
+
+    _api_cache.configure(
+        ttl=ttl,
+        max_entries=max_entries,
+        max_bytes=max_bytes,
+        policy=policy,
+        stale_ttl=stale_ttl,
+    )
+
+
+def configure_retries(
+    *,
+    policy: RetryPolicy | None = None,
+    failure_threshold: int | None = None,
+    cooldown: float | None = None,
+) -> None:
+    """
+    Change how failed requests are retried and when the circuit opens.
+
+    Args:
+        policy: Retry policy (a ``RetryPolicy`` from
+            ``montreal_aqi_api._internal.retry``).
+        failure_threshold: Consecutive failed requests opening the circuit.
+        cooldown: Seconds requests fail fast once the circuit is open.
+    """
+    global _retry_policy
+
+    if policy is not None:
+        _retry_policy = policy
+    if failure_threshold is not None:
+        _circuit_breaker.failure_threshold = failure_threshold
+    if cooldown is not None:
+        _circuit_breaker.cooldown = cooldown
+
+
+def configure_concurrency(
+    *,
+    min_limit: int | None = None,
+    max_limit: int | None = None,
+    latency_tolerance: float | None = None,
+) -> None:
+    """
+    Change the bounds of the adaptive number of requests in flight.
+
+    The limit grows by one per round of fast successful requests and halves
+    on errors (timeouts, 429, 5xx) or when latency exceeds
+    ``latency_tolerance`` times the uncongested latency.
+
+    Args:
+        min_limit: Requests always allowed in flight.
+        max_limit: Most requests allowed in flight; keep it at most the
+            connection pool size of the transport.
+        latency_tolerance: Latency ratio treated as congestion.
+    """
+    _concurrency_limiter.configure(
+        min_limit=min_limit,
+        max_limit=max_limit,
+        latency_tolerance=latency_tolerance,
+    )
+
+
+def get_max_concurrency() -> int:
+    """Return the most requests allowed in flight (see configure_concurrency)."""
+    return _concurrency_limiter.max_limit
+
+
+def configure_queries(*, use_sql: bool | None = None) -> None:
+    """
+    Change how the latest records of stations are queried.
+
+    Args:
+        use_sql: Select only the latest-hour rows server-side with
+            ``datastore_search_sql``, instead of downloading every hour of a
+            station and filtering it client-side. If the portal rejects SQL
+            queries, datastore_search is used instead for the rest of the
+            process. Setting it tries SQL again.
+    """
+    global _use_sql, _sql_available
+
+    if use_sql is not None:
+        _use_sql = use_sql
+        _sql_available = None
+
+
+def configure_transport(
+    transport: Transport | None = None,
+    *,
+    pool_size: int | None = None,
+) -> None:
+    """
+    Change the HTTP transport of the API client.
+
+    Args:
+        transport: Transport sending the requests, such as a
+            ``RequestsTransport`` or an ``HttpxTransport`` (HTTP/2) from
+            ``montreal_aqi_api.transport``. None restores the default
+            transport over ``requests_session``.
+        pool_size: Resize the connection pool of the default transport.
+
+    The replaced transport is closed.
+
+    Raises:
+        ValueError: If ``pool_size`` is given with a custom transport (the
+            current transport is then kept).
+    """
+    global _transport
+
+    if transport is None:
+        transport = RequestsTransport(requests_session)
+        pool_size = pool_size or HTTP_POOL_SIZE
+    if pool_size is not None:
+        if not isinstance(transport, RequestsTransport):
+            raise ValueError("pool_size only applies to the default transport")
+        transport.configure_pool(pool_size)
+
+    previous, _transport = _transport, transport
+    if previous is not transport:
+        previous.close()
+
+
+def _build_request_params(
+    resource_id: str,
+    filters: Dict[str, Any] | None = None,
+    sort: str | None = None,
+    distinct: bool = False,
+    fields: List[str] | None = None,
+    offset: int = 0,
+    limit: int | None = None,
+) -> list[tuple[str, str]]:
+    """Return the query string parameters of a datastore_search request."""
     params: Params = {
         "resource_id": resource_id,
     }
@@ -92,6 +681,8 @@ def _fetch(
         params["distinct"] = str(distinct).lower()
     if offset:
         params["offset"] = offset
+    if limit:
+        params["limit"] = limit
 
     # Build request params with repeated fields if specified
     # CKAN API expects fields=col1&fields=col2&... (not comma-separated)
@@ -112,77 +703,512 @@ def _fetch(
         logger.debug("Sort: %s", sort)
     if offset:
         logger.debug("Offset: %d", offset)
+    if limit:
+        logger.debug("Limit: %d", limit)
 
-    last_exc = None
-    for attempt in range(MAX_RETRIES):
+    return request_params
+
+
+def _parse_records(payload: Any) -> List[Dict[str, Any]]:
+    """Extract the record list from a decoded datastore_search payload."""
+    result = payload.get("result", {}) if isinstance(payload, dict) else None
+    records = result.get("records") if isinstance(result, dict) else None
+
+    if not isinstance(records, list):
+        logger.warning("Unexpected API response format: records is not a list")
+        logger.debug("Payload: %s", payload)
+        raise APIInvalidResponse("Unexpected API response format")
+
+    return records
+
+
+def _parse_total(payload: Any) -> int | None:
+    """Return ``result.total`` of a decoded datastore_search payload, if valid."""
+    total = payload.get("result", {}).get("total")
+    if isinstance(total, int) and not isinstance(total, bool) and total >= 0:
+        return total
+    return None
+
+
+def _cached_total(cache_key: str) -> int | None:
+    """Return the total record count stored with a cached query, if any."""
+    cached = _api_cache.get_stale(cache_key)
+    return None if cached is None else cached.total
+
+
+def _fetch(
+    resource_id: str,
+    filters: Dict[str, Any] | None = None,
+    sort: str | None = None,
+    distinct: bool = False,
+    fields: List[str] | None = None,
+    offset: int = 0,
+    limit: int | None = None,
+) -> List[Dict[str, Any]]:
+    cache_key = _cache_key(resource_id, filters, sort, distinct, fields, offset, limit)
+    request = _Request(
+        resource_id,
+        partial(
+            _build_request_params,
+            resource_id,
+            filters,
+            sort,
+            distinct,
+            fields,
+            offset,
+            limit,
+        ),
+    )
+    return _fetch_cached(cache_key, request)
+
+
+def _fetch_cached(cache_key: str, request: _Request) -> List[Dict[str, Any]]:
+    """
+    Return the records of a query from the cache, or from the API.
+
+    Concurrent identical queries share a single request, and expired
+    responses are served stale or revalidated (see ``configure_cache``).
+    """
+    resource_id = request.resource_id
+
+    cached_records = _get_cached(cache_key, resource_id)
+    if cached_records is not None:
+        return cached_records
+
+    if _serve_stale:
+        stale_records = _get_stale_records(cache_key, request)
+        if stale_records is not None:
+            return stale_records
+
+    # Single-flight: only the first caller for a query hits the API
+    with _inflight_lock:
+        pending = _inflight.get(cache_key)
+        is_leader = pending is None
+        if pending is None:
+            pending = _inflight[cache_key] = Future()
+
+    if not is_leader:
+        metrics.COALESCED_REQUESTS.inc()
+        logger.debug("Waiting for in-flight request for resource_id=%s", resource_id)
+        return pending.result()
+
+    return _lead_fetch(pending, cache_key, request)
+
+
+def _lead_fetch(
+    pending: Future[List[Dict[str, Any]]],
+    cache_key: str,
+    request: _Request,
+) -> List[Dict[str, Any]]:
+    """Fetch a query on behalf of its in-flight waiters and publish the result."""
+    try:
+        records = _fetch_from_api(cache_key, request)
+    except BaseException as exc:
+        pending.set_exception(exc)
+        raise
+    else:
+        pending.set_result(records)
+        return records
+    finally:
+        with _inflight_lock:
+            del _inflight[cache_key]
+
+
+def _get_stale_records(cache_key: str, request: _Request) -> StaleRecords | None:
+    """
+    Return expired records for a query and refresh them in the background.
+
+    Returns None when nothing usable is cached: the caller then fetches
+    synchronously.
+    """
+    stale = _get_stale(cache_key)
+    if stale is None:
+        return None
+
+    resource_id = request.resource_id
+    logger.debug("Serving stale data for resource_id=%s", resource_id)
+    _count_stale_response()
+
+    # Reuse the single-flight registry so only one refresh runs per query
+    with _inflight_lock:
+        if cache_key in _inflight:
+            return StaleRecords(stale.records)
+        pending: Future[List[Dict[str, Any]]] = Future()
+        _inflight[cache_key] = pending
+    _count_background_refresh()
+
+    def refresh() -> None:
+        # Other errors are bugs: left to threading.excepthook, with a traceback
         try:
-            response = requests_session.get(
-                API_URL, params=request_params, timeout=API_TIMEOUT_SECONDS
+            _lead_fetch(pending, cache_key, request)
+        except MontrealAQIError as exc:
+            logger.warning(
+                "Background refresh failed for resource_id=%s, serving stale data: %s",
+                resource_id,
+                exc,
             )
-            response.raise_for_status()
+
+    threading.Thread(target=refresh, name="montreal-aqi-refresh", daemon=True).start()
+
+    return StaleRecords(stale.records)
+
+
+def _observe_attempt(started: float, *, ok: bool) -> None:
+    """Record the latency of an HTTP attempt (limiter and stage histogram)."""
+    latency = time.monotonic() - started
+    _concurrency_limiter.record(latency, ok=ok)
+    metrics.STAGE_SECONDS.observe(latency, stage="http")
+
+
+def _response_size(response: TransportResponse) -> int | None:
+    """Return the size of a (non-streamed) response body, if known."""
+    length = response.headers.get("Content-Length")
+    if isinstance(length, str) and length.isdigit():
+        return int(length)
+    content = getattr(response, "content", None)
+    return len(content) if isinstance(content, bytes) else None
+
+
+def _count_chunks(resource_id: str, chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """Count the bytes of a streamed body as it is received."""
+    for chunk in chunks:
+        metrics.RESPONSE_BYTES.inc(len(chunk), resource=resource_id)
+        yield chunk
+
+
+def _send_request(
+    request_params: list[tuple[str, str]],
+    headers: Dict[str, str],
+    *,
+    stream: bool = False,
+    url: str | None = None,
+    expected_statuses: Container[int] = (),
+) -> TransportResponse:
+    """Send a datastore request, retrying per the retry policy."""
+    last_exc = None
+    for attempt in range(_retry_policy.max_attempts):
+        try:
+            # Only the request holds a slot, not the wait before a retry
+            with _concurrency_limiter.slot(), metrics.span("http", attempt=attempt):
+                started = time.monotonic()
+                try:
+                    response = _transport.get(
+                        url or API_URL,
+                        params=request_params,
+                        headers=headers,
+                        timeout=API_TIMEOUT_SECONDS,
+                        stream=stream,
+                    )
+                except TransportError as exc:
+                    # A rejected query (e.g. 404) is not a sign of congestion
+                    _observe_attempt(
+                        started, ok=not _retry_policy.is_retryable_status(exc.status)
+                    )
+                    raise
+                _observe_attempt(started, ok=True)
             break  # Success, exit retry loop
-        except requests.exceptions.RequestException as exc:
+        except TransportError as exc:
             last_exc = exc
-            if attempt < MAX_RETRIES - 1:
-                logger.warning(
-                    "API request failed (attempt %d/%d): %s. Retrying in %.1f seconds...",
-                    attempt + 1,
-                    MAX_RETRIES,
+            retry_after = exc.headers.get("Retry-After")
+            time.sleep(
+                _retry_delay(
                     exc,
-                    RETRY_BACKOFF_SECONDS,
-                )
-                time.sleep(RETRY_BACKOFF_SECONDS)
-            else:
-                logger.error(
-                    "API request failed after %d attempts: %s", MAX_RETRIES, exc
+                    attempt,
+                    exc.status,
+                    retry_after,
+                    expected=exc.status in expected_statuses,
                 )
-                raise APIServerUnreachable(
-                    "Montreal open data API unreachable"
-                ) from exc
+            )
     else:
         # This should not happen, but just in case
         raise APIServerUnreachable("Montreal open data API unreachable") from last_exc
 
+    _record_success()
+    return response
+
+
+def stream_records(
+    resource_id: str,
+    *,
+    filters: Dict[str, Any] | None = None,
+    sort: str | None = None,
+    distinct: bool = False,
+    fields: List[str] | None = None,
+    offset: int = 0,
+    limit: int | None = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yield the records of a datastore query as they are received.
+
+    The response body is decoded incrementally, so memory use does not grow
+    with the page size and the first records are available before the whole
+    body has arrived. Streamed responses bypass the response cache.
+
+    Raises:
+        APIServerUnreachable: If the API cannot be reached, or the connection
+            drops while streaming.
+        APIInvalidResponse: If the body is not a datastore_search response.
+    """
+    with _circuit_request():
+        _count_api_request(resource_id)
+
+        logger.info(
+            "Streaming data from Montreal open data API (resource_id=%s)", resource_id
+        )
+
+        request_params = _build_request_params(
+            resource_id, filters, sort, distinct, fields, offset, limit
+        )
+        response = _send_request(request_params, {}, stream=True)
+
+    try:
+        chunks = response.iter_content(chunk_size=STREAM_CHUNK_SIZE)
+        yield from RecordStream(_count_chunks(resource_id, chunks))
+    except StreamFormatError as exc:
+        logger.warning("Unexpected streamed API response: %s", exc)
+        raise APIInvalidResponse("Unexpected API response format") from exc
+    except TransportError as exc:
+        raise APIServerUnreachable("Connection lost while streaming") from exc
+    finally:
+        response.close()
+
+
+def _fetch_from_api(cache_key: str, request: _Request) -> List[Dict[str, Any]]:
+    """Fetch a query from the API (with retries) and cache the records."""
+    resource_id = request.resource_id
+    with _circuit_request():
+        _count_api_request(resource_id)
+
+        logger.info(
+            "Fetching data from Montreal open data API (resource_id=%s)", resource_id
+        )
+
+        now = time.time()
+        start_time = time.time()
+        request_params = request.build_params()
+
+        # Revalidate an expired response instead of downloading it again
+        stale = _get_stale(cache_key)
+        headers = _conditional_headers(stale)
+
+        response = _send_request(
+            request_params,
+            headers,
+            url=request.url,
+            expected_statuses=request.expected_statuses,
+        )
+
     fetch_time = time.time() - start_time
     logger.debug("API request took %.2f seconds", fetch_time)
 
-    try:
-        payload = response.json()
-    except ValueError as exc:
-        raise APIInvalidResponse("Invalid JSON response") from exc
+    etag, last_modified = _response_validators(response.headers)
 
-    records = payload.get("result", {}).get("records")
+    if stale is not None and response.status_code == 304:
+        logger.debug("Cached data not modified for resource_id=%s", resource_id)
+        _count_revalidation()
+        records = stale.records
+        total = stale.total
+        etag = etag or stale.etag
+        last_modified = last_modified or stale.last_modified
+    else:
+        _count_response_bytes(resource_id, _response_size(response))
+        try:
+            with metrics.stage("decode"):
+                payload = response.json()
+        except ValueError as exc:
+            raise APIInvalidResponse("Invalid JSON response") from exc
 
-    if not isinstance(records, list):
-        logger.warning("Unexpected API response format: records is not a list")
-        logger.debug("Payload: %s", payload)
-        raise APIInvalidResponse("Unexpected API response format")
+        records = _parse_records(payload)
+        total = _parse_total(payload)
 
     # Cache the result
-    _api_cache[cache_key] = (now, records)
-
-    # Enforce cache size limit using FIFO eviction
-    # When cache exceeds max size, remove oldest entry (first inserted)
-    if len(_api_cache) > _cache_max_size:
-        oldest_key = next(iter(_api_cache))  # Get first key (oldest)
-        del _api_cache[oldest_key]
-        logger.debug("Cache size limit exceeded, evicted oldest entry: %s", oldest_key)
+    _store_cached(cache_key, records, now, etag, last_modified, total)
 
     return records
 
 
-def get_api_metrics() -> Dict[str, Union[int, float]]:
-    """Return API usage metrics."""
+def _iter_pages(
+    resource_id: str,
+    filters: Dict[str, Any] | None = None,
+    sort: str | None = None,
+    distinct: bool = False,
+    fields: List[str] | None = None,
+    page_size: int = API_REQUEST_LIMIT,
+    max_workers: int = PAGE_FETCH_WORKERS,
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Yield every page of a datastore query, in order.
+
+    The first page gives ``result.total``; the remaining pages are then
+    fetched concurrently (at most ``max_workers`` at a time). Without a
+    total, or if the resource grew meanwhile, pages are fetched one after
+    the other until a short page. Each page is cached on its own.
+    """
+    first = _fetch(resource_id, filters, sort, distinct, fields, 0, page_size)
+    yield first
+    if len(first) < page_size:
+        return
+
+    offset = page_size
+    total = _cached_total(
+        _cache_key(resource_id, filters, sort, distinct, fields, 0, page_size)
+    )
+
+    if total is not None and total > offset:
+        offsets = range(offset, total, page_size)
+        logger.debug(
+            "Fetching %d more pages of resource_id=%s (total=%d)",
+            len(offsets),
+            resource_id,
+            total,
+        )
+        executor = ThreadPoolExecutor(max_workers=min(max_workers, len(offsets)))
+        try:
+            futures = [
+                executor.submit(
+                    _fetch, resource_id, filters, sort, distinct, fields, o, page_size
+                )
+                for o in offsets
+            ]
+            # Merge in offset order, whatever order the pages arrive in
+            for future in futures:
+                page = future.result()
+                yield page
+                if len(page) < page_size:
+                    return
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+        offset = offsets[-1] + page_size
+
+    while True:
+        page = _fetch(resource_id, filters, sort, distinct, fields, offset, page_size)
+        yield page
+        if len(page) < page_size:
+            return
+        offset += page_size
+
+
+def iter_records(
+    resource_id: str,
+    *,
+    filters: Dict[str, Any] | None = None,
+    sort: str | None = None,
+    distinct: bool = False,
+    fields: List[str] | None = None,
+    page_size: int = API_REQUEST_LIMIT,
+    max_workers: int = PAGE_FETCH_WORKERS,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yield every record of a datastore query, paging automatically.
+
+    Pages of ``page_size`` records are fetched concurrently once the first
+    page has given the total number of records (at most ``max_workers``
+    requests at a time), cached individually, and yielded in order.
+    """
+    for page in _iter_pages(
+        resource_id, filters, sort, distinct, fields, page_size, max_workers
+    ):
+        yield from page
+
+
+def fetch_all(
+    resource_id: str,
+    *,
+    filters: Dict[str, Any] | None = None,
+    sort: str | None = None,
+    distinct: bool = False,
+    fields: List[str] | None = None,
+    page_size: int = API_REQUEST_LIMIT,
+    max_workers: int = PAGE_FETCH_WORKERS,
+) -> List[Dict[str, Any]]:
+    """
+    Return every record of a datastore query (see ``iter_records``).
+
+    Returns StaleRecords if any page was served stale (see ``configure_cache``).
+    """
+    records: List[Dict[str, Any]] = []
+    stale = False
+
+    for page in _iter_pages(
+        resource_id, filters, sort, distinct, fields, page_size, max_workers
+    ):
+        records.extend(page)
+        stale = stale or isinstance(page, StaleRecords)
+
+    return StaleRecords(records) if stale else records
+
+
+def get_api_metrics() -> Dict[str, Union[int, float, str]]:
+    """
+    Return API usage metrics.
+
+    Counters are also exported, with latency histograms, by
+    ``metrics.render_prometheus()``.
+    """
+    cache_hits = int(metrics.CACHE_LOOKUPS.total(result="hit"))
+    disk_cache_hits = int(metrics.CACHE_LOOKUPS.total(result="disk_hit"))
+    cache_misses = int(metrics.CACHE_LOOKUPS.total(result="miss"))
+    cache_hits += disk_cache_hits
     return {
-        "total_api_requests": total_api_requests,
+        "total_api_requests": int(metrics.API_REQUESTS.total()),
         "cache_hits": cache_hits,
         "cache_misses": cache_misses,
+        "disk_cache_hits": disk_cache_hits,
+        "coalesced_requests": int(metrics.COALESCED_REQUESTS.total()),
+        "revalidated_responses": int(metrics.REVALIDATED_RESPONSES.total()),
+        "stale_responses": int(metrics.STALE_RESPONSES.total()),
+        "background_refreshes": int(metrics.BACKGROUND_REFRESHES.total()),
+        "retried_requests": int(metrics.RETRIES.total()),
+        "response_bytes": int(metrics.RESPONSE_BYTES.total()),
+        "circuit_state": _circuit_breaker.state,
+        "circuit_failures": _circuit_breaker.failures,
+        "circuit_opened": _circuit_breaker.opened,
+        "concurrency_limit": _concurrency_limiter.limit,
+        "concurrency_in_flight": _concurrency_limiter.in_flight,
+        "concurrency_decreases": _concurrency_limiter.decreases,
         "cache_size": len(_api_cache),
-        "cache_max_size": _cache_max_size,
+        "cache_max_size": _api_cache.max_entries,
+        "cache_bytes": _api_cache.size_bytes,
+        "cache_max_bytes": _api_cache.max_bytes or 0,
+        "cache_evictions": _api_cache.evictions,
+        "cache_expirations": _api_cache.expirations,
         "cache_hit_rate": cache_hits / max(1, cache_hits + cache_misses),
     }
 
 
+def reset_api_metrics() -> None:
+    """Zero the API usage counters and latency histograms."""
+    metrics.reset()
+
+
+# State of the client exported with the counters
+metrics.REGISTRY.gauge(
+    "montreal_aqi_circuit_open",
+    "1 while the circuit breaker fails requests fast, else 0",
+    lambda: _circuit_breaker.state == OPEN,
+)
+metrics.REGISTRY.gauge(
+    "montreal_aqi_concurrency_limit",
+    "Requests currently allowed in flight to the API",
+    lambda: _concurrency_limiter.limit,
+)
+metrics.REGISTRY.gauge(
+    "montreal_aqi_concurrency_in_flight",
+    "Requests currently in flight to the API",
+    lambda: _concurrency_limiter.in_flight,
+)
+metrics.REGISTRY.gauge(
+    "montreal_aqi_cache_entries",
+    "Responses in the in-memory cache",
+    lambda: len(_api_cache),
+)
+metrics.REGISTRY.gauge(
+    "montreal_aqi_cache_bytes",
+    "Approximate size of the in-memory cache",
+    lambda: _api_cache.size_bytes,
+)
+
+
 def fetch_latest_station_records(station_id: str) -> List[Dict[str, Any]]:
     """
     Return the latest available records for a given station ID.
@@ -190,24 +1216,286 @@ def fetch_latest_station_records(station_id: str) -> List[Dict[str, Any]]:
     Uses server-side filtering by stationId to fetch data for this station,
     then sorts by heure (as integer) client-side to get the most recent hour.
     Also selects only required fields to minimize data transfer.
+
+    Stations primed by a bulk pull, the poller or an earlier query are served
+    from the cache.
     """
-    # Columns needed for station AQI data
-    fields = ["stationId", "date", "heure", "pollutant", "valeur"]
+    cached = _get_cached(
+        _station_cache_key(station_id), RESID_IQA_PAR_STATION_EN_TEMPS_REEL
+    )
+    if cached is not None:
+        return _filter_latest_hour(cached, station_id)
+
+    if _sql_enabled():
+        by_station = _fetch_latest_sql([station_id])
+        if by_station is not None:
+            latest = by_station.get(station_id, [])
+            if not latest:
+                logger.warning("No records found for station %s", station_id)
+            else:
+                _prime_station_records({station_id: latest})
+            return latest
 
     # Use server-side filtering to fetch only data for this station
     # Note: Not using server-side sort because 'heure' is returned as text,
     # which causes alphabetic sorting instead of numeric sorting
     filters = {"stationId": station_id}
-    records = _fetch(
+    records = fetch_all(
         RESID_IQA_PAR_STATION_EN_TEMPS_REEL,
         filters=filters,
-        fields=fields,
+        fields=STATION_RECORD_FIELDS,
     )
 
     if not records:
         logger.warning("No records found for station %s", station_id)
         return []
 
+    latest_records = _filter_latest_hour(records, station_id)
+    if isinstance(records, StaleRecords):
+        return StaleRecords(latest_records)
+    return latest_records
+
+
+def _prime_station_records(
+    records_by_station: Mapping[str, List[Dict[str, Any]]],
+) -> None:
+    """
+    Cache the latest-hour records of each station, as from a bulk pull.
+
+    fetch_latest_station_records() then serves these stations from the cache
+    instead of querying the API. Stale records are not cached again.
+    """
+    now = time.time()
+
+    for station_id, records in records_by_station.items():
+        if isinstance(records, StaleRecords):
+            continue
+        _store_cached(_station_cache_key(station_id), records, now, total=len(records))
+
+
+def _station_cache_key(station_id: str) -> str:
+    """
+    Cache key of the primed latest-hour records of a station.
+
+    Distinct from the key of any datastore query, so paging queries never
+    read these truncated results.
+    """
+    return f"{LATEST_RECORDS_CACHE_KEY}:{station_id}"
+
+
+def fetch_latest_records_for_stations(
+    station_ids: Iterable[str],
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Return the latest available records of several stations, keyed by ID.
+
+    Sends one request for the whole subset (a list-valued ``stationId``
+    filter, in chunks of STATION_FILTER_CHUNK_SIZE stations) instead of one
+    per station, then keeps each station's latest hour. Stations already
+    cached by fetch_latest_station_records() or a bulk pull are not queried
+    again, and the fetched ones are cached for it.
+
+    Stations without records are left out; the result follows the order of
+    ``station_ids``.
+    """
+    ids = list(dict.fromkeys(str(station_id) for station_id in station_ids))
+
+    # station_id -> (latest hour seen so far, records for that hour)
+    latest: Dict[str, tuple[int, List[Dict[str, Any]]]] = {}
+    missing = []
+    for station_id in ids:
+        cached = _get_cached(
+            _station_cache_key(station_id), RESID_IQA_PAR_STATION_EN_TEMPS_REEL
+        )
+        if cached is not None:
+            _group_latest_records(cached, latest)
+        else:
+            missing.append(station_id)
+
+    stale = False
+    fetched: Dict[str, tuple[int, List[Dict[str, Any]]]] = {}
+
+    by_station = _fetch_latest_sql(missing) if missing and _sql_enabled() else None
+    if by_station is not None:
+        for station_id, records in by_station.items():
+            stale = stale or isinstance(records, StaleRecords)
+            fetched[station_id] = (0, records)
+    else:
+
+        def fetch_chunk(chunk: List[str]) -> List[Dict[str, Any]]:
+            return fetch_all(
+                RESID_IQA_PAR_STATION_EN_TEMPS_REEL,
+                filters={"stationId": chunk},
+                fields=STATION_RECORD_FIELDS,
+            )
+
+        for records in _map_chunks(fetch_chunk, missing):
+            stale = stale or isinstance(records, StaleRecords)
+            _group_latest_records(records, fetched)
+
+    logger.debug(
+        "Fetched latest records for %d of %d stations (%d requested, %d cached)",
+        len(fetched),
+        len(missing),
+        len(ids),
+        len(ids) - len(missing),
+    )
+
+    if stale:
+        latest.update(
+            (station_id, (hour, StaleRecords(records)))
+            for station_id, (hour, records) in fetched.items()
+        )
+    else:
+        latest.update(fetched)
+        _prime_station_records(
+            {station_id: records for station_id, (_, records) in fetched.items()}
+        )
+
+    return {
+        station_id: latest[station_id][1] for station_id in ids if station_id in latest
+    }
+
+
+def _map_chunks(
+    fetch_chunk: Callable[[List[str]], List[Dict[str, Any]]],
+    station_ids: List[str],
+) -> List[List[Dict[str, Any]]]:
+    """Run ``fetch_chunk`` on chunks of STATION_FILTER_CHUNK_SIZE stations."""
+    chunks = [
+        station_ids[start : start + STATION_FILTER_CHUNK_SIZE]
+        for start in range(0, len(station_ids), STATION_FILTER_CHUNK_SIZE)
+    ]
+    if len(chunks) <= 1:
+        return [fetch_chunk(chunk) for chunk in chunks]
+    with ThreadPoolExecutor(
+        max_workers=min(PAGE_FETCH_WORKERS, len(chunks))
+    ) as executor:
+        return list(executor.map(fetch_chunk, chunks))
+
+
+def _sql_enabled() -> bool:
+    """Return True if latest-hour queries should use datastore_search_sql."""
+    return _use_sql and _sql_available is not False
+
+
+def _sql_url() -> str:
+    """URL of datastore_search_sql, next to datastore_search."""
+    return API_URL.rsplit("/", 1)[0] + "/datastore_search_sql"
+
+
+def _sql_literal(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+def _latest_records_sql(station_ids: List[str]) -> str:
+    """
+    Return the SQL selecting the latest-hour records of the given stations.
+
+    ``heure`` is text: it is cast to compare hours numerically, and the
+    latest hour of each station comes from a correlated ``max()`` subquery.
+
+    Raises:
+        ValueError: If a station ID is not made of digits.
+    """
+    if not all(station_id.isdigit() for station_id in station_ids):
+        raise ValueError(f"Station IDs must be numeric: {station_ids}")
+
+    resource = RESID_IQA_PAR_STATION_EN_TEMPS_REEL
+    columns = ", ".join(f'r."{field}"' for field in STATION_RECORD_FIELDS)
+    ids = ", ".join(_sql_literal(station_id) for station_id in station_ids)
+    # Only constants and numeric IDs, quoted by _sql_literal, are interpolated
+    return (
+        f'SELECT {columns} FROM "{resource}" r '  # nosec B608
+        f'WHERE r."stationId" IN ({ids}) '
+        f'AND r."heure"::int = (SELECT max(l."heure"::int) FROM "{resource}" l '
+        f'WHERE l."stationId" = r."stationId")'
+    )
+
+
+def _sql_request_params(sql: str) -> list[tuple[str, str]]:
+    """Return the query string parameters of a datastore_search_sql request."""
+    logger.debug("SQL: %s", sql)
+    return [("sql", sql)]
+
+
+def _fetch_sql(sql: str) -> List[Dict[str, Any]]:
+    """
+    Run a datastore_search_sql query, cached like any other query.
+
+    Client errors (4xx) are logged at debug level: the caller falls back to
+    datastore_search and logs why.
+    """
+    resource_id = RESID_IQA_PAR_STATION_EN_TEMPS_REEL
+    request = _Request(
+        resource_id,
+        partial(_sql_request_params, sql),
+        url=_sql_url(),
+        expected_statuses=_SQL_CLIENT_ERRORS,
+    )
+    return _fetch_cached(f"{resource_id}:sql:{sql}", request)
+
+
+def _fetch_latest_sql(
+    station_ids: List[str],
+) -> Dict[str, List[Dict[str, Any]]] | None:
+    """
+    Return the latest-hour records of stations selected server-side with SQL.
+
+    Returns None if the SQL endpoint answers a client error (4xx), and stops
+    using SQL for the process if that error means SQL queries are not
+    allowed (400, 403, 404). Also returns None if the portal is unreachable
+    while stale responses may be served instead, and for non-numeric station
+    IDs, which are not interpolated in SQL: datastore_search filters them
+    safely.
+    """
+    global _sql_available
+
+    if not all(station_id.isdigit() for station_id in station_ids):
+        return None
+
+    try:
+        results = _map_chunks(
+            lambda chunk: _fetch_sql(_latest_records_sql(chunk)), station_ids
+        )
+    except APIInvalidResponse as exc:
+        cause = exc.__cause__
+        status = cause.status if isinstance(cause, TransportError) else None
+        if status not in _SQL_CLIENT_ERRORS:
+            raise
+        if status in _SQL_UNAVAILABLE_STATUSES:
+            logger.info(
+                "datastore_search_sql unavailable, using datastore_search: %s", exc
+            )
+            _sql_available = False
+        else:
+            logger.warning("SQL query rejected, using datastore_search for it: %s", exc)
+        return None
+    except APIServerUnreachable:
+        if _serve_stale:
+            return None
+        raise
+
+    _sql_available = True
+
+    latest: Dict[str, tuple[int, List[Dict[str, Any]]]] = {}
+    for records in results:
+        _group_latest_records(records, latest)
+
+    if any(isinstance(records, StaleRecords) for records in results):
+        return {
+            station_id: StaleRecords(records)
+            for station_id, (_, records) in latest.items()
+        }
+    return {station_id: records for station_id, (_, records) in latest.items()}
+
+
+def _filter_latest_hour(
+    records: List[Dict[str, Any]], station_id: str
+) -> List[Dict[str, Any]]:
+    """
+    Return the records of a single station that belong to its latest hour.
+    """
     # Sort records by hour (as integer) in descending order client-side
     # to get the most recent data
     try:
@@ -236,6 +1524,117 @@ def fetch_latest_station_records(station_id: str) -> List[Dict[str, Any]]:
     return latest_records
 
 
+def _group_latest_records(
+    records: Iterable[Dict[str, Any]],
+    latest: Dict[str, tuple[int, List[Dict[str, Any]]]],
+) -> int:
+    """
+    Merge records into the latest-hour group of their station.
+
+    ``latest`` maps station IDs to (latest hour seen so far, records for that
+    hour). Returns the number of records read.
+    """
+    count = 0
+    for record in records:
+        count += 1
+        station_id = record.get("stationId")
+        if station_id is None:
+            continue
+        try:
+            hour = int(record["heure"])
+        except (KeyError, ValueError, TypeError):
+            logger.debug("Skipping record with invalid 'heure': %s", record)
+            continue
+
+        station_id = str(station_id)
+        current = latest.get(station_id)
+        if current is None or hour > current[0]:
+            latest[station_id] = (hour, [record])
+        elif hour == current[0]:
+            current[1].append(record)
+
+    return count
+
+
+def fetch_all_latest_records(
+    *, stream: bool = False
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Return the latest available records for every station, keyed by station ID.
+
+    Pages through the whole real-time resource (API_REQUEST_LIMIT records per
+    request) instead of issuing one filtered query per station, and keeps only
+    the records of each station's latest hour while grouping, in a single pass.
+
+    Args:
+        stream: Decode each page incrementally and group records as they
+            arrive (see ``stream_records``). Only the latest-hour records are
+            kept and cached, instead of whole pages, so memory use does not
+            grow with the page size.
+    """
+    # station_id -> (latest hour seen so far, records for that hour)
+    latest: Dict[str, tuple[int, List[Dict[str, Any]]]] = {}
+    stale = False
+
+    cached = None
+    if stream:
+        cached = _get_cached(
+            LATEST_RECORDS_CACHE_KEY, RESID_IQA_PAR_STATION_EN_TEMPS_REEL
+        )
+
+    if cached is not None:
+        _group_latest_records(cached, latest)
+    else:
+        fetched_at = time.time()
+        pages = 0
+        if stream:
+            offset = 0
+            while True:
+                count = _group_latest_records(
+                    stream_records(
+                        RESID_IQA_PAR_STATION_EN_TEMPS_REEL,
+                        fields=STATION_RECORD_FIELDS,
+                        offset=offset,
+                        limit=API_REQUEST_LIMIT,
+                    ),
+                    latest,
+                )
+                pages += 1
+                # A short page means we reached the end of the resource
+                if count < API_REQUEST_LIMIT:
+                    break
+                offset += API_REQUEST_LIMIT
+        else:
+            # Pages after the first one are fetched concurrently
+            for page in _iter_pages(
+                RESID_IQA_PAR_STATION_EN_TEMPS_REEL,
+                fields=STATION_RECORD_FIELDS,
+                page_size=API_REQUEST_LIMIT,
+            ):
+                stale = stale or isinstance(page, StaleRecords)
+                _group_latest_records(page, latest)
+                pages += 1
+
+        logger.debug(
+            "Fetched latest records for %d stations (%d pages)", len(latest), pages
+        )
+
+        if stream:
+            _store_cached(
+                LATEST_RECORDS_CACHE_KEY,
+                [record for _, records in latest.values() for record in records],
+                fetched_at,
+            )
+
+    if stale:
+        # A stale page may hold outdated records for any station
+        return {
+            station_id: StaleRecords(records)
+            for station_id, (_, records) in latest.items()
+        }
+    return {station_id: records for station_id, (_, records) in latest.items()}
+
+
 def fetch_open_stations() -> List[Dict[str, Any]]:
     """
     Return a list of currently open monitoring stations.
@@ -244,13 +1643,21 @@ def fetch_open_stations() -> List[Dict[str, Any]]:
     reducing the number of records processed client-side. Also selects only required
     fields to minimize data transfer.
     """
-    # Columns needed for station list data
-    fields = ["numero_station", "nom", "adresse", "arrondissement_ville"]
-
     # Use server-side filtering to fetch only open stations
-    filters = {"statut": "ouvert"}
-    records = _fetch(RESID_LIST, filters=filters, fields=fields)
+    records = fetch_all(
+        RESID_LIST, filters=OPEN_STATION_FILTERS, fields=OPEN_STATION_FIELDS
+    )
+
+    stations = _open_stations_from_records(records)
 
+    logger.info("Found %d open stations", len(stations))
+    return stations
+
+
+def _open_stations_from_records(
+    records: List[Dict[str, Any]],
+) -> List[Dict[str, Any]]:
+    """Map raw station list records to the public station dict shape."""
     stations: List[Dict[str, Any]] = []
 
     for r in records:
@@ -263,5 +1670,4 @@ def fetch_open_stations() -> List[Dict[str, Any]]:
             }
         )
 
-    logger.info("Found %d open stations", len(stations))
     return stations
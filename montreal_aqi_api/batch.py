@@ -0,0 +1,404 @@
+"""
+Compact storage for the AQI of many stations and hours.
+
+A :class:`StationBatch` keeps one row per (station, date, hour) and one row
+per pollutant in flat ``array`` columns, instead of a ``Station`` holding a
+dict of ``Pollutant`` objects each. Pollutant metadata (full name, unit,
+reference value) is interned once per batch. Iterating or indexing returns
+light views that behave like ``Station`` and ``Pollutant``::
+
+    batch = StationBatch.from_records(records)
+    for station in batch:
+        print(station.station_id, station.timestamp, station.aqi)
+"""
+
+from __future__ import annotations
+
+import logging
+from array import array
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from datetime import date, datetime
+from typing import TYPE_CHECKING, Any, Dict, List, Tuple
+from zoneinfo import ZoneInfo
+
+from montreal_aqi_api._internal.parsing import parse_pollutants
+from montreal_aqi_api.config import REFERENCE_VALUES, TIMEZONE
+from montreal_aqi_api.pollutants import Pollutant
+from montreal_aqi_api.station import Station
+
+if TYPE_CHECKING:
+    from montreal_aqi_api.history import Reading
+
+logger = logging.getLogger(__name__)
+
+# Range of the int16 AQI column
+_AQI_MIN = -(2**15)
+_AQI_MAX = 2**15 - 1
+
+
+class PollutantView:
+    """Read-only view of one pollutant row of a StationBatch."""
+
+    __slots__ = ("_batch", "_row")
+
+    def __init__(self, batch: StationBatch, row: int) -> None:
+        self._batch = batch
+        self._row = row
+
+    @property
+    def name(self) -> str:
+        return self._batch._codes[self._batch._code[self._row]]
+
+    @property
+    def fullname(self) -> str:
+        return self._batch._fullnames[self._batch._code[self._row]]
+
+    @property
+    def unit(self) -> str:
+        return self._batch._units[self._batch._code[self._row]]
+
+    @property
+    def aqi(self) -> int:
+        return self._batch._aqi[self._row]
+
+    @property
+    def concentration(self) -> float:
+        # Derived from the interned reference, exactly as parse_pollutants()
+        reference = self._batch._references[self._batch._code[self._row]]
+        return (self.aqi / 100.0) * reference
+
+    def to_pollutant(self) -> Pollutant:
+        """Return a standalone Pollutant with the same values."""
+        return Pollutant(
+            name=self.name,
+            fullname=self.fullname,
+            unit=self.unit,
+            aqi=self.aqi,
+            concentration=self.concentration,
+        )
+
+    def to_dict(self) -> Dict[str, str | int | float]:
+        return self.to_pollutant().to_dict()
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, PollutantView):
+            return self.to_pollutant() == other.to_pollutant()
+        if isinstance(other, Pollutant):
+            return self.to_pollutant() == other
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"PollutantView(name={self.name!r}, aqi={self.aqi})"
+
+
+class StationView:
+    """Read-only view of one (station, date, hour) of a StationBatch."""
+
+    __slots__ = ("_batch", "_group")
+
+    def __init__(self, batch: StationBatch, group: int) -> None:
+        self._batch = batch
+        self._group = group
+
+    def _rows(self) -> range:
+        starts = self._batch._starts
+        return range(starts[self._group], starts[self._group + 1])
+
+    @property
+    def station_id(self) -> str:
+        return self._batch._station_ids[self._batch._station[self._group]]
+
+    @property
+    def date(self) -> str:
+        return self._batch._dates[self._batch._date[self._group]]
+
+    @property
+    def hour(self) -> int:
+        return self._batch._hour[self._group]
+
+    @property
+    def timestamp(self) -> str:
+        day = date.fromisoformat(self.date)
+        return datetime(
+            day.year, day.month, day.day, self.hour, tzinfo=ZoneInfo(TIMEZONE)
+        ).isoformat()
+
+    @property
+    def stale(self) -> bool:
+        return bool(self._batch._stale[self._group])
+
+    @property
+    def pollutants(self) -> Dict[str, PollutantView]:
+        return {
+            self._batch._codes[self._batch._code[row]]: PollutantView(self._batch, row)
+            for row in self._rows()
+        }
+
+    @property
+    def aqi(self) -> int:
+        return max(self._batch._aqi[row] for row in self._rows())
+
+    @property
+    def main_pollutant(self) -> str:
+        # First pollutant with the highest AQI, as Station.main_pollutant
+        batch = self._batch
+        row = max(self._rows(), key=lambda row: batch._aqi[row])
+        return batch._codes[batch._code[row]]
+
+    def to_station(self) -> Station:
+        """Return a standalone Station with the same values."""
+        return Station(
+            station_id=self.station_id,
+            date=self.date,
+            hour=self.hour,
+            timestamp=self.timestamp,
+            pollutants={
+                code: view.to_pollutant() for code, view in self.pollutants.items()
+            },
+            stale=self.stale,
+        )
+
+    def to_dict(self) -> dict[str, object]:
+        return self.to_station().to_dict()
+
+    def __repr__(self) -> str:
+        return (
+            f"StationView(station_id={self.station_id!r}, date={self.date!r}, "
+            f"hour={self.hour})"
+        )
+
+
+class StationBatch(Sequence[StationView]):
+    """
+    Struct-of-arrays store of station AQI, one entry per (station, date, hour).
+
+    Each entry owns a contiguous range of pollutant rows, in the order the
+    pollutants were first seen (like the ``Station.pollutants`` dict). Per
+    entry: station index, date index, hour, stale flag and first row offset;
+    per pollutant row: code index and AQI (int16). Concentrations are derived
+    from the AQI and the interned reference value on access.
+
+    Entries are appended with :meth:`append` or built with one of the
+    ``from_*`` constructors.
+    """
+
+    def __init__(self) -> None:
+        self._station_ids: List[str] = []
+        self._station_index: Dict[str, int] = {}
+        self._dates: List[str] = []
+        self._date_index: Dict[str, int] = {}
+
+        self._codes: List[str] = []
+        self._code_index: Dict[str, int] = {}
+        self._fullnames: List[str] = []
+        self._units: List[str] = []
+        self._references: List[float] = []
+
+        # Per (station, date, hour) entry
+        self._station = array("I")
+        self._date = array("I")
+        self._hour = array("b")
+        self._stale = array("b")
+        self._starts = array("I", [0])
+
+        # Per pollutant row
+        self._code = array("B")
+        self._aqi = array("h")
+
+    @classmethod
+    def from_stations(cls, stations: Iterable[Station]) -> StationBatch:
+        """Build a batch from Station objects."""
+        batch = cls()
+        for station in stations:
+            batch.append(
+                station.station_id,
+                station.date,
+                station.hour,
+                [(code, p.aqi) for code, p in station.pollutants.items()],
+                stale=station.stale,
+            )
+        return batch
+
+    @classmethod
+    def from_records(cls, records: Iterable[Mapping[str, Any]]) -> StationBatch:
+        """
+        Build a batch from raw real-time records of any stations and hours.
+
+        Records are grouped by (stationId, date, heure) and parsed like
+        ``parse_pollutants()``; groups without valid pollutants are skipped.
+        """
+        groups: Dict[Tuple[str, str, int], List[Mapping[str, Any]]] = {}
+        for record in records:
+            key = _record_key(record)
+            if key is not None:
+                groups.setdefault(key, []).append(record)
+
+        batch = cls()
+        for (station_id, day, hour), group in groups.items():
+            pollutants = parse_pollutants(group)
+            batch.append(
+                station_id, day, hour, [(code, p.aqi) for code, p in pollutants.items()]
+            )
+        return batch
+
+    @classmethod
+    def from_readings(cls, readings: Iterable[Reading]) -> StationBatch:
+        """Build a batch from history readings (see ``history.HistoryStore``)."""
+        groups: Dict[Tuple[str, str, int], Dict[str, int]] = {}
+        for reading in readings:
+            key = (reading.station_id, reading.date, reading.hour)
+            pollutants = groups.setdefault(key, {})
+            if reading.aqi > pollutants.get(reading.pollutant, _AQI_MIN - 1):
+                pollutants[reading.pollutant] = reading.aqi
+
+        batch = cls()
+        for (station_id, day, hour), pollutants in groups.items():
+            batch.append(station_id, day, hour, pollutants.items())
+        return batch
+
+    def append(
+        self,
+        station_id: str,
+        day: str,
+        hour: int,
+        pollutants: Iterable[Tuple[str, int]],
+        *,
+        stale: bool = False,
+    ) -> bool:
+        """
+        Append one (station, date, hour) entry from (code, aqi) pairs.
+
+        Pollutants without reference values or with an AQI outside the int16
+        range are skipped. Returns False (and appends nothing) when no
+        pollutant is left.
+        """
+        rows = 0
+        for code, aqi in pollutants:
+            code_index = self._intern_code(code)
+            if code_index is None or not _AQI_MIN <= aqi <= _AQI_MAX:
+                logger.debug("Skipping pollutant %s (AQI=%s) in batch", code, aqi)
+                continue
+            self._code.append(code_index)
+            self._aqi.append(aqi)
+            rows += 1
+
+        if rows == 0:
+            return False
+
+        self._station.append(
+            _intern(station_id, self._station_ids, self._station_index)
+        )
+        self._date.append(_intern(day, self._dates, self._date_index))
+        self._hour.append(hour)
+        self._stale.append(stale)
+        self._starts.append(len(self._code))
+        return True
+
+    def _intern_code(self, code: str) -> int | None:
+        index = self._code_index.get(code)
+        if index is not None:
+            return index
+
+        ref_info = REFERENCE_VALUES.get(code)
+        if ref_info is None:
+            return None
+        fullname = ref_info.get("fullname")
+        reference = ref_info.get("ref")
+        unit = ref_info.get("unit")
+        if (
+            not isinstance(fullname, str)
+            or not isinstance(reference, (int, float))
+            or not isinstance(unit, str)
+        ):
+            return None
+
+        index = len(self._codes)
+        self._codes.append(code)
+        self._fullnames.append(fullname)
+        self._units.append(unit)
+        self._references.append(float(reference))
+        self._code_index[code] = index
+        return index
+
+    def __len__(self) -> int:
+        return len(self._station)
+
+    def __getitem__(self, index: int) -> StationView:  # type: ignore[override]
+        if not isinstance(index, int):
+            raise TypeError("StationBatch indices must be integers")
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("StationBatch index out of range")
+        return StationView(self, index)
+
+    def __iter__(self) -> Iterator[StationView]:
+        for group in range(len(self)):
+            yield StationView(self, group)
+
+    @property
+    def station_ids(self) -> List[str]:
+        """IDs of the stations in the batch, in order of appearance."""
+        return list(self._station_ids)
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the array columns, in bytes."""
+        columns = (
+            self._station,
+            self._date,
+            self._hour,
+            self._stale,
+            self._starts,
+            self._code,
+            self._aqi,
+        )
+        return sum(column.itemsize * len(column) for column in columns)
+
+    def for_station(self, station_id: str) -> List[StationView]:
+        """Return the entries of one station, in batch order."""
+        index = self._station_index.get(station_id)
+        if index is None:
+            return []
+        return [
+            StationView(self, group)
+            for group, station in enumerate(self._station)
+            if station == index
+        ]
+
+    def latest(self, station_id: str) -> StationView | None:
+        """Return the most recent entry of a station, or None."""
+        entries = self.for_station(station_id)
+        if not entries:
+            return None
+        return max(entries, key=lambda view: (view.date, view.hour))
+
+
+def _intern(value: str, values: List[str], index: Dict[str, int]) -> int:
+    position = index.get(value)
+    if position is None:
+        position = len(values)
+        values.append(value)
+        index[value] = position
+    return position
+
+
+def _record_key(record: Mapping[str, Any]) -> Tuple[str, str, int] | None:
+    """Return the (station, date, hour) of a raw record, or None if invalid."""
+    station_id = record.get("stationId")
+    raw_date = record.get("date")
+    raw_hour = record.get("heure")
+    if station_id is None or not isinstance(raw_date, str):
+        return None
+    if not isinstance(raw_hour, (int, str)):
+        return None
+
+    try:
+        day = date.fromisoformat(raw_date).isoformat()
+        hour = int(raw_hour)
+    except ValueError:
+        return None
+
+    if not 0 <= hour <= 23:
+        return None
+    return str(station_id), day, hour
@@ -1,27 +1,67 @@
 from __future__ import annotations
 
 import argparse
-import json
 import logging
-from typing import Any
+from typing import TYPE_CHECKING, Any, Callable, Iterator, Mapping
 
-from montreal_aqi_api import get_station_aqi, list_open_stations
-from montreal_aqi_api._internal.utils import get_version
-from montreal_aqi_api.config import CONTRACT_VERSION
+from montreal_aqi_api._internal import jsonenc
+from montreal_aqi_api._version import __version__
+from montreal_aqi_api.config import CONTRACT_VERSION, SERVE_HOST, SERVE_PORT
 from montreal_aqi_api.exceptions import (
     APIInvalidResponse,
     APIServerUnreachable,
     MontrealAQIError,
 )
 
+if TYPE_CHECKING:
+    from montreal_aqi_api.station import Station
+
 logger = logging.getLogger(__name__)
 
 
-def _print_json(payload: dict[str, Any], *, pretty: bool) -> None:
-    if pretty:
-        print(json.dumps(payload, ensure_ascii=False, indent=2))
-    else:
-        print(json.dumps(payload, ensure_ascii=False))
+# The API client (and requests) is only imported once a command needs it,
+# so --version, --help and argument errors return immediately
+
+
+def get_station_aqi(station_id: str) -> Station | None:
+    from montreal_aqi_api.service import get_station_aqi
+
+    return get_station_aqi(station_id)
+
+
+def iter_stations_aqi(
+    station_ids: list[str], get_station: Callable[[str], Station | None]
+) -> Iterator[tuple[int, Station | None]]:
+    from montreal_aqi_api.service import iter_stations_aqi
+
+    return iter_stations_aqi(station_ids, get_station=get_station)
+
+
+def list_open_stations() -> list[dict[str, Any]]:
+    from montreal_aqi_api.service import list_open_stations
+
+    return list_open_stations()
+
+
+def enable_disk_cache(cache_dir: str | None = None) -> None:
+    from montreal_aqi_api.api import enable_disk_cache
+
+    enable_disk_cache(cache_dir)
+
+
+def disable_disk_cache() -> None:
+    from montreal_aqi_api.api import disable_disk_cache
+
+    disable_disk_cache()
+
+
+def _print_json(payload: Mapping[str, Any], *, pretty: bool) -> None:
+    print(jsonenc.dumps(payload, pretty=pretty).decode("utf-8"))
+
+
+def _print_ndjson(payload: Mapping[str, Any]) -> None:
+    # Flushed line by line so downstream pipes get each object right away
+    print(jsonenc.dumps(payload).decode("utf-8"), flush=True)
 
 
 def _validate_station_id(station_id: str) -> None:
@@ -31,8 +71,8 @@ def _validate_station_id(station_id: str) -> None:
         raise ValueError("Station ID must be numeric")
 
 
-def _error(code: str, message: str, *, pretty: bool) -> None:
-    payload: dict[str, Any] = {
+def _error_payload(code: str, message: str) -> dict[str, Any]:
+    return {
         "version": str(CONTRACT_VERSION),
         "type": "error",
         "error": {
@@ -40,7 +80,144 @@ def _error(code: str, message: str, *, pretty: bool) -> None:
             "message": message,
         },
     }
-    _print_json(payload, pretty=pretty)
+
+
+def _error(code: str, message: str, *, pretty: bool) -> None:
+    _print_json(_error_payload(code, message), pretty=pretty)
+
+
+def _stations_list_payload(stations: list[dict[str, Any]]) -> dict[str, Any]:
+    return {
+        "version": str(CONTRACT_VERSION),
+        "type": "stations",
+        "stations": stations,
+    }
+
+
+def _station_ids_error(station_ids: list[str]) -> dict[str, Any] | None:
+    """Return the error payload of the first invalid station ID, if any."""
+    if not station_ids:
+        return _error_payload("INVALID_STATION_ID", "No valid station IDs provided")
+
+    for sid in station_ids:
+        try:
+            _validate_station_id(sid)
+        except ValueError as exc:
+            return _error_payload(
+                "INVALID_STATION_ID", f"Invalid station ID '{sid}': {exc}"
+            )
+    return None
+
+
+def _no_data_payload(station_id: str) -> dict[str, Any]:
+    return _error_payload("NO_DATA", f"No data available for station {station_id}")
+
+
+def _station_payload(station: Station) -> Mapping[str, Any]:
+    head = {"version": str(CONTRACT_VERSION), "type": "station"}
+    # Reuse the station's own encoding; the dict is only built if read
+    return jsonenc.Encoded(
+        head, station.to_dict, jsonenc.merge(head, station.to_json_bytes())
+    )
+
+
+def _stations_aqi_payload(stations: list[Station]) -> Mapping[str, Any]:
+    head = {"version": str(CONTRACT_VERSION), "type": "stations"}
+    encoded_stations = jsonenc.array(station.to_json_bytes() for station in stations)
+    return jsonenc.Encoded(
+        head,
+        lambda: {"stations": [station.to_dict() for station in stations]},
+        jsonenc.merge(head, b'{"stations": ' + encoded_stations + b"}"),
+    )
+
+
+def _station_aqi_payload(
+    station_ids: list[str],
+    get_station: Callable[[str], Station | None],
+) -> Mapping[str, Any]:
+    """
+    Return the station(s) payload of the given IDs, or an error payload.
+
+    Stations are fetched concurrently. The first invalid ID, or the first
+    station without data (in input order), gives an error payload. API
+    errors are raised to the caller.
+    """
+    error = _station_ids_error(station_ids)
+    if error is not None:
+        return error
+
+    stations: list[Station | None] = [None] * len(station_ids)
+    for index, station in iter_stations_aqi(station_ids, get_station):
+        stations[index] = station
+
+    for sid, station in zip(station_ids, stations):
+        if station is None:
+            return _no_data_payload(sid)
+
+    if len(stations) == 1:
+        return _station_payload(stations[0])  # type: ignore[arg-type]
+    return _stations_aqi_payload(stations)  # type: ignore[arg-type]
+
+
+def _station_ndjson_payloads(
+    station_ids: list[str],
+    get_station: Callable[[str], Station | None],
+) -> Iterator[Mapping[str, Any]]:
+    """
+    Yield one payload per station as soon as it is fetched.
+
+    Each line is a "station" payload, or a "NO_DATA" error payload for a
+    station without data. An invalid ID yields one error and nothing else.
+    API errors are raised to the caller.
+    """
+    error = _station_ids_error(station_ids)
+    if error is not None:
+        yield error
+        return
+
+    for index, station in iter_stations_aqi(station_ids, get_station):
+        if station is None:
+            yield _no_data_payload(station_ids[index])
+        else:
+            yield _station_payload(station)
+
+
+def _add_cache_arguments(
+    parser: argparse.ArgumentParser, *, subcommand: bool = False
+) -> None:
+    # A subcommand's copies have no default, so they do not reset the
+    # values given before the subcommand (e.g. `--no-cache serve`)
+    cache_group = parser.add_mutually_exclusive_group()
+    cache_group.add_argument(
+        "--cache-dir",
+        type=str,
+        default=argparse.SUPPRESS if subcommand else None,
+        help="Directory of the persistent response cache "
+        "(default: $XDG_CACHE_HOME/montreal-aqi-api)",
+    )
+    cache_group.add_argument(
+        "--no-cache",
+        action="store_true",
+        default=argparse.SUPPRESS if subcommand else False,
+        help="Do not use the persistent response cache",
+    )
+
+
+def _serve(args: argparse.Namespace) -> None:
+    # Imported here so one-shot invocations do not load the HTTP server
+    from montreal_aqi_api.server import serve
+
+    if not args.no_cache:
+        enable_disk_cache(args.cache_dir)
+    try:
+        serve(
+            host=args.host,
+            port=args.port,
+            socket_path=args.socket,
+            prefetch=not args.no_prefetch,
+        )
+    finally:
+        disable_disk_cache()
 
 
 def main() -> None:
@@ -54,18 +231,62 @@ def main() -> None:
     parser.add_argument(
         "--pretty", action="store_true", help="Pretty print JSON output"
     )
+    parser.add_argument(
+        "--format",
+        choices=("json", "ndjson"),
+        default="json",
+        help="json: one payload (default); ndjson: one line per station, "
+        "written as soon as it is fetched",
+    )
     parser.add_argument("--debug", action="store_true")
     parser.add_argument("--quiet", action="store_true", help="Suppress JSON output")
     parser.add_argument("--verbose", action="store_true", help="Enable verbose logging")
-    parser.add_argument("--version", action="version", version=get_version())
+    parser.add_argument("--version", action="version", version=__version__)
+    _add_cache_arguments(parser)
+
+    subparsers = parser.add_subparsers(dest="command")
+    serve_parser = subparsers.add_parser(
+        "serve",
+        help="Serve the JSON payloads over a local HTTP port or Unix socket",
+    )
+    serve_parser.add_argument(
+        "--host", default=SERVE_HOST, help=f"Interface to bind (default: {SERVE_HOST})"
+    )
+    serve_parser.add_argument(
+        "--port", type=int, default=SERVE_PORT, help=f"Port (default: {SERVE_PORT})"
+    )
+    serve_parser.add_argument(
+        "--socket", type=str, help="Listen on this Unix socket instead of TCP"
+    )
+    serve_parser.add_argument(
+        "--no-prefetch",
+        action="store_true",
+        help="Do not keep open stations warm in the background",
+    )
+    serve_parser.add_argument("--debug", action="store_true", default=argparse.SUPPRESS)
+    serve_parser.add_argument(
+        "--verbose",
+        action="store_true",
+        default=argparse.SUPPRESS,
+        help="Enable verbose logging",
+    )
+    _add_cache_arguments(serve_parser, subcommand=True)
 
     args, _ = parser.parse_known_args()
+    if args.format == "ndjson":
+        # One object per line, errors included
+        args.pretty = False
 
     logging.basicConfig(
         level=logging.DEBUG if args.verbose or args.debug else logging.INFO,
         format="%(asctime)s - %(levelname)s - %(message)s",
     )
 
+    # ---- Long-running server
+    if args.command == "serve":
+        _serve(args)
+        return
+
     # ---- No arguments
     if not args.station and not args.list:
         logger.error("No arguments provided")
@@ -76,64 +297,26 @@ def main() -> None:
         )
         return
 
+    # Share a warm cache between short-lived invocations (cron jobs, scripts)
+    if not args.no_cache:
+        enable_disk_cache(args.cache_dir)
+
     try:
         if args.list:
-            stations_payload = {
-                "version": str(CONTRACT_VERSION),
-                "type": "stations",
-                "stations": list_open_stations(),
-            }
+            stations_payload = _stations_list_payload(list_open_stations())
             if not args.quiet:
                 _print_json(stations_payload, pretty=args.pretty)
             return
 
         if args.station:
             station_ids = [s.strip() for s in args.station.split(",") if s.strip()]
-            if not station_ids:
-                if not args.quiet:
-                    _error(
-                        code="INVALID_STATION_ID",
-                        message="No valid station IDs provided",
-                        pretty=args.pretty,
-                    )
+            if args.format == "ndjson":
+                for payload in _station_ndjson_payloads(station_ids, get_station_aqi):
+                    if not args.quiet:
+                        _print_ndjson(payload)
                 return
 
-            stations_data = []
-            for sid in station_ids:
-                try:
-                    _validate_station_id(sid)
-                except ValueError as exc:
-                    if not args.quiet:
-                        _error(
-                            code="INVALID_STATION_ID",
-                            message=f"Invalid station ID '{sid}': {exc}",
-                            pretty=args.pretty,
-                        )
-                    return
-
-                station = get_station_aqi(sid)
-                if station is None:
-                    if not args.quiet:
-                        _error(
-                            code="NO_DATA",
-                            message=f"No data available for station {sid}",
-                            pretty=args.pretty,
-                        )
-                    return
-                stations_data.append(station.to_dict())
-
-            if len(stations_data) == 1:
-                station_payload = {
-                    "version": str(CONTRACT_VERSION),
-                    "type": "station",
-                    **stations_data[0],
-                }
-            else:
-                station_payload = {
-                    "version": str(CONTRACT_VERSION),
-                    "type": "stations",
-                    "stations": stations_data,
-                }
+            station_payload = _station_aqi_payload(station_ids, get_station_aqi)
             if not args.quiet:
                 _print_json(station_payload, pretty=args.pretty)
 
@@ -161,6 +344,9 @@ def main() -> None:
         )
         raise SystemExit(1)
 
+    finally:
+        disable_disk_cache()
+
     # ---- List stations
     # if args.list:
     #     stations_payload: dict[str, Any] = {
@@ -6,15 +6,71 @@ RESID_LIST = "29db5545-89a4-4e4a-9e95-05aa6dc2fd80"
 RESID_IQA_PAR_STATION_EN_TEMPS_REEL = "f4eca3bf-5ded-4d3c-a8dc-ed42486498f3"
 
 API_TIMEOUT_SECONDS: int = 10
+# Connections kept open by the HTTP transport; at least the number of
+# concurrent requests (the concurrency limit below, parallel pages)
+HTTP_POOL_SIZE: int = 20
+# Requests in flight to the API adapt (AIMD) between these bounds, halving
+# on errors or when latency exceeds CONCURRENCY_LATENCY_TOLERANCE times the
+# uncongested latency
+CONCURRENCY_INITIAL: int = 5
+CONCURRENCY_MIN: int = 1
+CONCURRENCY_MAX: int = HTTP_POOL_SIZE
+CONCURRENCY_LATENCY_TOLERANCE: float = 2.0
 API_REQUEST_LIMIT: int = 1000
+# Maximum number of pages of a query fetched concurrently
+PAGE_FETCH_WORKERS: int = 4
+# Stations per request of a multi-station query (keeps the URL short)
+STATION_FILTER_CHUNK_SIZE: int = 50
+# Fetch only the latest-hour rows of stations with datastore_search_sql
+# (falls back to datastore_search if the portal does not allow SQL queries)
+QUERY_USE_SQL: bool = True
+# Size of the body chunks decoded by streamed requests
+STREAM_CHUNK_SIZE: int = 64 * 1024
 MAX_RETRIES = 3
+# Retries back off exponentially from RETRY_BACKOFF_SECONDS (with jitter)
 RETRY_BACKOFF_SECONDS = 1.0
+RETRY_MAX_BACKOFF_SECONDS = 30.0
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+# Fail fast for CIRCUIT_COOLDOWN_SECONDS after this many failed requests in a row
+CIRCUIT_FAILURE_THRESHOLD = 5
+CIRCUIT_COOLDOWN_SECONDS = 30.0
+
+# Connection pool used by the asyncio client (montreal_aqi_api.aio)
+ASYNC_POOL_SIZE: int = 20
+ASYNC_LIMIT_PER_HOST: int = 5
+
+# Poller: once hour H is stored, hour H+1 is polled this long after H+1
+# starts (e.g. 14:10 for the 14:00 readings), and polled again every
+# POLL_RETRY_SECONDS until it appears (or after errors)
+POLL_PUBLISH_DELAY_SECONDS: int = 600
+POLL_RETRY_SECONDS: int = 300
+
+# Local endpoint of "montreal-aqi serve"
+SERVE_HOST = "127.0.0.1"
+SERVE_PORT: int = 8765
 
 USER_AGENT = (
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:152.0) Gecko/20100101 Firefox/152.0"
 )
 
 CACHE_TTL_SECONDS = 300
+CACHE_MAX_ENTRIES: int = 100
+CACHE_MAX_BYTES: int = 16 * 1024 * 1024
+CACHE_SWEEP_INTERVAL_SECONDS: int = 60
+# Expired responses are kept this long to revalidate them (ETag/Last-Modified)
+CACHE_STALE_TTL_SECONDS: int = 3600
+# Upper bound of the hour-aware freshness of real-time records
+CACHE_MAX_FRESHNESS_SECONDS: int = 3600
+# Serve expired responses immediately and refresh them in the background
+CACHE_SERVE_STALE: bool = False
+
+# Parsed Station objects are reused while the records of their station and
+# data hour are unchanged; older hours are dropped after the TTL
+STATION_CACHE_MAX_ENTRIES: int = 500
+STATION_CACHE_TTL_SECONDS: int = 7200
+
+# Timezone of the dates and hours published by the RSQA
+TIMEZONE = "America/Toronto"
 
 POLLUTANT_ALIASES = {
     "PM": "PM2.5",
@@ -6,5 +6,9 @@ class APIServerUnreachable(MontrealAQIError):
     """Montreal open data API is unreachable."""
 
 
+class CircuitOpenError(APIServerUnreachable):
+    """Requests fail fast after repeated failures of the API (circuit open)."""
+
+
 class APIInvalidResponse(MontrealAQIError):
     """Unexpected response from Montreal open data API."""
@@ -0,0 +1,285 @@
+"""
+Local store of historical AQI readings.
+
+Every (station, date, hour, pollutant) reading of the real-time resource is
+ingested once into a local SQLite database, so trends can be queried without
+touching the network::
+
+    with HistoryStore() as history:
+        history.sync()
+        readings = history.query("80", "PM2.5", start=date(2025, 1, 1))
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import sqlite3
+import threading
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from types import TracebackType
+from typing import Any, Iterable, List, Mapping
+from zoneinfo import ZoneInfo
+
+from montreal_aqi_api import api
+from montreal_aqi_api._internal.parsing import normalize_pollutant_code
+from montreal_aqi_api.config import (
+    REFERENCE_VALUES,
+    RESID_IQA_PAR_STATION_EN_TEMPS_REEL,
+    TIMEZONE,
+)
+
+logger = logging.getLogger(__name__)
+
+HISTORY_FILENAME = "history.sqlite3"
+
+# Rows are inserted in batches of this size while ingesting
+_INSERT_BATCH_SIZE = 1000
+
+
+def default_data_dir() -> Path:
+    """Return the XDG data directory used for the history store."""
+    base = os.environ.get("XDG_DATA_HOME") or str(Path.home() / ".local" / "share")
+    return Path(base) / "montreal-aqi-api"
+
+
+@dataclass(frozen=True, slots=True)
+class Reading:
+    """AQI sub-index of one pollutant at one station for one hour."""
+
+    station_id: str
+    date: str
+    hour: int
+    pollutant: str
+    aqi: int
+
+    @property
+    def concentration(self) -> float | None:
+        """Estimated concentration, from the pollutant's reference value."""
+        ref_info = REFERENCE_VALUES.get(self.pollutant)
+        if ref_info is None:
+            return None
+        return (self.aqi / 100.0) * float(ref_info["ref"])
+
+
+def _normalize_record(
+    record: Mapping[str, Any],
+) -> tuple[str, str, int, str, int] | None:
+    """Return the (station, date, hour, pollutant, aqi) row of a record, or None."""
+    station_id = record.get("stationId")
+    raw_date = record.get("date")
+    pollutant = record.get("pollutant")
+    if station_id is None or not isinstance(raw_date, str):
+        return None
+    if not isinstance(pollutant, str):
+        return None
+
+    try:
+        day = date.fromisoformat(raw_date).isoformat()
+        hour = int(record["heure"])
+        aqi = int(float(record["valeur"]))
+    except (KeyError, TypeError, ValueError):
+        return None
+
+    return str(station_id), day, hour, normalize_pollutant_code(pollutant), aqi
+
+
+def _bound(value: date | datetime, *, end: bool) -> tuple[str, int]:
+    """Return the (date, hour) bound of a range; a date covers the whole day."""
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(ZoneInfo(TIMEZONE))
+        return value.date().isoformat(), value.hour
+    return value.isoformat(), 23 if end else 0
+
+
+class HistoryStore:
+    """
+    SQLite-backed store of hourly readings, keyed on their natural key.
+
+    Readings are de-duplicated on (station, pollutant, date, hour): ingesting
+    the same data twice only appends the hours not stored yet. The table is
+    clustered on that key, so range queries per station and pollutant read
+    contiguous rows.
+
+    Args:
+        path: Database file (default: ``history.sqlite3`` in the XDG data
+            directory).
+    """
+
+    def __init__(self, path: str | Path | None = None) -> None:
+        self.path = (
+            Path(path) if path is not None else default_data_dir() / HISTORY_FILENAME
+        )
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> HistoryStore:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = (
+                self._connect().execute("SELECT COUNT(*) FROM readings").fetchone()
+            )
+        return int(count)
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS readings ("
+                "station_id TEXT NOT NULL, pollutant TEXT NOT NULL, "
+                "date TEXT NOT NULL, hour INTEGER NOT NULL, aqi INTEGER NOT NULL, "
+                "PRIMARY KEY (station_id, pollutant, date, hour)"
+                ") WITHOUT ROWID"
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def ingest(self, records: Iterable[Mapping[str, Any]]) -> int:
+        """
+        Store raw real-time records and return the number of new readings.
+
+        Records without a valid station, date, hour, pollutant or value are
+        skipped; readings already stored are left untouched.
+
+        ``records`` may be a network stream: it is read in full before the
+        store is locked, so queries are not blocked meanwhile, and a stream
+        failing partway stores nothing (the next sync asks for it again).
+        """
+        rows = [row for row in map(_normalize_record, records) if row is not None]
+
+        with self._lock:
+            conn = self._connect()
+            before = conn.total_changes
+            try:
+                for start in range(0, len(rows), _INSERT_BATCH_SIZE):
+                    self._insert(conn, rows[start : start + _INSERT_BATCH_SIZE])
+            except BaseException:
+                conn.rollback()
+                raise
+            conn.commit()
+            added = conn.total_changes - before
+
+        logger.info("Ingested %d new readings into %s", added, self.path)
+        return added
+
+    @staticmethod
+    def _insert(
+        conn: sqlite3.Connection, rows: List[tuple[str, str, int, str, int]]
+    ) -> None:
+        conn.executemany(
+            "INSERT OR IGNORE INTO readings "
+            "(station_id, date, hour, pollutant, aqi) VALUES (?, ?, ?, ?, ?)",
+            rows,
+        )
+
+    def latest_date(self) -> str | None:
+        """Return the most recent date stored (ISO format), or None if empty."""
+        with self._lock:
+            (latest,) = (
+                self._connect().execute("SELECT MAX(date) FROM readings").fetchone()
+            )
+        return latest
+
+    def sync(self, today: date | None = None) -> int:
+        """
+        Ingest the records published since the last sync.
+
+        Only the dates from the latest stored date to ``today`` are requested
+        (server-side filter), the first sync pulls the whole resource. Returns
+        the number of new readings.
+        """
+        filters = None
+        latest = self.latest_date()
+        if latest is not None:
+            today = today or datetime.now(ZoneInfo(TIMEZONE)).date()
+            day = date.fromisoformat(latest)
+            dates = []
+            while day <= today:
+                dates.append(day.isoformat())
+                day += timedelta(days=1)
+            filters = {"date": dates or [latest]}
+
+        records = api.iter_records(
+            RESID_IQA_PAR_STATION_EN_TEMPS_REEL,
+            filters=filters,
+            fields=api.STATION_RECORD_FIELDS,
+        )
+        return self.ingest(records)
+
+    def query(
+        self,
+        station_id: str,
+        pollutant: str | None = None,
+        *,
+        start: date | datetime | None = None,
+        end: date | datetime | None = None,
+    ) -> List[Reading]:
+        """
+        Return the stored readings of a station, oldest first.
+
+        Args:
+            station_id: Station to read.
+            pollutant: Only this pollutant code (aliases such as "PM25" are
+                accepted), or every pollutant when None.
+            start: First hour included. A date includes the whole day; naive
+                datetimes are local Montreal time.
+            end: Last hour included, same rules as ``start``.
+        """
+        clauses = ["station_id = ?"]
+        params: List[Any] = [station_id]
+
+        if pollutant is not None:
+            clauses.append("pollutant = ?")
+            params.append(normalize_pollutant_code(pollutant))
+        if start is not None:
+            start_date, start_hour = _bound(start, end=False)
+            clauses.append("(date > ? OR (date = ? AND hour >= ?))")
+            params.extend([start_date, start_date, start_hour])
+        if end is not None:
+            end_date, end_hour = _bound(end, end=True)
+            clauses.append("(date < ? OR (date = ? AND hour <= ?))")
+            params.extend([end_date, end_date, end_hour])
+
+        # The clauses are fixed fragments; every value is a bound parameter
+        sql = (
+            "SELECT station_id, date, hour, pollutant, aqi FROM readings "  # nosec B608
+            f"WHERE {' AND '.join(clauses)} ORDER BY date, hour, pollutant"
+        )
+        with self._lock:
+            rows = self._connect().execute(sql, params).fetchall()
+
+        return [Reading(*row) for row in rows]
+
+    def stations(self) -> List[str]:
+        """Return the IDs of the stations with stored readings."""
+        with self._lock:
+            rows = (
+                self._connect()
+                .execute("SELECT DISTINCT station_id FROM readings ORDER BY station_id")
+                .fetchall()
+            )
+        return [row[0] for row in rows]
@@ -0,0 +1,406 @@
+"""
+Metrics of the API client: thread-safe counters, latency histograms, a
+Prometheus text exporter and optional OpenTelemetry spans.
+
+Every request, cache lookup, retry and processing stage is recorded in
+:data:`REGISTRY`::
+
+    from montreal_aqi_api import metrics
+
+    print(metrics.render_prometheus())
+
+Stages timed in ``montreal_aqi_stage_seconds``:
+
+- ``http``: one HTTP attempt, until the response headers (or the whole body,
+  for non-streamed requests) are received.
+- ``decode``: JSON decoding of a response body.
+- ``parse``: parsing of the pollutants of one station (or of a whole batch).
+- ``build``: building a Station, parsing included.
+
+With :func:`enable_tracing`, each stage also opens an OpenTelemetry span
+(``pip install "montreal-aqi-api[otel]"``).
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+import time
+from contextlib import contextmanager
+from importlib.util import find_spec
+from typing import Any, Callable, Dict, Iterator, List, Sequence, Tuple
+
+HAS_OPENTELEMETRY = find_spec("opentelemetry") is not None
+
+# Upper bounds (seconds) of the latency histogram buckets
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.0001,
+    0.0005,
+    0.001,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+LabelValues = Tuple[str, ...]
+
+
+def _label_values(labelnames: Sequence[str], labels: Dict[str, Any]) -> LabelValues:
+    if len(labels) != len(labelnames):
+        raise ValueError(f"Expected labels {tuple(labelnames)}, got {tuple(labels)}")
+    try:
+        return tuple(str(labels[name]) for name in labelnames)
+    except KeyError as exc:
+        raise ValueError(
+            f"Expected labels {tuple(labelnames)}, got {tuple(labels)}"
+        ) from exc
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(pairs: Sequence[Tuple[str, str]]) -> str:
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Counter:
+    """Monotonic counter, optionally split by labels."""
+
+    kind = "counter"
+
+    def __init__(
+        self, name: str, description: str, labelnames: Sequence[str] = ()
+    ) -> None:
+        self.name = name
+        self.description = description
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        """Add ``amount`` to the counter of the given labels."""
+        key = _label_values(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: Any) -> float:
+        """Return the counter of the given labels."""
+        key = _label_values(self.labelnames, labels)
+        with self._lock:
+            return self._values.get(key, 0)
+
+    def total(self, **labels: Any) -> float:
+        """Return the sum of the counters matching the given labels."""
+        with self._lock:
+            return sum(
+                value
+                for key, value in self._values.items()
+                if all(
+                    key[self.labelnames.index(name)] == str(label)
+                    for name, label in labels.items()
+                )
+            )
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+    def collect(self) -> List[str]:
+        """Return the Prometheus sample lines of the counter."""
+        with self._lock:
+            values = dict(self._values)
+        if not values and not self.labelnames:
+            values[()] = 0
+        return [
+            f"{self.name}{_format_labels(list(zip(self.labelnames, key)))} "
+            f"{_format_value(value)}"
+            for key, value in sorted(values.items())
+        ]
+
+
+class Histogram:
+    """Distribution of observed values (e.g. latencies), split by labels."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.description = description
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label values: [count per bucket (+Inf last)], sum
+        self._counts: Dict[LabelValues, List[int]] = {}
+        self._sums: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: Any) -> None:
+        """Record one value."""
+        key = _label_values(self.labelnames, labels)
+        index = len(self.buckets)
+        for position, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = position
+                break
+        with self._lock:
+            counts = self._counts.get(key)
+            if counts is None:
+                counts = self._counts[key] = [0] * (len(self.buckets) + 1)
+                self._sums[key] = 0.0
+            counts[index] += 1
+            self._sums[key] += value
+
+    @contextmanager
+    def time(self, **labels: Any) -> Iterator[None]:
+        """Record the duration of the block, in seconds."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def count(self, **labels: Any) -> int:
+        """Return the number of values recorded with the given labels."""
+        key = _label_values(self.labelnames, labels)
+        with self._lock:
+            return sum(self._counts.get(key, ()))
+
+    def sum(self, **labels: Any) -> float:
+        """Return the sum of the values recorded with the given labels."""
+        key = _label_values(self.labelnames, labels)
+        with self._lock:
+            return self._sums.get(key, 0.0)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counts.clear()
+            self._sums.clear()
+
+    def collect(self) -> List[str]:
+        """Return the Prometheus sample lines of the histogram."""
+        with self._lock:
+            series = [
+                (key, list(counts), self._sums[key])
+                for key, counts in sorted(self._counts.items())
+            ]
+
+        lines = []
+        for key, counts, total in series:
+            pairs = list(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                labels = _format_labels(pairs + [("le", _format_value(bound))])
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(pairs)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Gauge:
+    """Current value read from a callback when collected."""
+
+    kind = "gauge"
+
+    def __init__(
+        self, name: str, description: str, callback: Callable[[], float]
+    ) -> None:
+        self.name = name
+        self.description = description
+        self.callback = callback
+
+    def reset(self) -> None:
+        pass
+
+    def collect(self) -> List[str]:
+        return [f"{self.name} {_format_value(float(self.callback()))}"]
+
+
+Metric = Counter | Histogram | Gauge
+
+
+class Registry:
+    """Named metrics, rendered together in the Prometheus text format."""
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: Metric) -> Any:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(
+        self, name: str, description: str, labelnames: Sequence[str] = ()
+    ) -> Counter:
+        return self._register(Counter(name, description, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        description: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, description, labelnames, buckets))
+
+    def gauge(
+        self, name: str, description: str, callback: Callable[[], float]
+    ) -> Gauge:
+        return self._register(Gauge(name, description, callback))
+
+    def get(self, name: str) -> Metric | None:
+        return self._metrics.get(name)
+
+    def reset(self) -> None:
+        """Zero every counter and histogram."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            metric.reset()
+
+    def render_prometheus(self) -> str:
+        """Return every metric in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.description}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.collect())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+API_REQUESTS = REGISTRY.counter(
+    "montreal_aqi_api_requests_total",
+    "Queries sent to the Montreal open data API (retries excluded)",
+    ("resource",),
+)
+CACHE_LOOKUPS = REGISTRY.counter(
+    "montreal_aqi_cache_lookups_total",
+    "Response cache lookups by result (hit, disk_hit, miss)",
+    ("resource", "result"),
+)
+COALESCED_REQUESTS = REGISTRY.counter(
+    "montreal_aqi_coalesced_requests_total",
+    "Queries answered by another caller's in-flight request",
+)
+REVALIDATED_RESPONSES = REGISTRY.counter(
+    "montreal_aqi_revalidated_responses_total",
+    "Expired responses confirmed unchanged by the API (304)",
+)
+STALE_RESPONSES = REGISTRY.counter(
+    "montreal_aqi_stale_responses_total",
+    "Expired responses served while being refreshed",
+)
+BACKGROUND_REFRESHES = REGISTRY.counter(
+    "montreal_aqi_background_refreshes_total",
+    "Background refreshes of expired responses",
+)
+STATION_CACHE_LOOKUPS = REGISTRY.counter(
+    "montreal_aqi_station_cache_lookups_total",
+    "Lookups of parsed stations by result (hit, miss)",
+    ("result",),
+)
+RETRIES = REGISTRY.counter(
+    "montreal_aqi_retries_total",
+    "Failed attempts retried, by HTTP status (none without a response)",
+    ("status",),
+)
+RESPONSE_BYTES = REGISTRY.counter(
+    "montreal_aqi_response_bytes_total",
+    "Bytes of response bodies received from the API",
+    ("resource",),
+)
+STAGE_SECONDS = REGISTRY.histogram(
+    "montreal_aqi_stage_seconds",
+    "Time spent per stage (http, decode, parse, build)",
+    ("stage",),
+)
+
+# Tracer of the stage spans (see enable_tracing)
+_tracer: Any = None
+
+
+def enable_tracing(tracer: Any = None) -> None:
+    """
+    Open an OpenTelemetry span for each stage.
+
+    Args:
+        tracer: Tracer to use (default: the ``montreal_aqi_api`` tracer of
+            the global tracer provider).
+
+    Raises:
+        ImportError: If no tracer is given and opentelemetry is not installed.
+    """
+    global _tracer
+
+    if tracer is None:
+        from opentelemetry import trace
+
+        tracer = trace.get_tracer("montreal_aqi_api")
+    _tracer = tracer
+
+
+def disable_tracing() -> None:
+    """Stop opening spans."""
+    global _tracer
+    _tracer = None
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[None]:
+    """Open a span named ``montreal_aqi.<name>`` when tracing is enabled."""
+    tracer = _tracer
+    if tracer is None:
+        yield
+        return
+    with tracer.start_as_current_span(f"montreal_aqi.{name}", attributes=attributes):
+        yield
+
+
+@contextmanager
+def stage(name: str, **attributes: Any) -> Iterator[None]:
+    """Time a stage in ``montreal_aqi_stage_seconds`` (and trace it)."""
+    with span(name, **attributes), STAGE_SECONDS.time(stage=name):
+        yield
+
+
+def render_prometheus() -> str:
+    """Return the client metrics in the Prometheus text exposition format."""
+    return REGISTRY.render_prometheus()
+
+
+def reset() -> None:
+    """Zero the client counters and histograms."""
+    REGISTRY.reset()
@@ -0,0 +1,199 @@
+"""
+Background refresh of every open station, aligned to the hourly RSQA cycle.
+
+The poller keeps an in-memory snapshot of the latest Station of each open
+station, so request handlers can read it without waiting on the network::
+
+    with Poller() as poller:
+        station = poller.get_station("80")
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from types import MappingProxyType, TracebackType
+from typing import Callable, Mapping
+
+from montreal_aqi_api import api
+from montreal_aqi_api.config import POLL_PUBLISH_DELAY_SECONDS, POLL_RETRY_SECONDS
+from montreal_aqi_api.exceptions import MontrealAQIError
+from montreal_aqi_api.service import _build_stations, list_open_stations
+from montreal_aqi_api.station import Station
+
+logger = logging.getLogger(__name__)
+
+
+class Poller:
+    """
+    Refresh the AQI of every open station in a background thread.
+
+    Each cycle discovers the open stations with ``list_open_stations()``,
+    streams the latest records of the whole network in bulk, and publishes a
+    new snapshot of Station objects. The per-station records are also primed
+    in the response cache, so ``service.get_station_aqi()`` is served without
+    a request too.
+
+    The next cycle runs ``publish_delay`` seconds after the hour following
+    the newest published ``heure``, when new data is expected. Until it shows
+    up, or after an error, cycles repeat every ``retry_interval`` seconds.
+
+    Args:
+        publish_delay: Seconds after the top of the hour to poll for new data.
+        retry_interval: Seconds between cycles while data is late or failing.
+        on_update: Called with each new snapshot, from the poller thread.
+        max_age: Seconds after the last successful refresh during which the
+            snapshot is current (default: one hourly cycle, plus the publish
+            delay and one retry interval as a margin).
+    """
+
+    def __init__(
+        self,
+        *,
+        publish_delay: float = POLL_PUBLISH_DELAY_SECONDS,
+        retry_interval: float = POLL_RETRY_SECONDS,
+        on_update: Callable[[Mapping[str, Station]], None] | None = None,
+        max_age: float | None = None,
+    ) -> None:
+        self.publish_delay = publish_delay
+        self.retry_interval = retry_interval
+        self.max_age = (
+            3600 + publish_delay + retry_interval if max_age is None else max_age
+        )
+        self._on_update = on_update
+
+        self._stations: Mapping[str, Station] = MappingProxyType({})
+        self._last_refresh: float | None = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def __enter__(self) -> Poller:
+        self.start()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.stop()
+
+    @property
+    def stations(self) -> Mapping[str, Station]:
+        """Latest snapshot of the open stations, keyed by station ID (read-only)."""
+        return self._stations
+
+    @property
+    def last_refresh(self) -> float | None:
+        """Time of the last successful refresh (epoch seconds), or None."""
+        return self._last_refresh
+
+    def is_current(self, now: float | None = None) -> bool:
+        """Return True if the snapshot was refreshed less than max_age ago."""
+        if self._last_refresh is None:
+            return False
+        now = time.time() if now is None else now
+        return now - self._last_refresh < self.max_age
+
+    def get_station(self, station_id: str) -> Station | None:
+        """Return the latest Station from the snapshot, without any request."""
+        return self._stations.get(station_id)
+
+    def start(self) -> None:
+        """Start refreshing in a daemon thread (the first cycle runs at once)."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="montreal-aqi-poller", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float | None = None) -> None:
+        """Stop the poller thread and wait for it to exit."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def refresh(self) -> Mapping[str, Station]:
+        """
+        Run one refresh cycle now and return the published snapshot.
+
+        Raises:
+            MontrealAQIError: If the latest records cannot be fetched.
+        """
+        try:
+            open_ids = {
+                str(station["station_id"])
+                for station in list_open_stations()
+                if station.get("station_id") is not None
+            }
+        except MontrealAQIError as exc:
+            # Keep polling the whole network rather than nothing
+            logger.warning("Failed to list open stations: %s", exc)
+            open_ids = None
+
+        records_by_station = api.fetch_all_latest_records(stream=True)
+        api._prime_station_records(records_by_station)
+
+        if open_ids is not None:
+            records_by_station = {
+                station_id: records
+                for station_id, records in records_by_station.items()
+                if station_id in open_ids
+            }
+        stations = _build_stations(records_by_station)
+
+        # Publish by swapping the reference: readers never see a partial update
+        self._stations = MappingProxyType(stations)
+        self._last_refresh = time.time()
+
+        logger.info("Poller refreshed %d open stations", len(stations))
+
+        if self._on_update is not None:
+            self._on_update(self._stations)
+
+        return self._stations
+
+    def next_run(self, now: float | None = None) -> float:
+        """Return when the next cycle should run (epoch seconds)."""
+        now = time.time() if now is None else now
+
+        newest: datetime | None = None
+        for station in self._stations.values():
+            try:
+                observed = datetime.fromisoformat(station.timestamp)
+            except ValueError:
+                continue
+            if newest is None or observed > newest:
+                newest = observed
+
+        if newest is not None:
+            expected = (newest + timedelta(hours=1)).timestamp() + self.publish_delay
+            if expected > now:
+                return expected
+
+        return now + self.retry_interval
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+            except MontrealAQIError as exc:
+                logger.warning("Poller refresh failed: %s", exc)
+                next_run = time.time() + self.retry_interval
+            except Exception:
+                # A bug (e.g. in on_update) must not stop the updates for
+                # good: log it with its traceback and retry like an API error
+                logger.exception("Poller refresh crashed")
+                next_run = time.time() + self.retry_interval
+            else:
+                next_run = self.next_run()
+
+            delay = max(0.0, next_run - time.time())
+            logger.debug("Next poller refresh in %.0f seconds", delay)
+            self._stop.wait(delay)
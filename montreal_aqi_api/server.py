@@ -0,0 +1,273 @@
+"""
+Long-running local endpoint serving the CLI's JSON contract.
+
+``montreal-aqi serve`` keeps the HTTP session, the response cache and a
+background Poller alive, so sidecars get the same payloads as the one-shot
+CLI without paying its startup and cold cache on every call::
+
+    GET /stations            open stations ("stations" payload)
+    GET /stations/80         one station ("station" payload)
+    GET /stations/3,80       several stations ("stations" payload)
+    GET /health              liveness and last poller refresh
+    GET /metrics             API client metrics
+    GET /metrics?format=prometheus
+                             counters and stage latency histograms, in the
+                             Prometheus text format
+
+Add ``?pretty=1`` to indent the JSON. Errors use the contract's "error"
+payload with a matching HTTP status.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import signal
+import socketserver
+import stat
+import threading
+from dataclasses import replace
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Mapping
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from montreal_aqi_api import metrics
+from montreal_aqi_api._internal import jsonenc
+from montreal_aqi_api.api import get_api_metrics
+from montreal_aqi_api.cli import (
+    _error_payload,
+    _station_aqi_payload,
+    _stations_list_payload,
+)
+from montreal_aqi_api.config import SERVE_HOST, SERVE_PORT
+from montreal_aqi_api.exceptions import (
+    APIInvalidResponse,
+    APIServerUnreachable,
+    MontrealAQIError,
+)
+from montreal_aqi_api.poller import Poller
+from montreal_aqi_api.service import get_station_aqi, list_open_stations
+from montreal_aqi_api.station import Station
+
+logger = logging.getLogger(__name__)
+
+# HTTP status of each error code of the contract
+_ERROR_STATUS = {
+    "INVALID_STATION_ID": HTTPStatus.BAD_REQUEST,
+    "NO_DATA": HTTPStatus.NOT_FOUND,
+    "NOT_FOUND": HTTPStatus.NOT_FOUND,
+    "API_UNREACHABLE": HTTPStatus.SERVICE_UNAVAILABLE,
+    "API_INVALID_RESPONSE": HTTPStatus.BAD_GATEWAY,
+    "API_ERROR": HTTPStatus.INTERNAL_SERVER_ERROR,
+}
+
+
+class AQIRequestHandler(BaseHTTPRequestHandler):
+    """Map GET requests to the JSON contract payloads."""
+
+    server: _AQIServerMixin  # type: ignore[assignment]
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately: do not let Nagle delay the body
+    disable_nagle_algorithm = True
+
+    def do_GET(self) -> None:
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+        pretty = query.get("pretty", ["0"])[-1] not in ("", "0")
+        parts = [unquote(part) for part in url.path.split("/") if part]
+
+        if parts == ["metrics"] and query.get("format") == ["prometheus"]:
+            self._send(
+                HTTPStatus.OK,
+                metrics.render_prometheus().encode("utf-8"),
+                "text/plain; version=0.0.4; charset=utf-8",
+            )
+            return
+
+        try:
+            payload = self._route(parts)
+        except APIServerUnreachable:
+            payload = _error_payload(
+                "API_UNREACHABLE", "Montreal open data API is unreachable"
+            )
+        except APIInvalidResponse:
+            payload = _error_payload(
+                "API_INVALID_RESPONSE",
+                "Unexpected response from Montreal open data API",
+            )
+        except MontrealAQIError as exc:
+            payload = _error_payload("API_ERROR", str(exc))
+
+        self._send_json(payload, pretty=pretty)
+
+    def _route(self, parts: list[str]) -> Mapping[str, Any]:
+        if parts == ["stations"]:
+            return _stations_list_payload(list_open_stations())
+        if len(parts) == 2 and parts[0] == "stations":
+            station_ids = [s.strip() for s in parts[1].split(",") if s.strip()]
+            return _station_aqi_payload(station_ids, self.server.get_station)
+        if parts == ["health"]:
+            return {"status": "ok", "last_refresh": self.server.last_refresh}
+        if parts == ["metrics"]:
+            return dict(get_api_metrics())
+        return _error_payload("NOT_FOUND", f"Unknown path '{self.path}'")
+
+    def _send_json(self, payload: Mapping[str, Any], *, pretty: bool) -> None:
+        status = HTTPStatus.OK
+        if payload.get("type") == "error":
+            status = _ERROR_STATUS.get(
+                payload["error"]["code"], HTTPStatus.INTERNAL_SERVER_ERROR
+            )
+
+        body = jsonenc.dumps(payload, pretty=pretty)
+        self._send(status, body, "application/json; charset=utf-8")
+
+    def _send(self, status: HTTPStatus, data: bytes, content_type: str) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def address_string(self) -> str:
+        # Unix socket clients have no (host, port) address
+        if isinstance(self.client_address, tuple) and self.client_address:
+            return str(self.client_address[0])
+        return "unix"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+class _UnixRequestHandler(AQIRequestHandler):
+    # TCP_NODELAY does not apply to Unix sockets
+    disable_nagle_algorithm = False
+
+
+class _AQIServerMixin:
+    """Shared state of the TCP and Unix socket servers."""
+
+    daemon_threads = True
+    poller: Poller | None = None
+
+    def get_station(self, station_id: str) -> Station | None:
+        """
+        Return a station from the poller snapshot, else from the API.
+
+        Once the poller has not refreshed for longer than its ``max_age``,
+        the API is queried instead; if that fails too, the outdated station
+        from the snapshot is returned flagged as stale.
+        """
+        poller = self.poller
+        if poller is None:
+            return get_station_aqi(station_id)
+
+        station = poller.get_station(station_id)
+        if station is not None and poller.is_current():
+            return station
+
+        try:
+            return get_station_aqi(station_id)
+        except MontrealAQIError:
+            if station is None:
+                raise
+            logger.warning(
+                "Poller snapshot outdated and API failing, serving stale station %s",
+                station_id,
+            )
+            return replace(station, stale=True)
+
+    @property
+    def last_refresh(self) -> float | None:
+        return self.poller.last_refresh if self.poller is not None else None
+
+
+class AQIHTTPServer(_AQIServerMixin, ThreadingHTTPServer):
+    """Threaded HTTP server on a TCP port."""
+
+
+class AQIUnixServer(_AQIServerMixin, socketserver.ThreadingUnixStreamServer):
+    """Threaded HTTP server on a Unix socket."""
+
+    def server_bind(self) -> None:
+        # Replace a socket left behind by a previous run
+        path = os.fspath(self.server_address)
+        try:
+            if stat.S_ISSOCK(os.stat(path).st_mode):
+                os.unlink(path)
+        except FileNotFoundError:
+            pass
+        super().server_bind()
+
+    def server_close(self) -> None:
+        super().server_close()
+        try:
+            os.unlink(os.fspath(self.server_address))
+        except FileNotFoundError:
+            pass
+
+
+def make_server(
+    *,
+    host: str = SERVE_HOST,
+    port: int = SERVE_PORT,
+    socket_path: str | None = None,
+    poller: Poller | None = None,
+) -> AQIHTTPServer | AQIUnixServer:
+    """
+    Create (but do not start) the server.
+
+    Args:
+        host: Interface of the TCP server.
+        port: Port of the TCP server (0 picks a free one).
+        socket_path: Listen on this Unix socket instead of TCP.
+        poller: Serve stations from this poller's snapshot when available.
+    """
+    server: AQIHTTPServer | AQIUnixServer
+    if socket_path is not None:
+        server = AQIUnixServer(socket_path, _UnixRequestHandler)
+    else:
+        server = AQIHTTPServer((host, port), AQIRequestHandler)
+    server.poller = poller
+    return server
+
+
+def serve(
+    *,
+    host: str = SERVE_HOST,
+    port: int = SERVE_PORT,
+    socket_path: str | None = None,
+    prefetch: bool = True,
+) -> None:
+    """
+    Serve the JSON contract until interrupted (Ctrl+C or SIGTERM).
+
+    With ``prefetch``, a Poller keeps every open station warm in the
+    background so requests are answered from memory.
+    """
+    poller = Poller() if prefetch else None
+    server = make_server(host=host, port=port, socket_path=socket_path, poller=poller)
+
+    def _terminate(signum: int, frame: Any) -> None:
+        # shutdown() blocks until serve_forever() returns: call it elsewhere
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    if threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGTERM, _terminate)
+
+    if poller is not None:
+        poller.start()
+
+    address = socket_path or "http://{}:{}".format(*server.server_address[:2])
+    logger.info("Serving Montreal AQI on %s", address)
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if poller is not None:
+            poller.stop(timeout=5)
+        logger.info("Server stopped")
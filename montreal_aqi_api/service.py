@@ -1,17 +1,71 @@
 from __future__ import annotations
 
 import logging
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from datetime import date, datetime
-from typing import Any, Mapping
+from typing import Any, Callable, Iterator, Mapping
 from zoneinfo import ZoneInfo
 
+from montreal_aqi_api import metrics
+from montreal_aqi_api._internal import vectorized
+from montreal_aqi_api._internal.cache import ResponseCache
 from montreal_aqi_api._internal.parsing import parse_pollutants
-from montreal_aqi_api.api import fetch_latest_station_records, fetch_open_stations
+from montreal_aqi_api.api import (
+    StaleRecords,
+    fetch_all_latest_records,
+    fetch_latest_records_for_stations,
+    fetch_latest_station_records,
+    fetch_open_stations,
+    get_max_concurrency,
+)
+from montreal_aqi_api.config import (
+    STATION_CACHE_MAX_ENTRIES,
+    STATION_CACHE_TTL_SECONDS,
+    TIMEZONE,
+)
+from montreal_aqi_api.exceptions import APIInvalidResponse, MontrealAQIError
+from montreal_aqi_api.pollutants import Pollutant
 from montreal_aqi_api.station import Station
 
 logger = logging.getLogger(__name__)
 
+# Long-lived pool shared by get_stations_aqi() calls. It has one thread per
+# request the API client's adaptive limiter may allow in flight (its
+# max_limit); the limiter decides how many of them send requests at once.
+_executor: ThreadPoolExecutor | None = None
+_executor_workers = 0
+_executor_lock = threading.Lock()
+
+
+# Parsed Station objects, keyed by station and data hour, with a copy of the
+# records they were built from. An entry is reused only while the records
+# are unchanged, so a correction published for the same hour replaces it.
+_station_cache: ResponseCache[tuple[list[dict[str, Any]], Station]] = ResponseCache(
+    ttl=STATION_CACHE_TTL_SECONDS, max_entries=STATION_CACHE_MAX_ENTRIES
+)
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """
+    Return the shared pool, creating it on first use.
+
+    The pool is replaced when the limiter's max_limit changed since it was
+    created; the old one finishes its pending fetches, then exits.
+    """
+    global _executor, _executor_workers
+
+    workers = get_max_concurrency()
+    with _executor_lock:
+        if _executor is None or _executor_workers != workers:
+            if _executor is not None:
+                _executor.shutdown(wait=False)
+            _executor = ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="montreal-aqi"
+            )
+            _executor_workers = workers
+        return _executor
+
 
 def _parse_station_metadata(record: Mapping[str, Any]) -> tuple[date, int] | None:
     """
@@ -34,16 +88,89 @@ def _parse_station_metadata(record: Mapping[str, Any]) -> tuple[date, int] | Non
     return parsed_date, parsed_hour
 
 
+def _station_cache_key(station_id: str, records: list[dict[str, Any]]) -> str | None:
+    """Key of a station's data hour in the Station cache (None: not cached)."""
+    # Stale records are about to be replaced: not worth caching
+    if not records or isinstance(records, StaleRecords):
+        return None
+    first = records[0]
+    return f"{station_id}:{first.get('date')}:{first.get('heure')}"
+
+
+def _get_cached_station(
+    station_id: str, records: list[dict[str, Any]]
+) -> Station | None:
+    """Return the Station already built from these records, or None."""
+    key = _station_cache_key(station_id, records)
+    if key is None:
+        return None
+
+    entry = _station_cache.get(key)
+    if entry is not None and entry[0] == records:
+        metrics.STATION_CACHE_LOOKUPS.inc(result="hit")
+        logger.debug("Using cached station %s", key)
+        return entry[1]
+
+    metrics.STATION_CACHE_LOOKUPS.inc(result="miss")
+    return None
+
+
+def _cache_station(
+    station_id: str, records: list[dict[str, Any]], station: Station
+) -> None:
+    """Cache the Station built from these records."""
+    key = _station_cache_key(station_id, records)
+    if key is not None:
+        # Copies, so records modified in place are not mistaken for unchanged
+        _station_cache.set(key, ([dict(record) for record in records], station))
+
+
+def clear_station_cache() -> None:
+    """Drop every cached Station (the response cache is left as is)."""
+    _station_cache.clear()
+
+
 def get_station_aqi(station_id: str) -> Station | None:
     """
     Return the latest AQI data for a given station.
+
+    The Station is built once per station and data hour: while the records
+    are unchanged, the same (immutable) object is returned.
     """
     records = fetch_latest_station_records(station_id)
     if not records:
         logger.info("No records found for station %s", station_id)
         return None
 
-    pollutants = parse_pollutants(records)
+    return _station_from_records(station_id, records)
+
+
+def _station_from_records(
+    station_id: str, records: list[dict[str, Any]]
+) -> Station | None:
+    """Return the cached Station of these records, building it on a miss."""
+    station = _get_cached_station(station_id, records)
+    if station is None:
+        station = _build_station(station_id, records)
+        if station is not None:
+            _cache_station(station_id, records, station)
+    return station
+
+
+@metrics.stage("build")
+def _build_station(
+    station_id: str,
+    records: list[dict[str, Any]],
+    pollutants: dict[str, Pollutant] | None = None,
+) -> Station | None:
+    """
+    Build a Station from the latest-hour records of a single station.
+
+    ``pollutants`` may be given when already parsed (e.g. by the batch path).
+    """
+    if pollutants is None:
+        with metrics.stage("parse"):
+            pollutants = parse_pollutants(records)
     if not pollutants:
         logger.info("No pollutants parsed for station %s", station_id)
         return None
@@ -55,7 +182,7 @@ def get_station_aqi(station_id: str) -> Station | None:
 
     station_date, hour = metadata
 
-    tz = ZoneInfo("America/Toronto")
+    tz = ZoneInfo(TIMEZONE)
     timestamp = datetime(
         station_date.year,
         station_date.month,
@@ -70,6 +197,7 @@ def get_station_aqi(station_id: str) -> Station | None:
         hour=hour,
         timestamp=timestamp,
         pollutants=pollutants,
+        stale=isinstance(records, StaleRecords),
     )
 
     logger.info(
@@ -83,39 +211,67 @@ def get_station_aqi(station_id: str) -> Station | None:
     return station
 
 
+def _fetch_concurrently(
+    station_ids: list[str],
+    get_station: Callable[[str], Station | None],
+    max_workers: int | None,
+) -> Iterator[tuple[int, Future[Station | None]]]:
+    """
+    Yield (index, future) of each station fetch, in completion order.
+
+    Fetches still pending when the caller stops iterating are cancelled.
+    """
+    if max_workers is None:
+        executor = _get_executor()
+    else:
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    future_to_index: dict[Future[Station | None], int] = {}
+    try:
+        for idx, station_id in enumerate(station_ids):
+            future_to_index[executor.submit(get_station, station_id)] = idx
+        for future in as_completed(future_to_index):
+            yield future_to_index[future], future
+    finally:
+        for future in future_to_index:
+            future.cancel()
+        if max_workers is not None:
+            executor.shutdown(wait=False)
+
+
 def get_stations_aqi(
-    station_ids: list[str], max_workers: int = 5
+    station_ids: list[str], max_workers: int | None = None
 ) -> list[Station | None]:
     """
-    Return AQI data for multiple stations using parallel requests.
+    Return AQI data for multiple stations.
+
+    By default the whole subset is fetched in a single request (see
+    ``api.fetch_latest_records_for_stations``). If the portal rejects the
+    multi-station filter, or with ``max_workers``, each station is queried on
+    its own, in parallel.
 
     Args:
         station_ids: List of station IDs to fetch
-        max_workers: Maximum number of concurrent API requests (default: 5)
+        max_workers: Query each station separately, on a dedicated pool of
+            this many threads
 
     Returns:
         List of Station objects (or None if data unavailable for a station).
         Order corresponds to input station_ids order.
     """
-    results: list[Station | None] = [None] * len(station_ids)
-
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        # Submit all tasks and map them back to their positions
-        future_to_index = {
-            executor.submit(get_station_aqi, station_id): idx
-            for idx, station_id in enumerate(station_ids)
-        }
-
-        # Collect results as they complete
-        for future in as_completed(future_to_index):
-            idx = future_to_index[future]
-            try:
-                results[idx] = future.result()
-            except Exception as e:
-                logger.warning(
-                    "Failed to fetch AQI for station %s: %s", station_ids[idx], e
-                )
-                results[idx] = None
+    if max_workers is None:
+        try:
+            results = _get_stations_batch(station_ids)
+        except APIInvalidResponse as e:
+            logger.warning(
+                "Multi-station query rejected, querying stations one by one: %s", e
+            )
+            results = _get_stations_parallel(station_ids, None)
+        except MontrealAQIError as e:
+            logger.warning("Failed to fetch AQI for stations %s: %s", station_ids, e)
+            results = [None] * len(station_ids)
+    else:
+        results = _get_stations_parallel(station_ids, max_workers)
 
     logger.info(
         "Fetched AQI data for %d stations (%d successful)",
@@ -126,6 +282,128 @@ def get_stations_aqi(
     return results
 
 
+def _get_stations_batch(station_ids: list[str]) -> list[Station | None]:
+    """Build the stations of a subset fetched in a single request."""
+    stations = _build_stations(fetch_latest_records_for_stations(station_ids))
+    return [stations.get(str(station_id)) for station_id in station_ids]
+
+
+def _get_stations_parallel(
+    station_ids: list[str], max_workers: int | None
+) -> list[Station | None]:
+    """Fetch each station separately, mapping failures to None."""
+    results: list[Station | None] = [None] * len(station_ids)
+
+    for idx, future in _fetch_concurrently(station_ids, get_station_aqi, max_workers):
+        try:
+            results[idx] = future.result()
+        except Exception as e:
+            logger.warning(
+                "Failed to fetch AQI for station %s: %s", station_ids[idx], e
+            )
+            results[idx] = None
+
+    return results
+
+
+def iter_stations_aqi(
+    station_ids: list[str],
+    max_workers: int | None = None,
+    *,
+    get_station: Callable[[str], Station | None] | None = None,
+) -> Iterator[tuple[int, Station | None]]:
+    """
+    Yield the AQI data of multiple stations as soon as each one is fetched.
+
+    Stations are fetched concurrently, like ``get_stations_aqi()``, but are
+    yielded in completion order so callers can stream them out.
+
+    Args:
+        station_ids: List of station IDs to fetch
+        max_workers: Fetch on a dedicated pool of this many threads
+        get_station: Function fetching one station (default:
+            ``get_station_aqi``), e.g. to read a poller snapshot first
+
+    Yields:
+        (index in station_ids, Station or None if no data is available)
+
+    Raises:
+        MontrealAQIError: The first API error, when its station is reached.
+            Pending fetches are then cancelled.
+    """
+    if get_station is None:
+        get_station = get_station_aqi
+
+    # One station: no point in a round trip through the pool
+    if len(station_ids) == 1:
+        yield 0, get_station(station_ids[0])
+        return
+
+    for idx, future in _fetch_concurrently(station_ids, get_station, max_workers):
+        yield idx, future.result()
+
+
+def get_all_stations_aqi(*, stream: bool = False) -> dict[str, Station]:
+    """
+    Return the latest AQI data for every station reporting to the network.
+
+    Uses a single paged pull of the real-time resource instead of one query
+    per station, which is much cheaper when polling the whole network.
+
+    Args:
+        stream: Decode the pages incrementally, keeping memory use flat
+            regardless of the page size.
+
+    Returns:
+        Mapping of station ID to Station. Stations whose records cannot be
+        parsed are left out.
+    """
+    stations = _build_stations(fetch_all_latest_records(stream=stream))
+
+    logger.info("Fetched AQI data for %d stations in bulk", len(stations))
+
+    return stations
+
+
+def _build_stations(
+    records_by_station: Mapping[str, list[dict[str, Any]]],
+) -> dict[str, Station]:
+    """
+    Build the Station of each station in a batch, skipping unparsable ones.
+
+    Stations whose records are unchanged since they were last built are
+    taken from the Station cache. With NumPy installed, the pollutants of the
+    other stations are parsed in one vectorized pass; the result is identical
+    to the per-station parser.
+    """
+    stations: dict[str, Station] = {}
+    missing: dict[str, list[dict[str, Any]]] = {}
+    for station_id, records in records_by_station.items():
+        station = _get_cached_station(station_id, records)
+        if station is None:
+            missing[station_id] = records
+        else:
+            stations[station_id] = station
+
+    table = None
+    if vectorized.HAS_NUMPY and len(missing) > 1:
+        with metrics.stage("parse", stations=len(missing)):
+            table = vectorized.parse_pollutants_batch(missing)
+
+    for station_id, records in missing.items():
+        pollutants = table.pollutants(station_id) if table is not None else None
+        station = _build_station(station_id, records, pollutants)
+        if station is not None:
+            _cache_station(station_id, records, station)
+            stations[station_id] = station
+
+    return {
+        station_id: stations[station_id]
+        for station_id in records_by_station
+        if station_id in stations
+    }
+
+
 def list_open_stations() -> list[dict[str, Any]]:
     """
     List all currently open monitoring stations.
@@ -3,18 +3,30 @@ from __future__ import annotations
 from dataclasses import dataclass, field
 from typing import Dict
 
+from montreal_aqi_api._internal import jsonenc
 from montreal_aqi_api.pollutants import Pollutant
 
 
-@dataclass(slots=True)
+@dataclass(frozen=True, slots=True)
 class Station:
+    """
+    Latest AQI of a station.
+
+    Stations are immutable: the same object may be shared by every caller
+    asking for the same station and data hour (see ``service``).
+    """
+
     station_id: str
     date: str
     hour: int
     timestamp: str
     pollutants: Dict[str, Pollutant]
+    # True when built from cached data whose refresh is pending or failed
+    stale: bool = False
     _aqi: int = field(init=False, repr=False)
     _main_pollutant: str = field(init=False, repr=False)
+    # Compact JSON of to_dict(), encoded on first use
+    _json: bytes | None = field(default=None, init=False, repr=False, compare=False)
 
     def __post_init__(self) -> None:
         """Calculate cached values once during initialization."""
@@ -37,7 +49,7 @@ class Station:
         return self._main_pollutant
 
     def to_dict(self) -> dict[str, object]:
-        return {
+        data: dict[str, object] = {
             "station_id": self.station_id,
             "date": self.date,
             "hour": self.hour,
@@ -53,3 +65,14 @@ class Station:
                 for code, p in self.pollutants.items()
             },
         }
+        if self.stale:
+            data["stale"] = True
+        return data
+
+    def to_json_bytes(self) -> bytes:
+        """Return ``to_dict()`` as compact UTF-8 JSON, encoded only once."""
+        encoded = self._json
+        if encoded is None:
+            encoded = jsonenc.dumps(self.to_dict())
+            object.__setattr__(self, "_json", encoded)
+        return encoded
@@ -0,0 +1,293 @@
+"""
+HTTP transports used by the blocking API client.
+
+Every request of ``montreal_aqi_api.api`` goes through a :class:`Transport`,
+which can be swapped with ``api.configure_transport()``:
+
+- :class:`RequestsTransport` (default): a pooled ``requests.Session``.
+- :class:`HttpxTransport`: an ``httpx.Client``, optionally over HTTP/2 so
+  that concurrent station queries are multiplexed over one connection
+  (``pip install "montreal-aqi-api[http2]"``).
+- Anything implementing the protocol, such as a stub in tests.
+
+Transports raise :class:`TransportError` for connection failures, timeouts
+and HTTP error statuses; the client decides what to retry.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Iterator, List, Mapping, Protocol, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from montreal_aqi_api.config import HTTP_POOL_SIZE, USER_AGENT
+
+Params = List[Tuple[str, str]]
+
+
+class TransportError(Exception):
+    """
+    A request failed: no response, or an HTTP error status.
+
+    Attributes:
+        status: HTTP status of the error response, or None without one.
+        headers: Headers of the error response (empty without one).
+    """
+
+    def __init__(
+        self,
+        message: str,
+        *,
+        status: int | None = None,
+        headers: Mapping[str, str] | None = None,
+    ) -> None:
+        super().__init__(message)
+        self.status = status
+        self.headers: Mapping[str, str] = headers or {}
+
+
+class TransportResponse(Protocol):
+    """Successful (or 304) response of a transport."""
+
+    status_code: int
+    headers: Mapping[str, Any]
+
+    def json(self) -> Any: ...
+
+    def iter_content(self, chunk_size: int) -> Iterator[bytes]: ...
+
+    def close(self) -> None: ...
+
+
+class Transport(Protocol):
+    """Sends the GET requests of the API client."""
+
+    def get(
+        self,
+        url: str,
+        *,
+        params: Params,
+        headers: Dict[str, str],
+        timeout: float,
+        stream: bool = False,
+    ) -> TransportResponse:
+        """
+        Send a GET request and return its response.
+
+        Raises:
+            TransportError: On connection errors, timeouts and statuses >= 400.
+        """
+        ...
+
+    def close(self) -> None:
+        """Release the connections of the transport."""
+        ...
+
+
+def _session_headers(*, keep_alive: bool, compression: bool) -> Dict[str, str]:
+    headers = {"User-Agent": USER_AGENT}
+    if not keep_alive:
+        headers["Connection"] = "close"
+    if not compression:
+        headers["Accept-Encoding"] = "identity"
+    return headers
+
+
+class _RequestsResponse:
+    """Adapt a ``requests.Response``, mapping streaming errors."""
+
+    def __init__(self, response: requests.Response) -> None:
+        self._response = response
+        self.status_code = response.status_code
+        self.headers = response.headers
+
+    @property
+    def content(self) -> bytes:
+        return self._response.content
+
+    def json(self) -> Any:
+        return self._response.json()
+
+    def iter_content(self, chunk_size: int) -> Iterator[bytes]:
+        try:
+            yield from self._response.iter_content(chunk_size=chunk_size)
+        except requests.exceptions.RequestException as exc:
+            raise TransportError(str(exc)) from exc
+
+    def close(self) -> None:
+        self._response.close()
+
+
+class RequestsTransport:
+    """
+    Transport over a pooled ``requests.Session`` (HTTP/1.1).
+
+    Args:
+        session: Session to use (default: a new one). Its adapters are only
+            replaced when ``pool_size`` is given.
+        pool_size: Maximum connections kept open to the portal; should be at
+            least the number of concurrent requests (``CONCURRENCY_MAX``).
+        keep_alive: Reuse connections between requests.
+        compression: Accept gzip/deflate compressed bodies.
+    """
+
+    def __init__(
+        self,
+        session: requests.Session | None = None,
+        *,
+        pool_size: int | None = None,
+        keep_alive: bool = True,
+        compression: bool = True,
+    ) -> None:
+        if session is None:
+            session = requests.Session()
+            pool_size = pool_size or HTTP_POOL_SIZE
+        self.session = session
+        self.session.headers.update(
+            _session_headers(keep_alive=keep_alive, compression=compression)
+        )
+        if pool_size is not None:
+            self.configure_pool(pool_size)
+
+    def configure_pool(self, pool_size: int) -> None:
+        """Resize the connection pool of the session."""
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def get(
+        self,
+        url: str,
+        *,
+        params: Params,
+        headers: Dict[str, str],
+        timeout: float,
+        stream: bool = False,
+    ) -> TransportResponse:
+        try:
+            response = self.session.get(
+                url, params=params, headers=headers, timeout=timeout, stream=stream
+            )
+            response.raise_for_status()
+        except requests.exceptions.RequestException as exc:
+            error_response = exc.response
+            if error_response is None:
+                raise TransportError(str(exc)) from exc
+            raise TransportError(
+                str(exc),
+                status=error_response.status_code,
+                headers=error_response.headers,
+            ) from exc
+        return _RequestsResponse(response)
+
+    def close(self) -> None:
+        self.session.close()
+
+
+class _HttpxResponse:
+    """Adapt an ``httpx.Response``."""
+
+    def __init__(self, response: Any, httpx: Any) -> None:
+        self._response = response
+        self._httpx = httpx
+        self.status_code = response.status_code
+        self.headers = response.headers
+
+    @property
+    def content(self) -> bytes:
+        return self._response.content
+
+    def json(self) -> Any:
+        return self._response.json()
+
+    def iter_content(self, chunk_size: int) -> Iterator[bytes]:
+        try:
+            yield from self._response.iter_bytes(chunk_size=chunk_size)
+        except self._httpx.HTTPError as exc:
+            raise TransportError(str(exc)) from exc
+
+    def close(self) -> None:
+        self._response.close()
+
+
+class HttpxTransport:
+    """
+    Transport over an ``httpx.Client``, with optional HTTP/2.
+
+    With HTTP/2, concurrent requests (``get_stations_aqi``, parallel pages)
+    share one multiplexed connection instead of one connection each.
+
+    Args:
+        http2: Negotiate HTTP/2 (requires the ``h2`` package).
+        pool_size: Maximum connections kept open to the portal.
+        keep_alive: Reuse connections between requests.
+        compression: Accept gzip/deflate compressed bodies.
+        client: Client to use instead of a new one (other options ignored).
+
+    Raises:
+        ImportError: If httpx (or h2, with ``http2``) is not installed.
+    """
+
+    def __init__(
+        self,
+        *,
+        http2: bool = True,
+        pool_size: int = HTTP_POOL_SIZE,
+        keep_alive: bool = True,
+        compression: bool = True,
+        client: Any = None,
+    ) -> None:
+        import httpx
+
+        self._httpx = httpx
+        if client is None:
+            limits = httpx.Limits(
+                max_connections=pool_size,
+                max_keepalive_connections=pool_size if keep_alive else 0,
+            )
+            client = httpx.Client(
+                http2=http2,
+                limits=limits,
+                headers=_session_headers(
+                    keep_alive=keep_alive, compression=compression
+                ),
+            )
+        self.client = client
+
+    def get(
+        self,
+        url: str,
+        *,
+        params: Params,
+        headers: Dict[str, str],
+        timeout: float,
+        stream: bool = False,
+    ) -> TransportResponse:
+        httpx = self._httpx
+        try:
+            request = self.client.build_request(
+                "GET", url, params=params, headers=headers, timeout=timeout
+            )
+            response = self.client.send(request, stream=True)
+        except httpx.HTTPError as exc:
+            raise TransportError(str(exc)) from exc
+
+        if response.status_code >= 400:
+            response.close()
+            raise TransportError(
+                f"{response.status_code} error for url: {response.url}",
+                status=response.status_code,
+                headers=response.headers,
+            )
+        if not stream:
+            try:
+                response.read()
+            except httpx.HTTPError as exc:
+                raise TransportError(str(exc)) from exc
+            finally:
+                response.close()
+        return _HttpxResponse(response, httpx)
+
+    def close(self) -> None:
+        self.client.close()
@@ -0,0 +1,17 @@
+import pytest
+
+from montreal_aqi_api import api, service
+
+
+@pytest.fixture(autouse=True)
+def _reset_circuit_breaker():
+    """Keep failures of one test from opening the circuit for the next ones."""
+    api._circuit_breaker.reset()
+    api._concurrency_limiter.reset()
+    api.configure_queries(use_sql=api.QUERY_USE_SQL)
+    service.clear_station_cache()
+    yield
+    api._circuit_breaker.reset()
+    api._concurrency_limiter.reset()
+    api.configure_queries(use_sql=api.QUERY_USE_SQL)
+    service.clear_station_cache()
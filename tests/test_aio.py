@@ -0,0 +1,407 @@
+"""
+Tests for the asyncio client (montreal_aqi_api.aio)
+"""
+
+import asyncio
+import json
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+aiohttp = pytest.importorskip("aiohttp")
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from montreal_aqi_api import aio, api
+from montreal_aqi_api.api import (
+    StaleRecords,
+    _api_cache,
+    configure_cache,
+)
+from montreal_aqi_api.exceptions import (
+    APIInvalidResponse,
+    APIServerUnreachable,
+)
+
+_STATION_RECORDS = [
+    {"stationId": "3", "heure": "14", "date": "2025-01-01", "pollutant": "O3"},
+    {
+        "stationId": "3",
+        "heure": "15",
+        "date": "2025-01-01",
+        "pollutant": "PM25",
+        "valeur": "40",
+    },
+]
+
+
+def _payload(records):
+    return json.dumps({"result": {"records": records}})
+
+
+def _response(records, headers=None):
+    return 200, headers or {}, _payload(records)
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    _api_cache.clear()
+    yield
+    _api_cache.clear()
+
+
+# ============================================================================
+# AsyncClient Tests
+# ============================================================================
+
+
+def test_get_station_aqi_against_local_server():
+    """Test the client end-to-end against a local datastore_search stand-in."""
+    seen_params = []
+
+    async def handler(request):
+        seen_params.append(request.query)
+        return web.Response(text=_payload(_STATION_RECORDS))
+
+    async def scenario():
+        app = web.Application()
+        app.router.add_get("/datastore_search", handler)
+        async with TestServer(app) as server:
+            url = str(server.make_url("/datastore_search"))
+            with patch("montreal_aqi_api.aio.API_URL", url):
+                async with aio.AsyncClient(pool_size=2, limit_per_host=1) as client:
+                    return await client.get_station_aqi("3")
+
+    station = asyncio.run(scenario())
+
+    assert station is not None
+    assert station.station_id == "3"
+    assert station.hour == 15
+    assert station.aqi == 40
+    assert json.loads(seen_params[0]["filters"]) == {"stationId": "3"}
+    assert seen_params[0].getall("fields") == [
+        "stationId",
+        "date",
+        "heure",
+        "pollutant",
+        "valeur",
+    ]
+
+
+def test_fetch_uses_shared_cache():
+    """Test that a second identical query is served from the shared cache."""
+    client = aio.AsyncClient()
+    request = AsyncMock(return_value=_response([{"id": 1}]))
+
+    async def scenario():
+        with patch.object(client, "_request", request):
+            first = await client._fetch("test-aio-resource")
+            second = await client._fetch("test-aio-resource")
+        return first, second
+
+    first, second = asyncio.run(scenario())
+
+    assert first == second == [{"id": 1}]
+    assert request.await_count == 1
+
+
+@patch("montreal_aqi_api.aio.asyncio.sleep", new_callable=AsyncMock)
+def test_fetch_retries_then_succeeds(mock_sleep):
+    """Test that transient client errors are retried with backoff."""
+    client = aio.AsyncClient()
+    request = AsyncMock(
+        side_effect=[
+            aiohttp.ClientConnectionError(),
+            asyncio.TimeoutError(),
+            _response([{"id": 2}]),
+        ]
+    )
+
+    async def scenario():
+        with patch.object(client, "_request", request):
+            return await client._fetch("test-aio-retry")
+
+    assert asyncio.run(scenario()) == [{"id": 2}]
+    assert request.await_count == 3
+    assert mock_sleep.await_count == 2
+
+
+@patch("montreal_aqi_api.aio.asyncio.sleep", new_callable=AsyncMock)
+def test_fetch_unreachable_raises(mock_sleep):
+    """Test that exhausting retries raises APIServerUnreachable."""
+    client = aio.AsyncClient()
+    request = AsyncMock(side_effect=aiohttp.ClientConnectionError())
+
+    async def scenario():
+        with patch.object(client, "_request", request):
+            await client._fetch("test-aio-down")
+
+    with pytest.raises(APIServerUnreachable):
+        asyncio.run(scenario())
+
+
+def test_cancelled_probe_releases_circuit():
+    """Test a cancelled half-open probe lets the next request probe."""
+    client = aio.AsyncClient()
+    started = asyncio.Event()
+
+    async def hang(*args):
+        started.set()
+        await asyncio.Event().wait()
+
+    async def scenario():
+        with patch.object(client, "_request", AsyncMock(side_effect=hang)):
+            task = asyncio.create_task(client._fetch("test-aio-probe"))
+            await started.wait()
+            await client.close()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            return api._circuit_breaker.allow()
+
+    api.configure_retries(failure_threshold=1, cooldown=0)
+    try:
+        api._circuit_breaker.record_failure()
+        assert asyncio.run(scenario())
+    finally:
+        api.configure_retries(
+            failure_threshold=api.CIRCUIT_FAILURE_THRESHOLD,
+            cooldown=api.CIRCUIT_COOLDOWN_SECONDS,
+        )
+
+
+def test_concurrent_identical_queries_share_one_request():
+    """Test single-flight, and that a cancelled waiter does not cancel it."""
+    client = aio.AsyncClient()
+    release = asyncio.Event()
+
+    async def slow(*args):
+        await release.wait()
+        return _response([{"id": 3}])
+
+    request = AsyncMock(side_effect=slow)
+
+    async def scenario():
+        with patch.object(client, "_request", request):
+            tasks = [
+                asyncio.create_task(client._fetch("test-aio-coalesce"))
+                for _ in range(3)
+            ]
+            await asyncio.sleep(0)
+            tasks[0].cancel()
+            release.set()
+            return await asyncio.gather(*tasks, return_exceptions=True)
+
+    outcomes = asyncio.run(scenario())
+
+    assert isinstance(outcomes[0], asyncio.CancelledError)
+    assert outcomes[1:] == [[{"id": 3}], [{"id": 3}]]
+    assert request.await_count == 1
+
+
+def test_disk_cache_io_runs_off_the_event_loop(tmp_path):
+    """Test SQLite lookups and stores run in a worker thread."""
+    client = aio.AsyncClient()
+    request = AsyncMock(return_value=_response([{"id": 4}]))
+    to_thread = AsyncMock(side_effect=lambda func, *args: func(*args))
+
+    async def scenario():
+        with (
+            patch.object(client, "_request", request),
+            patch("montreal_aqi_api.aio.asyncio.to_thread", to_thread),
+        ):
+            return await client._fetch("test-aio-disk")
+
+    api.enable_disk_cache(tmp_path)
+    try:
+        assert asyncio.run(scenario()) == [{"id": 4}]
+    finally:
+        api.disable_disk_cache()
+
+    assert [call.args[0] for call in to_thread.await_args_list] == [
+        api._get_cached,
+        api._store_cached,
+    ]
+
+
+def test_primed_station_is_served_from_cache():
+    """Test primed latest-hour records and built Stations are shared."""
+    from montreal_aqi_api import service
+
+    client = aio.AsyncClient()
+    request = AsyncMock()
+    api._prime_station_records({"3": _STATION_RECORDS[1:]})
+
+    async def scenario():
+        with patch.object(client, "_request", request):
+            return await client.get_station_aqi("3")
+
+    station = asyncio.run(scenario())
+
+    assert station is not None and station.aqi == 40
+    request.assert_not_awaited()
+    assert service.get_station_aqi("3") is station
+
+
+def test_fetch_invalid_json_raises():
+    """Test that a non-JSON body raises APIInvalidResponse."""
+    client = aio.AsyncClient()
+    request = AsyncMock(return_value=(200, {}, "<html>not json</html>"))
+
+    async def scenario():
+        with patch.object(client, "_request", request):
+            await client._fetch("test-aio-invalid")
+
+    with pytest.raises(APIInvalidResponse):
+        asyncio.run(scenario())
+
+
+@patch("time.time")
+def test_fetch_revalidates_expired_entry(mock_time):
+    """Test that an expired entry is revalidated with its ETag (304)."""
+    client = aio.AsyncClient()
+    request = AsyncMock(
+        side_effect=[
+            _response([{"id": 3}], {"ETag": '"v1"'}),
+            (304, {}, ""),
+        ]
+    )
+
+    async def scenario():
+        with patch.object(client, "_request", request):
+            mock_time.return_value = 0
+            first = await client._fetch("test-aio-etag")
+            mock_time.return_value = 600  # Expired, still revalidatable
+            second = await client._fetch("test-aio-etag")
+        return first, second
+
+    first, second = asyncio.run(scenario())
+
+    assert first == second == [{"id": 3}]
+    assert request.await_args_list[0].args[1] == {}
+    assert request.await_args_list[1].args[1] == {"If-None-Match": '"v1"'}
+
+
+@patch("time.time")
+def test_fetch_serves_stale_and_refreshes_in_background(mock_time):
+    """Test that stale records are returned while a refresh task runs."""
+    client = aio.AsyncClient()
+    request = AsyncMock(side_effect=[_response([{"id": 4}]), _response([{"id": 5}])])
+
+    async def scenario():
+        with patch.object(client, "_request", request):
+            mock_time.return_value = 0
+            await client._fetch("test-aio-swr")
+            mock_time.return_value = 600
+            stale = await client._fetch("test-aio-swr")
+            again = await client._fetch("test-aio-swr")
+            await asyncio.gather(*client._refreshes.values())
+            fresh = await client._fetch("test-aio-swr")
+        await client.close()
+        return stale, again, fresh
+
+    configure_cache(serve_stale=True)
+    try:
+        stale, again, fresh = asyncio.run(scenario())
+    finally:
+        configure_cache(serve_stale=False)
+
+    assert isinstance(stale, StaleRecords)
+    assert stale == again == [{"id": 4}]
+    assert fresh == [{"id": 5}]
+    assert not isinstance(fresh, StaleRecords)
+    assert request.await_count == 2
+
+
+def test_fetch_all_gathers_pages_in_order():
+    """Test that remaining pages are fetched concurrently and merged in order."""
+    client = aio.AsyncClient()
+    records = [{"id": i} for i in range(5)]
+
+    async def fake_request(request_params, headers):
+        params = dict(request_params)
+        offset = int(params.get("offset", 0))
+        page = records[offset : offset + 2]
+        return 200, {}, json.dumps({"result": {"records": page, "total": 5}})
+
+    async def scenario():
+        with patch.object(client, "_request", side_effect=fake_request) as request:
+            result = await client.fetch_all("test-aio-all", page_size=2)
+        return result, request.await_count
+
+    assert asyncio.run(scenario()) == (records, 3)
+
+
+def test_get_stations_aqi_keeps_order_and_maps_failures():
+    """Test that failed stations are returned as None in input order."""
+    client = aio.AsyncClient()
+
+    async def fake_get_station_aqi(station_id):
+        if station_id == "999":
+            raise APIServerUnreachable("down")
+        return station_id
+
+    async def scenario():
+        with patch.object(client, "get_station_aqi", fake_get_station_aqi):
+            return await client.get_stations_aqi(["1", "999", "3"])
+
+    assert asyncio.run(scenario()) == ["1", None, "3"]
+
+
+def test_get_station_aqi_no_records():
+    """Test that a station without records returns None."""
+    client = aio.AsyncClient()
+    request = AsyncMock(return_value=_response([]))
+
+    async def scenario():
+        with patch.object(client, "_request", request):
+            return await client.get_station_aqi("999")
+
+    assert asyncio.run(scenario()) is None
+
+
+def test_list_open_stations():
+    """Test that open stations are mapped to the public dict shape."""
+    records = [
+        {
+            "numero_station": "1",
+            "nom": "Station A",
+            "adresse": "123 Rue",
+            "arrondissement_ville": "Borough A",
+        }
+    ]
+
+    async def scenario():
+        with patch.object(
+            aio.AsyncClient, "_request", AsyncMock(return_value=_response(records))
+        ):
+            return await aio.list_open_stations()
+
+    assert asyncio.run(scenario()) == [
+        {
+            "station_id": "1",
+            "name": "Station A",
+            "address": "123 Rue",
+            "borough": "Borough A",
+        }
+    ]
+
+
+def test_module_level_helpers_use_one_off_client():
+    """Test the module-level coroutines delegate to a temporary client."""
+
+    async def scenario():
+        with (
+            patch.object(
+                aio.AsyncClient, "get_station_aqi", AsyncMock(return_value="s")
+            ),
+            patch.object(
+                aio.AsyncClient, "get_stations_aqi", AsyncMock(return_value=["s"])
+            ),
+        ):
+            return (
+                await aio.get_station_aqi("3"),
+                await aio.get_stations_aqi(["3"]),
+            )
+
+    assert asyncio.run(scenario()) == ("s", ["s"])
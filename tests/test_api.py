@@ -1,17 +1,46 @@
+import json
+import threading
+import time
+from datetime import datetime
 from unittest.mock import patch, MagicMock
+from zoneinfo import ZoneInfo
 
 import pytest
 import requests
 
 from montreal_aqi_api.api import (
+    StaleRecords,
     _fetch,
+    configure_retries,
+    _freshness_deadline,
+    configure_cache,
+    configure_queries,
+    disable_disk_cache,
+    enable_disk_cache,
     get_api_metrics,
+    fetch_all_latest_records,
+    stream_records,
+    fetch_all,
+    iter_records,
+    fetch_latest_records_for_stations,
     fetch_latest_station_records,
     fetch_open_stations,
     _api_cache,
 )
-from montreal_aqi_api.exceptions import APIInvalidResponse, APIServerUnreachable
-from montreal_aqi_api.config import CACHE_TTL_SECONDS
+from montreal_aqi_api.exceptions import (
+    APIInvalidResponse,
+    APIServerUnreachable,
+    CircuitOpenError,
+)
+from montreal_aqi_api.config import (
+    CIRCUIT_COOLDOWN_SECONDS,
+    CIRCUIT_FAILURE_THRESHOLD,
+    CACHE_MAX_ENTRIES,
+    CACHE_MAX_FRESHNESS_SECONDS,
+    CACHE_TTL_SECONDS,
+    RESID_IQA_PAR_STATION_EN_TEMPS_REEL,
+    TIMEZONE,
+)
 
 
 # ============================================================================
@@ -34,6 +63,14 @@ def _normalize_params(params):
     return params
 
 
+@pytest.fixture
+def datastore_search_only():
+    """Query station records with datastore_search, as without SQL support."""
+    configure_queries(use_sql=False)
+    yield
+    configure_queries(use_sql=True)
+
+
 # ============================================================================
 # Error Handling Tests
 # ============================================================================
@@ -137,15 +174,206 @@ def test_fetch_expires_cache_after_ttl(mock_time, mock_get):
     _api_cache.clear()
 
 
+@patch("montreal_aqi_api.api.requests_session.get")
+@patch("montreal_aqi_api.api.time.time")
+def test_fetch_revalidates_expired_entry_with_etag(mock_time, mock_get):
+    """Test that an expired entry is revalidated and reused on 304."""
+    _api_cache.clear()
+    from montreal_aqi_api import api
+
+    api.reset_api_metrics()
+
+    first_response = MagicMock()
+    first_response.status_code = 200
+    first_response.headers = {"ETag": '"v1"', "Last-Modified": "Wed, 01 Jan 2025"}
+    first_response.json.return_value = {"result": {"records": [{"id": 1}]}}
+    not_modified = MagicMock()
+    not_modified.status_code = 304
+    not_modified.headers = {}
+    mock_get.side_effect = [first_response, not_modified]
+
+    mock_time.return_value = 0
+    assert _fetch("test-resource-etag") == [{"id": 1}]
+    assert mock_get.call_args_list[0].kwargs["headers"] == {}
+
+    mock_time.return_value = CACHE_TTL_SECONDS + 1
+    assert _fetch("test-resource-etag") == [{"id": 1}]
+    assert mock_get.call_args_list[1].kwargs["headers"] == {
+        "If-None-Match": '"v1"',
+        "If-Modified-Since": "Wed, 01 Jan 2025",
+    }
+    not_modified.json.assert_not_called()
+    assert get_api_metrics()["revalidated_responses"] == 1
+
+    # The revalidated entry is fresh again
+    assert _fetch("test-resource-etag") == [{"id": 1}]
+    assert mock_get.call_count == 2
+
+    _api_cache.clear()
+
+
+@patch("montreal_aqi_api.api.requests_session.get")
+@patch("montreal_aqi_api.api.time.time")
+def test_fetch_keeps_realtime_records_until_next_hour(mock_time, mock_get):
+    """Test that real-time records stay fresh until the next hourly update."""
+    _api_cache.clear()
+
+    tz = ZoneInfo(TIMEZONE)
+    published = datetime(2025, 1, 1, 14, tzinfo=tz).timestamp()
+    records = [{"stationId": "3", "date": "2025-01-01", "heure": "14"}]
+
+    mock_response = MagicMock()
+    mock_response.json.return_value = {"result": {"records": records}}
+    mock_get.return_value = mock_response
+
+    # Fetched 10 minutes after the 14h records were published
+    mock_time.return_value = published + 600
+    _fetch("test-resource-hourly")
+
+    # Past the TTL, but the 15h records cannot exist yet
+    mock_time.return_value = published + 600 + CACHE_TTL_SECONDS + 1
+    _fetch("test-resource-hourly")
+    assert mock_get.call_count == 1
+
+    mock_time.return_value = published + 3600
+    _fetch("test-resource-hourly")
+    assert mock_get.call_count == 2
+
+    _api_cache.clear()
+
+
+def test_freshness_deadline_is_capped():
+    """Test that lagging records do not extend freshness beyond the cap."""
+    records = [{"stationId": "3", "date": "2999-01-01", "heure": "1"}]
+
+    assert _freshness_deadline(records, 0) == CACHE_MAX_FRESHNESS_SECONDS
+    assert _freshness_deadline([{"id": 1}], 0) == CACHE_TTL_SECONDS
+
+
+@pytest.fixture
+def serve_stale():
+    """Enable the stale-while-revalidate mode for one test."""
+    from montreal_aqi_api import api
+
+    _api_cache.clear()
+    api.reset_api_metrics()
+    configure_cache(serve_stale=True)
+    yield
+    configure_cache(serve_stale=False)
+    _api_cache.clear()
+
+
+def _join_refreshes():
+    for thread in threading.enumerate():
+        if thread.name == "montreal-aqi-refresh":
+            thread.join(timeout=5)
+
+
+@patch("montreal_aqi_api.api.requests_session.get")
+@patch("montreal_aqi_api.api.time.time")
+def test_serve_stale_returns_immediately_and_refreshes(
+    mock_time, mock_get, serve_stale
+):
+    """Test that expired records are served while refreshed in the background."""
+    release = threading.Event()
+
+    def fake_get(*args, **kwargs):
+        response = MagicMock()
+        if mock_get.call_count == 1:
+            response.json.return_value = {"result": {"records": [{"id": 1}]}}
+        else:
+            release.wait(timeout=5)
+            response.json.return_value = {"result": {"records": [{"id": 2}]}}
+        return response
+
+    mock_get.side_effect = fake_get
+
+    mock_time.return_value = 0
+    assert not isinstance(_fetch("test-resource-swr"), StaleRecords)
+
+    # The refresh is blocked, yet stale records are returned right away
+    mock_time.return_value = CACHE_TTL_SECONDS + 1
+    first = _fetch("test-resource-swr")
+    second = _fetch("test-resource-swr")
+    assert isinstance(first, StaleRecords)
+    assert first == second == [{"id": 1}]
+
+    release.set()
+    _join_refreshes()
+
+    assert mock_get.call_count == 2
+    fresh = _fetch("test-resource-swr")
+    assert fresh == [{"id": 2}]
+    assert not isinstance(fresh, StaleRecords)
+
+    metrics = get_api_metrics()
+    assert metrics["stale_responses"] == 2
+    assert metrics["background_refreshes"] == 1
+
+
+@patch("montreal_aqi_api.api.time.sleep")
+@patch("montreal_aqi_api.api.requests_session.get")
+@patch("montreal_aqi_api.api.time.time")
+def test_serve_stale_keeps_serving_when_refresh_fails(
+    mock_time, mock_get, mock_sleep, serve_stale
+):
+    """Test that stale records are still served when the API is down."""
+    mock_response = MagicMock()
+    mock_response.json.return_value = {"result": {"records": [{"id": 1}]}}
+    mock_get.return_value = mock_response
+
+    mock_time.return_value = 0
+    _fetch("test-resource-sie")
+
+    mock_get.side_effect = requests.exceptions.ConnectionError()
+    mock_time.return_value = CACHE_TTL_SECONDS + 1
+    assert _fetch("test-resource-sie") == [{"id": 1}]
+    _join_refreshes()
+
+    stale = _fetch("test-resource-sie")
+    assert isinstance(stale, StaleRecords)
+    assert stale == [{"id": 1}]
+    _join_refreshes()
+
+
+@patch("montreal_aqi_api.api.requests_session.get")
+@patch("montreal_aqi_api.api.time.time")
+def test_background_refresh_bug_is_not_hidden(mock_time, mock_get, serve_stale):
+    """Test an unexpected error in a refresh reaches threading.excepthook."""
+    mock_response = MagicMock()
+    mock_response.json.return_value = {"result": {"records": [{"id": 1}]}}
+    mock_get.return_value = mock_response
+
+    mock_time.return_value = 0
+    _fetch("test-resource-bug")
+
+    mock_get.side_effect = RuntimeError("bug")
+    mock_time.return_value = CACHE_TTL_SECONDS + 1
+    with patch("threading.excepthook") as excepthook:
+        assert _fetch("test-resource-bug") == [{"id": 1}]
+        _join_refreshes()
+
+    (args,), _ = excepthook.call_args
+    assert isinstance(args.exc_value, RuntimeError)
+
+
+@patch("montreal_aqi_api.api.time.sleep")
+@patch("montreal_aqi_api.api.requests_session.get")
+def test_serve_stale_without_cached_data_raises(mock_get, mock_sleep, serve_stale):
+    """Test that without cached data the fetch is synchronous as usual."""
+    mock_get.side_effect = requests.exceptions.ConnectionError()
+
+    with pytest.raises(APIServerUnreachable):
+        _fetch("test-resource-swr-empty")
+
+
 @patch("montreal_aqi_api.api.requests_session.get")
 def test_get_api_metrics(mock_get):
     """Test that metrics are correctly computed."""
     _api_cache.clear()
     from montreal_aqi_api import api
 
-    api.total_api_requests = 0
-    api.cache_hits = 0
-    api.cache_misses = 0
+    api.reset_api_metrics()
 
     resource_id = "test-resource-3"
     mock_response = MagicMock()
@@ -164,9 +392,66 @@ def test_get_api_metrics(mock_get):
     assert metrics["cache_hit_rate"] == 0.5
 
     _api_cache.clear()
-    api.total_api_requests = 0
-    api.cache_hits = 0
-    api.cache_misses = 0
+    api.reset_api_metrics()
+
+
+@patch("montreal_aqi_api.api.requests_session.get")
+def test_get_api_metrics_reports_evictions_and_expirations(mock_get):
+    """Test that cache evictions and expirations are reported in metrics."""
+    _api_cache.clear()
+    configure_cache(max_entries=1)
+
+    mock_response = MagicMock()
+    mock_response.json.return_value = {"result": {"records": [{"id": 1}]}}
+    mock_get.return_value = mock_response
+
+    before = get_api_metrics()
+    try:
+        _fetch("test-resource-evict-1")
+        _fetch("test-resource-evict-2")  # Evicts the first query
+        with patch("montreal_aqi_api.api.time.time") as mock_time:
+            mock_time.return_value = 10**10  # Far past the TTL
+            _fetch("test-resource-evict-2")  # Expired, fetched again
+    finally:
+        configure_cache(max_entries=CACHE_MAX_ENTRIES)
+
+    metrics = get_api_metrics()
+    assert metrics["cache_max_size"] == CACHE_MAX_ENTRIES
+    assert metrics["cache_evictions"] - before["cache_evictions"] == 1
+    assert metrics["cache_expirations"] - before["cache_expirations"] == 1
+    assert metrics["cache_bytes"] > 0
+    assert mock_get.call_count == 3
+
+    _api_cache.clear()
+
+
+@patch("montreal_aqi_api.api.requests_session.get")
+def test_fetch_uses_disk_cache_across_processes(mock_get, tmp_path):
+    """Test that a cold in-memory cache is warmed from the persistent cache."""
+    _api_cache.clear()
+    mock_response = MagicMock()
+    mock_response.json.return_value = {"result": {"records": [{"id": 1}]}}
+    mock_get.return_value = mock_response
+
+    db_path = enable_disk_cache(tmp_path)
+    try:
+        assert db_path == tmp_path / "responses.sqlite3"
+        _fetch("test-resource-disk")
+
+        # Simulate a new process: empty memory cache, same cache directory
+        _api_cache.clear()
+        hits_before = get_api_metrics()["disk_cache_hits"]
+        enable_disk_cache(tmp_path)
+        result = _fetch("test-resource-disk")
+    finally:
+        disable_disk_cache()
+
+    assert result == [{"id": 1}]
+    assert mock_get.call_count == 1
+    assert get_api_metrics()["disk_cache_hits"] == hits_before + 1
+    assert "test-resource-disk" in _api_cache
+
+    _api_cache.clear()
 
 
 @patch("montreal_aqi_api.api.requests_session.get")
@@ -231,6 +516,181 @@ def test_fetch_retries_with_backoff(mock_sleep, mock_get):
     _api_cache.clear()
 
 
+def _http_error(status, headers=None):
+    response = requests.Response()
+    response.status_code = status
+    response.headers.update(headers or {})
+    return requests.exceptions.HTTPError(f"{status} error", response=response)
+
+
+@patch("montreal_aqi_api.api.time.sleep")
+@patch("montreal_aqi_api.api.requests_session.get")
+def test_fetch_does_not_retry_client_errors(mock_get, mock_sleep):
+    """Test that a 4xx response fails at once without retries."""
+    mock_get.return_value.raise_for_status.side_effect = _http_error(404)
+
+    with pytest.raises(APIInvalidResponse):
+        _fetch("test-resource-404")
+
+    assert mock_get.call_count == 1
+    mock_sleep.assert_not_called()
+
+
+@patch("montreal_aqi_api.api.time.sleep")
+@patch("montreal_aqi_api.api.requests_session.get")
+def test_fetch_honors_retry_after(mock_get, mock_sleep):
+    """Test that a 503 with Retry-After waits the requested delay."""
+    _api_cache.clear()
+
+    failing = MagicMock()
+    failing.raise_for_status.side_effect = _http_error(503, {"Retry-After": "7"})
+    success = MagicMock()
+    success.json.return_value = {"result": {"records": [{"id": 1}]}}
+    mock_get.side_effect = [failing, success]
+
+    assert _fetch("test-resource-503") == [{"id": 1}]
+    mock_sleep.assert_called_once_with(7.0)
+
+    _api_cache.clear()
+
+
+@patch("montreal_aqi_api.api.time.sleep")
+@patch("montreal_aqi_api.api.requests_session.get")
+def test_circuit_opens_and_fails_fast(mock_get, mock_sleep):
+    """Test that repeated failures open the circuit and skip requests."""
+    configure_retries(failure_threshold=2)
+    try:
+        mock_get.side_effect = requests.exceptions.ConnectionError()
+
+        for _ in range(2):
+            with pytest.raises(APIServerUnreachable):
+                _fetch("test-resource-circuit")
+        calls = mock_get.call_count
+
+        with pytest.raises(CircuitOpenError):
+            _fetch("test-resource-circuit")
+        assert mock_get.call_count == calls
+
+        metrics = get_api_metrics()
+        assert metrics["circuit_state"] == "open"
+        assert metrics["circuit_failures"] == 2
+    finally:
+        configure_retries(failure_threshold=CIRCUIT_FAILURE_THRESHOLD)
+
+
+@patch("montreal_aqi_api.api.time.sleep")
+@patch("montreal_aqi_api.api.requests_session.get")
+def test_circuit_probe_raising_unexpected_error_is_released(mock_get, mock_sleep):
+    """Test a probe failing with a non-transport error does not wedge the circuit."""
+    from montreal_aqi_api import api
+
+    configure_retries(failure_threshold=1, cooldown=0)
+    try:
+        mock_get.side_effect = requests.exceptions.ConnectionError()
+        with pytest.raises(APIServerUnreachable):
+            _fetch("test-resource-probe")
+
+        mock_get.side_effect = RuntimeError("bug")
+        with pytest.raises(RuntimeError):
+            _fetch("test-resource-probe")
+        assert api._circuit_breaker.allow()
+    finally:
+        configure_retries(
+            failure_threshold=CIRCUIT_FAILURE_THRESHOLD,
+            cooldown=CIRCUIT_COOLDOWN_SECONDS,
+        )
+        _api_cache.clear()
+
+
+# ============================================================================
+# Request Coalescing Tests
+# ============================================================================
+
+
+def _run_concurrently(count, target):
+    """Start ``count`` threads running ``target`` and return their outcomes."""
+    outcomes = [None] * count
+
+    def runner(idx):
+        try:
+            outcomes[idx] = target()
+        except Exception as exc:
+            outcomes[idx] = exc
+
+    threads = [threading.Thread(target=runner, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads, outcomes
+
+
+def _wait_for_coalesced(api_module, expected, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while api_module.get_api_metrics()["coalesced_requests"] < expected:
+        assert time.monotonic() < deadline, "followers never coalesced"
+        time.sleep(0.01)
+
+
+@patch("montreal_aqi_api.api.requests_session.get")
+def test_fetch_coalesces_concurrent_identical_queries(mock_get):
+    """Test that concurrent identical queries share a single API request."""
+    from montreal_aqi_api import api
+
+    _api_cache.clear()
+    api.reset_api_metrics()
+    release = threading.Event()
+
+    def slow_get(*args, **kwargs):
+        release.wait(timeout=5)
+        return MagicMock(json=lambda: {"result": {"records": [{"id": 1}]}})
+
+    mock_get.side_effect = slow_get
+
+    threads, outcomes = _run_concurrently(4, lambda: _fetch("test-resource-coalesce"))
+    _wait_for_coalesced(api, 3)
+    release.set()
+    for thread in threads:
+        thread.join(timeout=5)
+
+    assert mock_get.call_count == 1
+    assert outcomes == [[{"id": 1}]] * 4
+    assert get_api_metrics()["coalesced_requests"] == 3
+    assert api._inflight == {}
+
+    _api_cache.clear()
+    api.reset_api_metrics()
+
+
+@patch("montreal_aqi_api.api.time.sleep")
+@patch("montreal_aqi_api.api.requests_session.get")
+def test_fetch_coalesced_callers_share_failure(mock_get, mock_sleep):
+    """Test that waiting callers receive the first caller's exception."""
+    from montreal_aqi_api import api
+
+    _api_cache.clear()
+    api.reset_api_metrics()
+    release = threading.Event()
+
+    def failing_get(*args, **kwargs):
+        release.wait(timeout=5)
+        raise requests.exceptions.ConnectionError()
+
+    mock_get.side_effect = failing_get
+
+    threads, outcomes = _run_concurrently(
+        3, lambda: _fetch("test-resource-coalesce-fail")
+    )
+    _wait_for_coalesced(api, 2)
+    release.set()
+    for thread in threads:
+        thread.join(timeout=5)
+
+    assert all(isinstance(o, APIServerUnreachable) for o in outcomes)
+    assert api._inflight == {}
+
+    _api_cache.clear()
+    api.reset_api_metrics()
+
+
 # ============================================================================
 
 
@@ -333,6 +793,7 @@ def test_fetch_latest_station_records_missing_heure(mock_get):
     _api_cache.clear()
 
 
+@pytest.mark.usefixtures("datastore_search_only")
 @patch("montreal_aqi_api.api.requests_session.get")
 def test_fetch_latest_station_records_non_string_station_id(mock_get):
     """Test that correct station filter is sent to API."""
@@ -367,6 +828,7 @@ def test_fetch_latest_station_records_non_string_station_id(mock_get):
     _api_cache.clear()
 
 
+@pytest.mark.usefixtures("datastore_search_only")
 @patch("montreal_aqi_api.api.requests_session.get")
 def test_fetch_latest_station_records_multiple_hours(mock_get):
     """Test that only records from latest hour are returned."""
@@ -403,6 +865,547 @@ def test_fetch_latest_station_records_multiple_hours(mock_get):
     _api_cache.clear()
 
 
+# ============================================================================
+# datastore_search_sql Tests
+# ============================================================================
+
+
+def _sql_portal(records, *, sql_status=200):
+    """Fake requests_session.get answering both datastore endpoints."""
+    calls = []
+
+    def get(url, *args, **kwargs):
+        params = _normalize_params(kwargs.get("params", {}))
+        calls.append((url.rsplit("/", 1)[-1], params))
+        if url.endswith("datastore_search_sql"):
+            if sql_status != 200:
+                error = MagicMock(status_code=sql_status)
+                error.raise_for_status.side_effect = requests.exceptions.HTTPError(
+                    response=error
+                )
+                return error
+            station_ids = [
+                part.strip(" '")
+                for part in params["sql"].split("IN (")[1].split(")")[0].split(",")
+            ]
+            latest = {}
+            for record in records:
+                if record["stationId"] in station_ids:
+                    latest[record["stationId"]] = max(
+                        latest.get(record["stationId"], -1), int(record["heure"])
+                    )
+            page = [r for r in records if latest.get(r["stationId"]) == int(r["heure"])]
+        else:
+            wanted = json.loads(params["filters"])["stationId"]
+            wanted = wanted if isinstance(wanted, list) else [wanted]
+            page = [r for r in records if r["stationId"] in wanted]
+        return MagicMock(json=lambda: {"result": {"records": page}})
+
+    return get, calls
+
+
+_SQL_RECORDS = [
+    {"stationId": "3", "heure": "9", "pollutant": "O3"},
+    {"stationId": "3", "heure": "10", "pollutant": "O3"},
+    {"stationId": "3", "heure": "10", "pollutant": "PM"},
+    {"stationId": "80", "heure": "8", "pollutant": "NO2"},
+]
+
+
+@patch("montreal_aqi_api.api.requests_session.get")
+def test_fetch_latest_station_records_pushes_down_sql(mock_get):
+    """Test the latest hour is selected server-side and then cached."""
+    _api_cache.clear()
+    mock_get.side_effect, calls = _sql_portal(_SQL_RECORDS)
+
+    result = fetch_latest_station_records("3")
+
+    assert [r["pollutant"] for r in result] == ["O3", "PM"]
+    assert [endpoint for endpoint, _ in calls] == ["datastore_search_sql"]
+    sql = calls[0][1]["sql"]
+    assert "\"stationId\" IN ('3')" in sql
+    assert 'max(l."heure"::int)' in sql
+
+    assert fetch_latest_station_records("3") == result
+    assert len(calls) == 1
+
+    _api_cache.clear()
+
+
+@pytest.mark.parametrize("use_sql", [True, False])
+@patch("montreal_aqi_api.api.requests_session.get")
+def test_primed_station_records_do_not_truncate_queries(mock_get, use_sql):
+    """Test primed latest-hour records are not served to paging queries."""
+    from montreal_aqi_api.api import STATION_RECORD_FIELDS, _prime_station_records
+
+    _api_cache.clear()
+    configure_queries(use_sql=use_sql)
+    mock_get.side_effect, calls = _sql_portal(_SQL_RECORDS)
+    _prime_station_records({"80": [_SQL_RECORDS[3]]})
+
+    assert fetch_latest_station_records("80") == [_SQL_RECORDS[3]]
+    fetch_latest_station_records("3")
+    assert len(calls) == 1
+
+    records = fetch_all(
+        RESID_IQA_PAR_STATION_EN_TEMPS_REEL,
+        filters={"stationId": "3"},
+        fields=STATION_RECORD_FIELDS,
+    )
+
+    assert [r["heure"] for r in records] == ["9", "10", "10"]
+
+    _api_cache.clear()
+
+
+@patch("montreal_aqi_api.api.requests_session.get")
+def test_fetch_latest_records_for_stations_single_sql_query(mock_get):
+    """Test a subset of stations costs a single SQL query."""
+    _api_cache.clear()
+    mock_get.side_effect, calls = _sql_portal(_SQL_RECORDS)
+
+    result = fetch_latest_records_for_stations(["80", "3"])
+
+    assert list(result) == ["80", "3"]
+    assert [r["heure"] for r in result["3"]] == ["10", "10"]
+    assert [endpoint for endpoint, _ in calls] == ["datastore_search_sql"]
+
+    _api_cache.clear()
+
+
+@pytest.mark.parametrize("status", [403, 404])
+@patch("montreal_aqi_api.api.requests_session.get")
+def test_sql_unavailable_falls_back_to_datastore_search(mock_get, status):
+    """Test a refused SQL query falls back, and SQL is not tried again."""
+    _api_cache.clear()
+    mock_get.side_effect, calls = _sql_portal(_SQL_RECORDS, sql_status=status)
+
+    assert [r["pollutant"] for r in fetch_latest_station_records("3")] == [
+        "O3",
+        "PM",
+    ]
+    assert [r["heure"] for r in fetch_latest_station_records("80")] == ["8"]
+
+    assert [endpoint for endpoint, _ in calls] == [
+        "datastore_search_sql",
+        "datastore_search",
+        "datastore_search",
+    ]
+
+    _api_cache.clear()
+
+
+@patch("montreal_aqi_api.api.requests_session.get")
+def test_sql_query_error_falls_back_for_that_query(mock_get, caplog):
+    """Test a 409 (SQL error) falls back to datastore_search but keeps SQL."""
+    from montreal_aqi_api import api
+
+    _api_cache.clear()
+    mock_get.side_effect, calls = _sql_portal(_SQL_RECORDS, sql_status=409)
+
+    with caplog.at_level("DEBUG", logger="montreal_aqi_api.api"):
+        records = fetch_latest_station_records("3")
+
+    assert [r["pollutant"] for r in records] == ["O3", "PM"]
+    assert [endpoint for endpoint, _ in calls] == [
+        "datastore_search_sql",
+        "datastore_search",
+    ]
+    assert api._sql_enabled()
+    assert not [r for r in caplog.records if r.levelname == "ERROR"]
+
+    _api_cache.clear()
+
+
+@pytest.mark.parametrize("status", [400, 403, 404])
+@patch("montreal_aqi_api.api.requests_session.get")
+def test_sql_unavailable_statuses_disable_sql(mock_get, status, caplog):
+    """Test 400/403/404 stop using SQL, and probing logs no error."""
+    from montreal_aqi_api import api
+
+    _api_cache.clear()
+    mock_get.side_effect, _calls = _sql_portal(_SQL_RECORDS, sql_status=status)
+
+    with caplog.at_level("DEBUG", logger="montreal_aqi_api.api"):
+        assert [r["pollutant"] for r in fetch_latest_station_records("3")] == [
+            "O3",
+            "PM",
+        ]
+
+    assert not api._sql_enabled()
+    assert not [r for r in caplog.records if r.levelname == "ERROR"]
+
+    _api_cache.clear()
+
+
+@pytest.mark.parametrize("status", [400, 409])
+@patch("montreal_aqi_api.api.requests_session.get")
+def test_sql_client_errors_fall_back_for_several_stations(mock_get, status):
+    """Test a batch of stations is fetched with datastore_search instead."""
+    _api_cache.clear()
+    mock_get.side_effect, calls = _sql_portal(_SQL_RECORDS, sql_status=status)
+
+    by_station = fetch_latest_records_for_stations(["3", "80"])
+
+    assert {sid: len(records) for sid, records in by_station.items()} == {
+        "3": 2,
+        "80": 1,
+    }
+    assert calls[-1][0] == "datastore_search"
+
+    _api_cache.clear()
+
+
+@patch("montreal_aqi_api.api.requests_session.get")
+def test_sql_queries_coalesce(mock_get):
+    """Test concurrent SQL queries for the same station share one request."""
+    from montreal_aqi_api import api
+
+    _api_cache.clear()
+    api.reset_api_metrics()
+    release = threading.Event()
+    portal, calls = _sql_portal(_SQL_RECORDS)
+
+    def slow_get(*args, **kwargs):
+        release.wait(timeout=5)
+        return portal(*args, **kwargs)
+
+    mock_get.side_effect = slow_get
+
+    threads, outcomes = _run_concurrently(4, lambda: fetch_latest_station_records("3"))
+    _wait_for_coalesced(api, 3)
+    release.set()
+    for thread in threads:
+        thread.join(timeout=5)
+
+    assert [endpoint for endpoint, _ in calls] == ["datastore_search_sql"]
+    assert [[r["pollutant"] for r in outcome] for outcome in outcomes] == [
+        ["O3", "PM"]
+    ] * 4
+
+    _api_cache.clear()
+
+
+@patch("montreal_aqi_api.api.requests_session.get")
+@patch("montreal_aqi_api.api.time.time")
+def test_sql_serve_stale_and_revalidate(mock_time, mock_get, serve_stale):
+    """Test expired SQL results are served stale and revalidated by ETag."""
+    release = threading.Event()
+    portal, _calls = _sql_portal(_SQL_RECORDS)
+    headers = []
+
+    def fake_get(url, *args, **kwargs):
+        headers.append(kwargs["headers"])
+        if len(headers) == 1:
+            response = portal(url, *args, **kwargs)
+            response.headers = {"ETag": '"v1"'}
+            return response
+        release.wait(timeout=5)
+        return MagicMock(status_code=304, headers={})
+
+    mock_get.side_effect = fake_get
+
+    mock_time.return_value = 0
+    fresh = fetch_latest_station_records("3")
+    assert not isinstance(fresh, StaleRecords)
+
+    # The refresh is blocked, yet the expired records are returned at once
+    mock_time.return_value = CACHE_TTL_SECONDS + 1
+    stale = fetch_latest_station_records("3")
+    assert isinstance(stale, StaleRecords)
+    assert stale == fresh
+
+    release.set()
+    _join_refreshes()
+
+    assert headers[1] == {"If-None-Match": '"v1"'}
+    assert get_api_metrics()["revalidated_responses"] == 1
+    refreshed = fetch_latest_station_records("3")
+    assert not isinstance(refreshed, StaleRecords)
+    assert refreshed == fresh
+    assert len(headers) == 2
+
+
+def test_latest_records_sql_accepts_numeric_station_ids_only():
+    """Test station IDs are checked, then quoted as SQL string literals."""
+    from montreal_aqi_api.api import _latest_records_sql, _sql_literal
+
+    assert "IN ('3', '80')" in _latest_records_sql(["3", "80"])
+    with pytest.raises(ValueError):
+        _latest_records_sql(["3", "1' OR '1'='1"])
+    assert _sql_literal("1' OR '1'='1") == "'1'' OR ''1''=''1'"
+
+
+@patch("montreal_aqi_api.api.requests_session.get")
+def test_non_numeric_station_id_is_not_queried_with_sql(mock_get):
+    """Test a non-numeric station ID falls back to datastore_search."""
+    _api_cache.clear()
+    mock_get.side_effect, calls = _sql_portal(
+        [{"stationId": "x'", "heure": "1", "pollutant": "O3"}]
+    )
+
+    assert [r["heure"] for r in fetch_latest_station_records("x'")] == ["1"]
+    assert [endpoint for endpoint, _ in calls] == ["datastore_search"]
+
+    _api_cache.clear()
+
+
+# ============================================================================
+# fetch_latest_records_for_stations Tests
+# ============================================================================
+
+
+@pytest.mark.usefixtures("datastore_search_only")
+@patch("montreal_aqi_api.api.requests_session.get")
+def test_fetch_latest_records_for_stations_single_request(mock_get):
+    """Test that a subset is fetched with one list-valued stationId filter."""
+    _api_cache.clear()
+    records = [
+        {"stationId": "3", "heure": "11", "pollutant": "O3"},
+        {"stationId": "3", "heure": "12", "pollutant": "O3"},
+        {"stationId": 80, "heure": "9", "pollutant": "PM"},
+        {"stationId": "80", "heure": "10", "pollutant": "NO2"},
+        {"stationId": "80", "heure": "10", "pollutant": "PM"},
+    ]
+    mock_get.return_value = MagicMock(json=lambda: {"result": {"records": records}})
+
+    result = fetch_latest_records_for_stations(["80", "3", "999", "3"])
+
+    assert mock_get.call_count == 1
+    params = _normalize_params(mock_get.call_args.kwargs["params"])
+    assert json.loads(params["filters"]) == {"stationId": ["80", "3", "999"]}
+    assert list(result) == ["80", "3"]
+    assert [r["pollutant"] for r in result["80"]] == ["NO2", "PM"]
+    assert [r["heure"] for r in result["3"]] == ["12"]
+
+    # The stations are now cached for single-station queries
+    assert [r["heure"] for r in fetch_latest_station_records("3")] == ["12"]
+    assert fetch_latest_records_for_stations(["3", "80"]) == result
+    assert mock_get.call_count == 1
+
+    _api_cache.clear()
+
+
+@pytest.mark.usefixtures("datastore_search_only")
+@patch("montreal_aqi_api.api.STATION_FILTER_CHUNK_SIZE", 2)
+@patch("montreal_aqi_api.api.requests_session.get")
+def test_fetch_latest_records_for_stations_chunks_long_lists(mock_get):
+    """Test that long ID lists are split into several filtered requests."""
+    _api_cache.clear()
+
+    def side_effect_func(*args, **kwargs):
+        params = _normalize_params(kwargs.get("params", {}))
+        station_ids = json.loads(params["filters"])["stationId"]
+        assert len(station_ids) <= 2
+        page = [{"stationId": sid, "heure": "5"} for sid in station_ids]
+        return MagicMock(json=lambda: {"result": {"records": page}})
+
+    mock_get.side_effect = side_effect_func
+
+    result = fetch_latest_records_for_stations(["1", "2", "3", "4", "5"])
+
+    assert mock_get.call_count == 3
+    assert list(result) == ["1", "2", "3", "4", "5"]
+
+    _api_cache.clear()
+
+
+# ============================================================================
+# fetch_all_latest_records Tests
+# ============================================================================
+
+
+@patch("montreal_aqi_api.api.API_REQUEST_LIMIT", 3)
+@patch("montreal_aqi_api.api.requests_session.get")
+def test_fetch_all_latest_records_pages_and_groups(mock_get):
+    """Test that the bulk fetch pages through the resource and groups by station."""
+    _api_cache.clear()
+
+    pages = [
+        [
+            {"stationId": "1", "heure": "11", "pollutant": "O3"},
+            {"stationId": "1", "heure": "12", "pollutant": "O3"},
+            {"stationId": "3", "heure": "12", "pollutant": "PM"},
+        ],
+        [
+            {"stationId": "1", "heure": "12", "pollutant": "NO2"},
+            {"stationId": "3", "heure": "invalid", "pollutant": "PM"},
+        ],
+    ]
+
+    def side_effect_func(*args, **kwargs):
+        params = _normalize_params(kwargs.get("params", {}))
+        assert params["limit"] == "3"
+        assert "filters" not in params
+        page = pages[int(params.get("offset", 0)) // 3]
+        return MagicMock(json=lambda: {"result": {"records": page}})
+
+    mock_get.side_effect = side_effect_func
+
+    result = fetch_all_latest_records()
+
+    assert mock_get.call_count == 2
+    assert set(result) == {"1", "3"}
+    assert [r["pollutant"] for r in result["1"]] == ["O3", "NO2"]
+    assert [r["pollutant"] for r in result["3"]] == ["PM"]
+
+    _api_cache.clear()
+
+
+@patch("montreal_aqi_api.api.requests_session.get")
+def test_fetch_all_latest_records_single_page(mock_get):
+    """Test that a short first page ends the bulk fetch."""
+    _api_cache.clear()
+
+    mock_response = MagicMock()
+    mock_response.json.return_value = {
+        "result": {
+            "records": [
+                {"stationId": 80, "heure": "9"},
+                {"heure": "9"},  # Missing stationId
+                {"stationId": "3"},  # Missing heure
+            ]
+        }
+    }
+    mock_get.return_value = mock_response
+
+    result = fetch_all_latest_records()
+
+    assert mock_get.call_count == 1
+    assert result == {"80": [{"stationId": 80, "heure": "9"}]}
+
+    _api_cache.clear()
+
+
+def _paged_get(records, total=None, page_size=2):
+    """Return a fake requests get serving ``records`` by offset/limit."""
+
+    def get(*args, **kwargs):
+        params = _normalize_params(kwargs.get("params", {}))
+        assert params["limit"] == str(page_size)
+        offset = int(params.get("offset", 0))
+        result = {"records": records[offset : offset + page_size]}
+        if total is not None:
+            result["total"] = total
+        return MagicMock(json=lambda: {"result": result})
+
+    return get
+
+
+@patch("montreal_aqi_api.api.requests_session.get")
+def test_fetch_all_pages_concurrently_in_order(mock_get):
+    """Test that pages after the first are fetched per result.total and merged."""
+    _api_cache.clear()
+    records = [{"id": i} for i in range(7)]
+    mock_get.side_effect = _paged_get(records, total=7)
+
+    assert fetch_all("test-resource-all", page_size=2, max_workers=3) == records
+    assert mock_get.call_count == 4
+
+    # Every page is cached
+    assert list(iter_records("test-resource-all", page_size=2)) == records
+    assert mock_get.call_count == 4
+
+    _api_cache.clear()
+
+
+@patch("montreal_aqi_api.api.requests_session.get")
+def test_fetch_all_without_total_pages_serially(mock_get):
+    """Test that pages are fetched until a short page without a total."""
+    _api_cache.clear()
+    records = [{"id": i} for i in range(4)]
+    mock_get.side_effect = _paged_get(records)
+
+    assert fetch_all("test-resource-all-serial", page_size=2) == records
+    assert mock_get.call_count == 3  # The last page is empty
+
+    _api_cache.clear()
+
+
+@patch("montreal_aqi_api.api.requests_session.get")
+def test_fetch_all_keeps_paging_past_outdated_total(mock_get):
+    """Test that records added after the first page are not dropped."""
+    _api_cache.clear()
+    records = [{"id": i} for i in range(5)]
+    mock_get.side_effect = _paged_get(records, total=4)
+
+    assert fetch_all("test-resource-all-grown", page_size=2) == records
+
+    _api_cache.clear()
+
+
+def _streamed_response(body, chunk_size=16):
+    data = json.dumps(body).encode()
+    response = MagicMock()
+    response.iter_content.return_value = [
+        data[i : i + chunk_size] for i in range(0, len(data), chunk_size)
+    ]
+    return response
+
+
+@patch("montreal_aqi_api.api.API_REQUEST_LIMIT", 3)
+@patch("montreal_aqi_api.api.requests_session.get")
+def test_fetch_all_latest_records_streamed(mock_get):
+    """Test that a streamed bulk fetch groups records and caches the result."""
+    _api_cache.clear()
+
+    pages = [
+        [
+            {"stationId": "1", "heure": "11", "pollutant": "O3"},
+            {"stationId": "1", "heure": "12", "pollutant": "O3"},
+            {"stationId": "3", "heure": "12", "pollutant": "PM"},
+        ],
+        [{"stationId": "1", "heure": "12", "pollutant": "NO2"}],
+    ]
+
+    def side_effect_func(*args, **kwargs):
+        assert kwargs["stream"] is True
+        params = _normalize_params(kwargs.get("params", {}))
+        page = pages[int(params.get("offset", 0)) // 3]
+        return _streamed_response({"result": {"records": page, "total": 4}})
+
+    mock_get.side_effect = side_effect_func
+
+    result = fetch_all_latest_records(stream=True)
+
+    assert mock_get.call_count == 2
+    assert [r["pollutant"] for r in result["1"]] == ["O3", "NO2"]
+    assert [r["pollutant"] for r in result["3"]] == ["PM"]
+
+    # Only the latest-hour records are cached
+    assert fetch_all_latest_records(stream=True) == result
+    assert mock_get.call_count == 2
+
+    _api_cache.clear()
+
+
+@patch("montreal_aqi_api.api.requests_session.get")
+def test_stream_records_invalid_body_raises(mock_get):
+    """Test that a malformed streamed body raises APIInvalidResponse."""
+    mock_get.return_value = _streamed_response({"result": {"records": "nope"}})
+
+    with pytest.raises(APIInvalidResponse):
+        list(stream_records("test-resource-stream"))
+
+    mock_get.return_value.close.assert_called_once()
+
+
+@patch("montreal_aqi_api.api.requests_session.get")
+def test_stream_records_connection_lost_raises(mock_get):
+    """Test that a connection dropping mid-stream raises APIServerUnreachable."""
+
+    def chunks():
+        yield b'{"result": {"records": [{"id": 1}, '
+        raise requests.exceptions.ChunkedEncodingError()
+
+    mock_get.return_value.iter_content.return_value = chunks()
+
+    records = stream_records("test-resource-stream")
+    assert next(records) == {"id": 1}
+    with pytest.raises(APIServerUnreachable):
+        next(records)
+
+
 # ============================================================================
 # fetch_open_stations Tests
 # ============================================================================
@@ -0,0 +1,125 @@
+"""
+Tests for the array-backed StationBatch (batch.py)
+"""
+
+from dataclasses import replace
+
+import pytest
+
+from montreal_aqi_api.batch import PollutantView, StationBatch
+from montreal_aqi_api.history import Reading
+from montreal_aqi_api.service import _build_station
+
+
+def _record(station, day, hour, pollutant, value):
+    return {
+        "stationId": station,
+        "date": day,
+        "heure": str(hour),
+        "pollutant": pollutant,
+        "valeur": str(value),
+    }
+
+
+_RECORDS = [
+    _record("3", "2025-01-01", 14, "O3", 22),
+    _record("3", "2025-01-01", 14, "PM25", 40),
+    _record("3", "2025-01-01", 14, "PM", 35),
+    _record("3", "2025-01-01", 15, "NO2", 12),
+    _record("80", "2025-01-01", 14, "PM2.5", 18),
+    _record("80", "2025-01-01", 14, "SO2", 18),
+    _record("80", "2025-01-01", 14, "XYZ", 99),  # Unknown pollutant
+    _record("99", "2025-01-01", 14, "O3", "n/a"),  # No valid value
+    {"stationId": "1", "date": "bad", "heure": "1", "pollutant": "O3"},
+]
+
+
+def test_from_records_matches_station_objects():
+    """Test that views serialize exactly like Station objects."""
+    batch = StationBatch.from_records(_RECORDS)
+
+    assert len(batch) == 3
+    assert batch.station_ids == ["3", "80"]
+
+    groups = {}
+    for record in _RECORDS[:6]:
+        key = (record["stationId"], record["heure"])
+        groups.setdefault(key, []).append(record)
+
+    for view, records in zip(batch, groups.values()):
+        station = _build_station(view.station_id, records)
+        assert view.to_dict() == station.to_dict()
+        assert view.to_station() == station
+        assert view.aqi == station.aqi
+        assert view.main_pollutant == station.main_pollutant
+        assert view.pollutants == station.pollutants
+        assert list(view.pollutants) == list(station.pollutants)
+
+
+def test_dominant_tie_goes_to_first_pollutant():
+    """Test that ties keep the first pollutant, as Station does."""
+    view = StationBatch.from_records(_RECORDS)[2]
+
+    assert view.station_id == "80"
+    assert view.main_pollutant == "PM2.5"
+
+
+def test_pollutant_view_values():
+    """Test that pollutant views expose the interned metadata."""
+    pm25 = StationBatch.from_records(_RECORDS)[0].pollutants["PM2.5"]
+
+    assert isinstance(pm25, PollutantView)
+    assert pm25.aqi == 40
+    assert pm25.concentration == pytest.approx(14.0)
+    assert pm25.unit == "µg/m3"
+    assert pm25.to_dict() == {"name": "PM2.5", "concentration": 14.0, "aqi": 40}
+
+
+def test_from_stations_round_trip_keeps_stale():
+    """Test that Station objects survive a round trip through a batch."""
+    station = replace(_build_station("3", _RECORDS[:3]), stale=True)
+
+    view = StationBatch.from_stations([station])[-1]
+
+    assert view.stale is True
+    assert view.to_station() == station
+
+
+def test_from_readings_keeps_latest_per_station():
+    """Test building a batch from history readings."""
+    batch = StationBatch.from_readings(
+        [
+            Reading("80", "2025-01-01", 23, "O3", 10),
+            Reading("80", "2025-01-02", 0, "O3", 12),
+            Reading("80", "2025-01-02", 0, "PM2.5", 30),
+        ]
+    )
+
+    latest = batch.latest("80")
+
+    assert len(batch.for_station("80")) == 2
+    assert (latest.date, latest.hour, latest.aqi) == ("2025-01-02", 0, 30)
+    assert batch.latest("unknown") is None
+
+
+def test_append_skips_unusable_pollutants():
+    """Test that unknown codes and out-of-range AQIs are not stored."""
+    batch = StationBatch()
+
+    assert not batch.append("1", "2025-01-01", 1, [("XYZ", 1), ("O3", 40000)])
+    assert batch.append("1", "2025-01-01", 1, [("O3", 5)])
+    assert len(batch) == 1
+    with pytest.raises(IndexError):
+        batch[1]
+
+
+def test_batch_is_compact():
+    """Test that each pollutant row costs a few bytes of array storage."""
+    batch = StationBatch()
+    for station in range(50):
+        for hour in range(24):
+            batch.append(str(station), "2025-01-01", hour, [("O3", 20), ("PM2.5", 30)])
+
+    assert len(batch) == 1200
+    # Per entry: 4 + 4 + 1 + 1 + 4 bytes; per pollutant row: 1 + 2 bytes
+    assert batch.nbytes == 1200 * 14 + 4 + 2400 * 3
@@ -0,0 +1,197 @@
+"""
+Tests for the internal response cache (cache.py)
+"""
+
+import threading
+
+from montreal_aqi_api._internal.cache import (
+    FIFOPolicy,
+    LRUPolicy,
+    ResponseCache,
+    approximate_size,
+)
+
+
+def _cache(**kwargs):
+    options = {"ttl": 10, "max_entries": 2}
+    options.update(kwargs)
+    return ResponseCache(**options)
+
+
+# ============================================================================
+# Expiration Tests
+# ============================================================================
+
+
+def test_get_returns_fresh_value():
+    """Test that a value is returned before its TTL elapses."""
+    cache = _cache()
+    cache.set("a", [1], now=0)
+
+    assert cache.get("a", now=9) == [1]
+    assert cache.expirations == 0
+
+
+def test_get_drops_expired_value():
+    """Test that an expired value is dropped and counted."""
+    cache = _cache()
+    cache.set("a", [1], now=0)
+
+    assert cache.get("a", now=10) is None
+    assert "a" not in cache
+    assert cache.expirations == 1
+
+
+def test_explicit_expiry_overrides_ttl():
+    """Test that an entry stored with expires_at ignores the default TTL."""
+    cache = _cache()
+    cache.set("a", [1], now=0, expires_at=30)
+
+    assert cache.get("a", now=20) == [1]
+    assert cache.get("a", now=30) is None
+
+
+def test_get_stale_serves_expired_value_within_window():
+    """Test that expired values stay available to get_stale for stale_ttl."""
+    cache = _cache(stale_ttl=5)
+    cache.set("a", [1], now=0)
+
+    assert cache.get("a", now=12) is None
+    assert cache.get_stale("a", now=12) == [1]
+    assert cache.expirations == 0
+
+    assert cache.get_stale("a", now=15) is None
+    assert cache.expirations == 1
+
+
+def test_sweep_drops_every_expired_entry():
+    """Test that sweep removes expired entries without waiting for reads."""
+    cache = _cache(max_entries=10)
+    cache.set("a", [1], now=0)
+    cache.set("b", [2], now=5)
+
+    assert cache.sweep(now=12) == 1
+    assert len(cache) == 1
+    assert cache.expirations == 1
+
+
+def test_set_sweeps_periodically():
+    """Test that writes trigger a sweep once the sweep interval has elapsed."""
+    cache = _cache(max_entries=10, sweep_interval=30)
+    cache.set("a", [1], now=cache._last_sweep)
+    cache.set("b", [2], now=cache._last_sweep + 31)
+
+    assert "a" not in cache
+    assert "b" in cache
+
+
+# ============================================================================
+# Eviction Tests
+# ============================================================================
+
+
+def test_lru_policy_keeps_recently_used_entry():
+    """Test that hits protect an entry from eviction under the LRU policy."""
+    cache = _cache(policy=LRUPolicy())
+    cache.set("a", [1], now=0)
+    cache.set("b", [2], now=0)
+    cache.get("a", now=1)
+    cache.set("c", [3], now=2)
+
+    assert "a" in cache
+    assert "b" not in cache
+    assert cache.evictions == 1
+
+
+def test_fifo_policy_evicts_oldest_insert():
+    """Test that the FIFO policy ignores hits."""
+    cache = _cache(policy=FIFOPolicy())
+    cache.set("a", [1], now=0)
+    cache.set("b", [2], now=0)
+    cache.get("a", now=1)
+    cache.set("c", [3], now=2)
+
+    assert "a" not in cache
+    assert "b" in cache
+
+
+def test_max_bytes_evicts_until_under_budget():
+    """Test that the byte budget is enforced."""
+    cache = _cache(max_entries=10, max_bytes=20, sizeof=lambda value: 8)
+    for key in "abc":
+        cache.set(key, [key], now=0)
+
+    assert len(cache) == 2
+    assert cache.size_bytes == 16
+    assert cache.evictions == 1
+
+
+def test_oversized_value_is_still_cached():
+    """Test that a single value over the byte budget is kept."""
+    cache = _cache(max_bytes=4, sizeof=lambda value: 100)
+    cache.set("a", [1], now=0)
+
+    assert cache.get("a", now=1) == [1]
+
+
+def test_overwrite_updates_size():
+    """Test that replacing a key does not double count its size."""
+    cache = _cache(max_bytes=100, sizeof=len)
+    cache.set("a", [1, 2, 3], now=0)
+    cache.set("a", [1], now=0)
+
+    assert cache.size_bytes == 1
+    assert len(cache) == 1
+
+
+def test_configure_shrinks_cache():
+    """Test that lowering limits evicts entries immediately."""
+    cache = _cache(max_entries=5)
+    for key in "abcd":
+        cache.set(key, [key], now=0)
+
+    cache.configure(max_entries=2, max_bytes=1000, ttl=20, policy=FIFOPolicy())
+
+    assert len(cache) == 2
+    assert cache.ttl == 20
+    assert cache.size_bytes > 0
+    assert isinstance(cache.policy, FIFOPolicy)
+
+
+def test_clear_resets_size():
+    """Test that clear empties the cache."""
+    cache = _cache(max_bytes=100)
+    cache.set("a", [1], now=0)
+    cache.clear()
+
+    assert len(cache) == 0
+    assert cache.size_bytes == 0
+
+
+def test_concurrent_writers_respect_limits():
+    """Test that concurrent writers never leave the cache over its limit."""
+    cache = _cache(max_entries=50)
+
+    def writer(offset):
+        for i in range(200):
+            cache.set(f"{offset}-{i}", [i])
+            cache.get(f"{offset}-{i // 2}")
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(cache) == 50
+    assert cache.evictions == 8 * 200 - 50
+
+
+def test_approximate_size():
+    """Test the JSON-based size estimate."""
+    assert approximate_size([{"a": 1}]) == len('[{"a": 1}]')
+    assert approximate_size({1, 2}) > 0  # Serialized through str()
+
+    circular = []
+    circular.append(circular)
+    assert approximate_size(circular) == 0
@@ -67,6 +67,9 @@ class _FakeStation:
             },
         }
 
+    def to_json_bytes(self) -> bytes:
+        return json.dumps(self.to_dict(), ensure_ascii=False).encode("utf-8")
+
 
 # ============================================================================
 # Helper Function Tests
@@ -379,6 +382,49 @@ def test_cli_empty_station_list(mock_get, monkeypatch, capsys):
     assert data["error"]["code"] == "INVALID_STATION_ID"
 
 
+@patch("montreal_aqi_api.cli.disable_disk_cache")
+@patch("montreal_aqi_api.cli.enable_disk_cache")
+@patch("montreal_aqi_api.cli.get_station_aqi")
+def test_cli_cache_dir(mock_get, mock_enable, mock_disable, monkeypatch, capsys):
+    """Test CLI --cache-dir enables the persistent cache in that directory."""
+    mock_get.return_value = _FakeStation()
+
+    monkeypatch.setattr(
+        sys, "argv", ["montreal-aqi", "--station", "3", "--cache-dir", "/tmp/aqi"]
+    )
+    main()
+
+    mock_enable.assert_called_once_with("/tmp/aqi")
+    mock_disable.assert_called_once_with()
+    assert json.loads(capsys.readouterr().out)["type"] == "station"
+
+
+@patch("montreal_aqi_api.cli.disable_disk_cache")
+@patch("montreal_aqi_api.cli.enable_disk_cache")
+@patch("montreal_aqi_api.cli.get_station_aqi")
+def test_cli_default_cache_dir(mock_get, mock_enable, mock_disable, monkeypatch):
+    """Test CLI uses the default persistent cache location."""
+    mock_get.return_value = _FakeStation()
+
+    monkeypatch.setattr(sys, "argv", ["montreal-aqi", "--station", "3", "--quiet"])
+    main()
+
+    mock_enable.assert_called_once_with(None)
+
+
+@patch("montreal_aqi_api.cli.enable_disk_cache")
+@patch("montreal_aqi_api.cli.get_station_aqi")
+def test_cli_no_cache(mock_get, mock_enable, monkeypatch, capsys):
+    """Test CLI --no-cache skips the persistent cache."""
+    mock_get.return_value = _FakeStation()
+
+    monkeypatch.setattr(sys, "argv", ["montreal-aqi", "--station", "3", "--no-cache"])
+    main()
+
+    mock_enable.assert_not_called()
+    assert json.loads(capsys.readouterr().out)["type"] == "station"
+
+
 @patch("montreal_aqi_api.cli.get_station_aqi")
 def test_cli_api_unreachable(mock_get, monkeypatch, capsys):
     """Test CLI handles APIServerUnreachable exception."""
@@ -425,3 +471,94 @@ def test_cli_montreal_aqi_error(mock_get, monkeypatch, capsys):
 
     payload = json.loads(capsys.readouterr().out)
     assert payload["error"]["code"] == "API_ERROR"
+
+
+# ============================================================================
+# Concurrent stations and NDJSON Tests
+# ============================================================================
+
+
+@patch("montreal_aqi_api.cli.get_station_aqi")
+def test_cli_multiple_stations_fetched_concurrently(mock_get, monkeypatch, capsys):
+    """Test that stations are fetched in parallel, not one after the other."""
+    import threading
+
+    barrier = threading.Barrier(3, timeout=5)
+
+    def get_station(station_id):
+        barrier.wait()  # Only passes if the three fetches run at once
+        station = _FakeStation()
+        station.station_id = station_id
+        return station
+
+    mock_get.side_effect = get_station
+
+    monkeypatch.setattr(sys, "argv", ["montreal-aqi", "--station", "3,5,80"])
+    main()
+
+    data = json.loads(capsys.readouterr().out)
+    assert [s["station_id"] for s in data["stations"]] == ["3", "5", "80"]
+
+
+@patch("montreal_aqi_api.cli.get_station_aqi")
+def test_cli_ndjson_one_line_per_station(mock_get, monkeypatch, capsys):
+    """Test --format ndjson writes a station or NO_DATA payload per line."""
+
+    def get_station(station_id):
+        if station_id == "999":
+            return None
+        station = _FakeStation()
+        station.station_id = station_id
+        return station
+
+    mock_get.side_effect = get_station
+
+    monkeypatch.setattr(
+        sys,
+        "argv",
+        ["montreal-aqi", "--station", "3,999,80", "--format", "ndjson", "--pretty"],
+    )
+    main()
+
+    lines = capsys.readouterr().out.splitlines()
+    payloads = [json.loads(line) for line in lines]
+
+    assert len(lines) == 3
+    stations = sorted(p["station_id"] for p in payloads if p["type"] == "station")
+    errors = [p for p in payloads if p["type"] == "error"]
+    assert stations == ["3", "80"]
+    assert all(p["version"] == "1" for p in payloads)
+    assert errors[0]["error"]["code"] == "NO_DATA"
+    assert "999" in errors[0]["error"]["message"]
+
+
+@patch("montreal_aqi_api.cli.get_station_aqi")
+def test_cli_ndjson_invalid_station_id(mock_get, monkeypatch, capsys):
+    """Test an invalid ID yields a single error line and no fetch."""
+    monkeypatch.setattr(
+        sys, "argv", ["montreal-aqi", "--station", "3,abc", "--format", "ndjson"]
+    )
+    main()
+
+    lines = capsys.readouterr().out.splitlines()
+
+    assert len(lines) == 1
+    assert json.loads(lines[0])["error"]["code"] == "INVALID_STATION_ID"
+    mock_get.assert_not_called()
+
+
+@patch("montreal_aqi_api.cli.get_station_aqi")
+def test_cli_ndjson_api_unreachable(mock_get, monkeypatch, capsys):
+    """Test API errors end the stream with an error line and exit code."""
+    mock_get.side_effect = APIServerUnreachable("API down")
+
+    monkeypatch.setattr(
+        sys, "argv", ["montreal-aqi", "--station", "3,80", "--format", "ndjson"]
+    )
+
+    with pytest.raises(SystemExit) as exc:
+        main()
+
+    assert exc.value.code == 2
+    lines = capsys.readouterr().out.splitlines()
+    assert json.loads(lines[-1])["error"]["code"] == "API_UNREACHABLE"
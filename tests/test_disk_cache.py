@@ -0,0 +1,151 @@
+"""
+Tests for the internal persistent response cache (disk_cache.py)
+"""
+
+import sqlite3
+import threading
+from pathlib import Path
+
+from montreal_aqi_api._internal.disk_cache import (
+    CACHE_FILENAME,
+    DiskCache,
+    default_cache_dir,
+)
+
+
+def test_default_cache_dir_uses_xdg_cache_home(monkeypatch, tmp_path):
+    """Test that XDG_CACHE_HOME is honored."""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    assert default_cache_dir() == tmp_path / "montreal-aqi-api"
+
+
+def test_default_cache_dir_falls_back_to_home(monkeypatch):
+    """Test the ~/.cache fallback when XDG_CACHE_HOME is unset."""
+    monkeypatch.delenv("XDG_CACHE_HOME", raising=False)
+    assert default_cache_dir() == Path.home() / ".cache" / "montreal-aqi-api"
+
+
+def test_enabling_does_not_touch_disk(tmp_path):
+    """Test that the database is only created on first use."""
+    cache = DiskCache(tmp_path / "cache", ttl=10)
+    assert not (tmp_path / "cache").exists()
+
+    cache.set("a", [1], now=0)
+    assert (tmp_path / "cache" / CACHE_FILENAME).exists()
+    cache.close()
+
+
+def test_roundtrip_and_expiry(tmp_path):
+    """Test that entries are returned with their timestamp until they expire."""
+    cache = DiskCache(tmp_path, ttl=10)
+    cache.set("a", [{"id": 1, "nom": "Île"}], now=100)
+
+    assert cache.get("a", now=105) == (100, 110, [{"id": 1, "nom": "Île"}])
+    assert cache.get("a", now=110) is None
+    assert cache.get("missing", now=105) is None
+    cache.close()
+
+
+def test_explicit_expiry_and_stale_window(tmp_path):
+    """Test per-entry expiry and the stale window used for revalidation."""
+    cache = DiskCache(tmp_path, ttl=10, stale_ttl=5)
+    cache.set("a", [1], now=0, expires_at=30)
+
+    assert cache.get("a", now=32) == (0, 30, [1])  # Expired but still stale
+    assert cache.get("a", now=35) is None
+    cache.close()
+
+
+def test_entries_are_shared_between_instances(tmp_path):
+    """Test that a second process (instance) sees the first one's entries."""
+    writer = DiskCache(tmp_path, ttl=10)
+    reader = DiskCache(tmp_path, ttl=10)
+
+    writer.set("a", [1], now=0)
+    assert reader.get("a", now=1) == (0, 10, [1])
+
+    writer.close()
+    reader.close()
+
+
+def test_concurrent_writers(tmp_path):
+    """Test that concurrent writers on separate connections do not fail."""
+    caches = [DiskCache(tmp_path, ttl=60) for _ in range(4)]
+
+    def writer(cache, offset):
+        for i in range(25):
+            cache.set(f"{offset}-{i}", [i])
+
+    threads = [
+        threading.Thread(target=writer, args=(cache, n))
+        for n, cache in enumerate(caches)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert caches[0].get("3-24") is not None
+    for cache in caches:
+        cache.close()
+
+
+def test_expired_rows_are_purged(tmp_path, monkeypatch):
+    """Test that periodic purges delete expired rows."""
+    monkeypatch.setattr(
+        "montreal_aqi_api._internal.disk_cache._PURGE_EVERY_N_WRITES", 2
+    )
+    cache = DiskCache(tmp_path, ttl=10)
+    cache.set("old", [1], now=0)
+    cache.set("new", [2], now=100)
+
+    count = cache._connect().execute("SELECT COUNT(*) FROM responses").fetchone()
+    assert count == (1,)
+    cache.close()
+
+
+def test_corrupt_entry_is_a_miss(tmp_path):
+    """Test that an unreadable body is ignored."""
+    cache = DiskCache(tmp_path, ttl=10)
+    conn = cache._connect()
+    conn.execute(
+        "INSERT INTO responses (key, stored_at, expires_at, body) VALUES (?, ?, ?, ?)",
+        ("a", 0, 10, "{not json"),
+    )
+    conn.commit()
+
+    assert cache.get("a", now=1) is None
+    cache.close()
+
+
+def test_clear(tmp_path):
+    """Test that clear drops every entry."""
+    cache = DiskCache(tmp_path, ttl=10)
+    cache.set("a", [1], now=0)
+    cache.clear()
+
+    assert cache.get("a", now=1) is None
+    cache.close()
+
+
+def test_unusable_location_degrades_to_miss(tmp_path):
+    """Test that I/O errors are swallowed so fetching keeps working."""
+    blocker = tmp_path / "file"
+    blocker.write_text("not a directory")
+    cache = DiskCache(blocker / "cache", ttl=10)
+
+    cache.set("a", [1], now=0)
+    cache.clear()
+    assert cache.get("a", now=1) is None
+
+
+def test_database_errors_degrade_to_miss(tmp_path):
+    """Test that SQLite errors are swallowed."""
+    cache = DiskCache(tmp_path, ttl=10)
+    cache._connect().execute("DROP TABLE responses")
+
+    cache.set("a", [1], now=0)
+    assert cache.get("a", now=1) is None
+    assert isinstance(cache._conn, sqlite3.Connection)
+    cache.close()
+    cache.close()  # Closing twice is harmless
@@ -0,0 +1,161 @@
+"""
+Tests for the historical readings store (history.py)
+"""
+
+import threading
+from datetime import date, datetime
+from unittest.mock import patch
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from montreal_aqi_api.exceptions import APIServerUnreachable
+from montreal_aqi_api.history import HistoryStore, Reading
+
+
+def _record(station, day, hour, pollutant, value):
+    return {
+        "stationId": station,
+        "date": day,
+        "heure": str(hour),
+        "pollutant": pollutant,
+        "valeur": str(value),
+    }
+
+
+_RECORDS = [
+    _record("80", "2025-01-01", 22, "PM25", 30),
+    _record("80", "2025-01-01", 23, "PM25", 35),
+    _record("80", "2025-01-02", 0, "PM", 40),
+    _record("80", "2025-01-02", 0, "O3", 12),
+    _record("3", "2025-01-02", 0, "O3", 8),
+]
+
+
+@pytest.fixture
+def store(tmp_path):
+    with HistoryStore(tmp_path / "history.sqlite3") as history:
+        yield history
+
+
+# ============================================================================
+# Ingestion Tests
+# ============================================================================
+
+
+def test_ingest_deduplicates_on_natural_key(store):
+    """Test that ingesting the same hours twice only stores them once."""
+    assert store.ingest(_RECORDS) == 5
+    assert store.ingest(_RECORDS + [_record("3", "2025-01-02", 1, "O3", 9)]) == 1
+    assert len(store) == 6
+
+
+def test_ingest_skips_invalid_records(store):
+    """Test that incomplete or malformed records are ignored."""
+    invalid = [
+        {"date": "2025-01-01", "heure": "1", "pollutant": "O3", "valeur": "1"},
+        _record("80", "not-a-date", 1, "O3", 1),
+        _record("80", "2025-01-01", "x", "O3", 1),
+        _record("80", "2025-01-01", 1, "O3", ""),
+        {"stationId": "80", "date": "2025-01-01", "heure": "1", "valeur": "1"},
+    ]
+
+    assert store.ingest(invalid) == 0
+
+
+def test_failing_stream_stores_nothing_and_does_not_block(store):
+    """Test a stream failing partway neither blocks readers nor leaves rows."""
+    store.ingest(_RECORDS[:1])
+    counts = []
+
+    def stream():
+        yield _RECORDS[1]
+        # Readers are not blocked while the records are downloaded
+        reader = threading.Thread(target=lambda: counts.append(len(store)))
+        reader.start()
+        reader.join(timeout=5)
+        yield _RECORDS[2]
+        raise APIServerUnreachable("Connection lost while streaming")
+
+    with pytest.raises(APIServerUnreachable):
+        store.ingest(stream())
+
+    assert counts == [1]
+    assert len(store) == 1
+    assert store.ingest(_RECORDS) == 4
+
+
+def test_store_persists_across_instances(tmp_path):
+    """Test that readings survive reopening the database."""
+    path = tmp_path / "history.sqlite3"
+    with HistoryStore(path) as history:
+        history.ingest(_RECORDS)
+
+    with HistoryStore(path) as history:
+        assert len(history) == 5
+        assert history.stations() == ["3", "80"]
+        assert history.latest_date() == "2025-01-02"
+
+
+# ============================================================================
+# Query Tests
+# ============================================================================
+
+
+def test_query_by_pollutant_normalizes_aliases(store):
+    """Test that pollutant aliases are stored and queried normalized."""
+    store.ingest(_RECORDS)
+
+    readings = store.query("80", "PM25")
+
+    assert readings == [
+        Reading("80", "2025-01-01", 22, "PM2.5", 30),
+        Reading("80", "2025-01-01", 23, "PM2.5", 35),
+        Reading("80", "2025-01-02", 0, "PM2.5", 40),
+    ]
+    assert readings[-1].concentration == pytest.approx(14.0)
+
+
+def test_query_hour_range(store):
+    """Test inclusive ranges by date and by local datetime."""
+    store.ingest(_RECORDS)
+
+    by_date = store.query("80", start=date(2025, 1, 2))
+    assert [(r.date, r.hour, r.pollutant) for r in by_date] == [
+        ("2025-01-02", 0, "O3"),
+        ("2025-01-02", 0, "PM2.5"),
+    ]
+
+    by_hour = store.query(
+        "80",
+        "PM2.5",
+        start=datetime(2025, 1, 1, 23),
+        end=datetime(2025, 1, 2, 5, 0, tzinfo=ZoneInfo("UTC")),  # 00h local
+    )
+    assert [(r.date, r.hour) for r in by_hour] == [
+        ("2025-01-01", 23),
+        ("2025-01-02", 0),
+    ]
+
+    assert store.query("80", end=date(2024, 12, 31)) == []
+
+
+# ============================================================================
+# Sync Tests
+# ============================================================================
+
+
+@patch("montreal_aqi_api.history.api.iter_records")
+def test_sync_pulls_everything_then_only_new_dates(mock_iter, store):
+    """Test that syncs request only the dates since the latest stored one."""
+    mock_iter.return_value = iter(_RECORDS)
+
+    assert store.sync() == 5
+    assert mock_iter.call_args.kwargs["filters"] is None
+
+    mock_iter.return_value = iter([_record("80", "2025-01-03", 1, "O3", 5)])
+
+    assert store.sync(today=date(2025, 1, 3)) == 1
+    assert mock_iter.call_args.kwargs["filters"] == {
+        "date": ["2025-01-02", "2025-01-03"]
+    }
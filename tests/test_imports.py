@@ -0,0 +1,69 @@
+"""
+Tests for the lazy import graph (package __init__ and CLI startup)
+"""
+
+import subprocess
+import sys
+import tomllib
+from pathlib import Path
+
+import pytest
+
+import montreal_aqi_api
+
+# Heavy modules that must not be loaded by `import montreal_aqi_api` or the CLI
+_DEFERRED = ("requests", "numpy", "zoneinfo", "montreal_aqi_api.api")
+
+
+@pytest.mark.parametrize("module", ["montreal_aqi_api", "montreal_aqi_api.cli"])
+def test_import_does_not_load_heavy_modules(module):
+    """Test that importing the package or the CLI stays lightweight."""
+    code = (
+        f"import sys, {module}; "
+        f"print(','.join(m for m in {_DEFERRED!r} if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+
+    assert result.stdout.strip() == ""
+
+
+def test_cli_version_does_not_load_api():
+    """Test that --version answers without importing the API client."""
+    code = (
+        "import sys\n"
+        "from montreal_aqi_api.cli import main\n"
+        "sys.argv = ['montreal-aqi', '--version']\n"
+        "try:\n"
+        "    main()\n"
+        "except SystemExit:\n"
+        "    pass\n"
+        "print('requests' in sys.modules)\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+
+    assert result.stdout.split() == [montreal_aqi_api.__version__, "False"]
+
+
+def test_lazy_public_names():
+    """Test that public names resolve on access and are listed by dir()."""
+    from montreal_aqi_api.service import get_station_aqi
+    from montreal_aqi_api.station import Station
+
+    assert montreal_aqi_api.get_station_aqi is get_station_aqi
+    assert montreal_aqi_api.Station is Station
+    assert {"Station", "Pollutant", "list_open_stations"} <= set(dir(montreal_aqi_api))
+    with pytest.raises(AttributeError):
+        _ = montreal_aqi_api.does_not_exist
+
+
+def test_version_matches_pyproject():
+    """Test that the precomputed version is kept in sync with pyproject.toml."""
+    pyproject = Path(__file__).resolve().parents[1] / "pyproject.toml"
+    with pyproject.open("rb") as f:
+        version = tomllib.load(f)["project"]["version"]
+
+    assert montreal_aqi_api.__version__ == version
@@ -65,6 +65,27 @@ def test_station_aqi_payload_contract() -> None:
     validate_contract(payload)
 
 
+def test_stale_station_aqi_payload_contract() -> None:
+    station = Station(
+        station_id="80",
+        date="2025-12-18",
+        hour=16,
+        timestamp="2025-12-18T16:00:00-05:00",
+        pollutants={
+            "PM2.5": Pollutant(
+                name="PM2.5",
+                fullname="PM2.5",
+                unit="µg/m³",
+                aqi=49,
+                concentration=34.3,
+            )
+        },
+        stale=True,
+    )
+
+    validate_contract({"version": "1", "type": "station", **station.to_dict()})
+
+
 def test_cli_output_respects_contract(
     capsys: CaptureFixture[str], monkeypatch: MonkeyPatch
 ) -> None:
@@ -103,3 +124,43 @@ def test_cli_output_respects_contract(
     assert "timestamp" in payload
 
     validate_contract(payload)
+
+
+def _station(station_id: str, concentration: float) -> Station:
+    return Station(
+        station_id=station_id,
+        date="2025-01-01",
+        hour=12,
+        timestamp="2025-01-01T12:00:00-05:00",
+        pollutants={
+            "PM2.5": Pollutant(
+                name="PM2.5",
+                fullname="PM2.5",
+                unit="µg/m³",
+                aqi=42,
+                concentration=concentration,
+            )
+        },
+    )
+
+
+def test_cli_output_bytes_match_stdlib_encoding(
+    capsys: CaptureFixture[str], monkeypatch: MonkeyPatch
+) -> None:
+    """Pre-encoded station payloads are the bytes json.dumps() would write."""
+    stations = {"80": _station("80", 12.3), "3": _station("3", 1e-05)}
+    monkeypatch.setattr(
+        "montreal_aqi_api.cli.get_station_aqi", lambda sid: stations[sid]
+    )
+
+    for argv in (["--station", "80"], ["--station", "80,3"]):
+        for pretty in ([], ["--pretty"]):
+            monkeypatch.setattr("sys.argv", ["montreal-aqi", *argv, *pretty])
+            main()
+            out = capsys.readouterr().out
+
+            payload = json.loads(out)
+            indent = 2 if pretty else None
+            assert out == json.dumps(payload, ensure_ascii=False, indent=indent) + "\n"
+            if payload["type"] == "station":
+                validate_contract(payload)
@@ -0,0 +1,127 @@
+"""
+Tests for the JSON encoding of the contract payloads (_internal/jsonenc.py)
+"""
+
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from montreal_aqi_api import cli
+from montreal_aqi_api._internal import jsonenc
+from montreal_aqi_api.pollutants import Pollutant
+from montreal_aqi_api.station import Station
+
+_PAYLOAD = {
+    "version": "1",
+    "type": "station",
+    "station_id": "80",
+    "timestamp": "2025-01-01T12:00:00-05:00",
+    "pollutants": {"PM2.5": {"name": "PM2.5", "aqi": 42, "concentration": 12.3}},
+    "tags": ["µg/m³", "é \x1f</"],
+    "empty": {},
+    "none": [],
+    "stale": True,
+    "missing": None,
+}
+
+
+@pytest.mark.parametrize("orjson", [False, True])
+@pytest.mark.parametrize("pretty", [False, True])
+@pytest.mark.parametrize(
+    "value", [12.3, 0.0, 1e-05, 1.5e16, float("nan"), float("inf"), 2**70]
+)
+def test_dumps_matches_stdlib(value, pretty, orjson):
+    """Test both backends write the bytes of json.dumps()."""
+    if orjson:
+        pytest.importorskip("orjson")
+    payload = dict(_PAYLOAD, value=value, nested=[{"value": value}])
+
+    with patch.object(jsonenc, "HAS_ORJSON", orjson):
+        encoded = jsonenc.dumps(payload, pretty=pretty)
+
+    indent = 2 if pretty else None
+    assert encoded == json.dumps(payload, ensure_ascii=False, indent=indent).encode()
+
+
+def test_dumps_writes_encoded_payloads_as_is():
+    """Test a pre-encoded payload is not encoded, nor its dict built, again."""
+    build = MagicMock(return_value={"b": 2})
+    payload = jsonenc.Encoded({"a": 1}, build, b'{"a": 1, "b": 2}')
+
+    with patch.object(jsonenc.json, "dumps") as mock_dumps:
+        assert jsonenc.dumps(payload) == b'{"a": 1, "b": 2}'
+    mock_dumps.assert_not_called()
+    # Head members are read without building the rest
+    assert payload.get("a") == 1
+    build.assert_not_called()
+
+    # Pretty output is encoded from the dict, built once
+    assert jsonenc.dumps(payload, pretty=True) == b'{\n  "a": 1,\n  "b": 2\n}'
+    assert dict(payload) == {"a": 1, "b": 2}
+    build.assert_called_once_with()
+
+
+def test_station_payload_does_not_build_dict_when_compact():
+    station = Station(
+        station_id="80",
+        date="2025-01-01",
+        hour=12,
+        timestamp="2025-01-01T12:00:00-05:00",
+        pollutants={
+            "PM2.5": Pollutant(
+                name="PM2.5", fullname="PM2.5", unit="µg/m³", aqi=42, concentration=12.3
+            )
+        },
+    )
+    station.to_json_bytes()
+
+    with patch.object(Station, "to_dict", autospec=True) as mock_to_dict:
+        assert json.loads(jsonenc.dumps(cli._station_payload(station)))["aqi"] == 42
+        assert (
+            json.loads(jsonenc.dumps(cli._stations_aqi_payload([station])))["stations"][
+                0
+            ]["station_id"]
+            == "80"
+        )
+    mock_to_dict.assert_not_called()
+
+
+def test_merge_and_array():
+    head = {"version": "1", "type": "stations"}
+    members = {"stations": [{"a": 1}, {"b": [2]}]}
+
+    encoded = jsonenc.merge(
+        head,
+        b'{"stations": '
+        + jsonenc.array(jsonenc.dumps(item) for item in members["stations"])
+        + b"}",
+    )
+
+    assert encoded == jsonenc.dumps({**head, **members})
+    assert jsonenc.merge({}, b'{"a": 1}') == b'{"a": 1}'
+    assert jsonenc.merge(head, b"{}") == jsonenc.dumps(head)
+    assert jsonenc.array([]) == b"[]"
+
+
+def test_station_to_json_bytes_is_encoded_once():
+    station = Station(
+        station_id="80",
+        date="2025-01-01",
+        hour=12,
+        timestamp="2025-01-01T12:00:00-05:00",
+        pollutants={
+            "O3": Pollutant(
+                name="O3", fullname="ozone", unit="µg/m3", aqi=22, concentration=70.4
+            )
+        },
+        stale=True,
+    )
+
+    with patch.object(jsonenc, "dumps", wraps=jsonenc.dumps) as mock_dumps:
+        first = station.to_json_bytes()
+        second = station.to_json_bytes()
+
+    assert first is second
+    assert mock_dumps.call_count == 1
+    assert first == json.dumps(station.to_dict(), ensure_ascii=False).encode()
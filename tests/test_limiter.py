@@ -0,0 +1,213 @@
+"""
+Tests for the adaptive concurrency limiter (limiter.py)
+"""
+
+import threading
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from montreal_aqi_api import api
+from montreal_aqi_api._internal.limiter import AdaptiveLimiter
+from montreal_aqi_api.exceptions import APIInvalidResponse
+from montreal_aqi_api.transport import TransportError
+
+
+def _limiter(**kwargs):
+    options = {"initial": 4, "min_limit": 1, "max_limit": 8}
+    options.update(kwargs)
+    return AdaptiveLimiter(**options)
+
+
+# ============================================================================
+# AIMD Tests
+# ============================================================================
+
+
+def test_fast_successes_increase_limit_additively():
+    """Test the limit grows by about one per round of fast successes."""
+    limiter = _limiter()
+
+    for _ in range(4):
+        limiter.record(0.1, ok=True)
+
+    assert limiter.limit == 4
+    limiter.record(0.1, ok=True)
+    assert limiter.limit == 5
+
+
+def test_limit_capped_at_max():
+    """Test the limit never grows past max_limit."""
+    limiter = _limiter()
+
+    for _ in range(200):
+        limiter.record(0.1, ok=True)
+
+    assert limiter.limit == 8
+
+
+def test_failure_halves_limit():
+    """Test a failed request halves the limit, down to min_limit."""
+    limiter = _limiter()
+
+    with patch("montreal_aqi_api._internal.limiter.time.monotonic") as mock_time:
+        mock_time.return_value = 100.0
+        limiter.record(0.1, ok=False)
+        assert limiter.limit == 2
+        mock_time.return_value = 101.0
+        limiter.record(0.1, ok=False)
+        mock_time.return_value = 102.0
+        limiter.record(0.1, ok=False)
+
+    assert limiter.limit == 1
+    assert limiter.decreases == 3
+
+
+def test_burst_of_failures_decreases_once_per_round_trip():
+    """Test failures of requests sent in the same round only halve once."""
+    limiter = _limiter(initial=8)
+
+    with patch("montreal_aqi_api._internal.limiter.time.monotonic") as mock_time:
+        mock_time.return_value = 100.0
+        for _ in range(5):
+            limiter.record(0.5, ok=False)
+
+    assert limiter.limit == 4
+    assert limiter.decreases == 1
+
+
+def test_slow_success_decreases_limit():
+    """Test a latency well above the baseline is treated as congestion."""
+    limiter = _limiter()
+    limiter.record(0.2, ok=True)
+    limit = limiter.limit
+
+    limiter.record(0.25, ok=True)  # Within tolerance
+    assert limiter.limit == limit
+
+    limiter.record(1.0, ok=True)
+    assert limiter.limit == limit // 2
+    assert limiter.baseline == pytest.approx(0.2, abs=0.02)
+
+
+def test_small_latency_jitter_is_not_congestion():
+    """Test fast requests are not penalized for a few milliseconds of jitter."""
+    limiter = _limiter()
+    limiter.record(0.002, ok=True)
+    limiter.record(0.01, ok=True)  # 5x the baseline, but within the slack
+
+    assert limiter.decreases == 0
+
+
+def test_configure_clamps_limit():
+    """Test changing the bounds clamps the current limit."""
+    limiter = _limiter()
+
+    limiter.configure(max_limit=2)
+    assert limiter.limit == 2
+
+    limiter.configure(min_limit=6, max_limit=10)
+    assert limiter.limit == 6
+
+
+def test_reset_restores_initial_limit():
+    """Test reset forgets the observed latencies."""
+    limiter = _limiter()
+    limiter.record(0.1, ok=False)
+
+    limiter.reset()
+
+    assert limiter.limit == 4
+    assert limiter.baseline is None
+    assert limiter.decreases == 0
+
+
+# ============================================================================
+# Slot Tests
+# ============================================================================
+
+
+def test_slots_block_at_limit():
+    """Test requests wait for a free slot once the limit is reached."""
+    limiter = _limiter(initial=1)
+    limiter.acquire()
+    acquired = threading.Event()
+
+    def worker():
+        with limiter.slot():
+            acquired.set()
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    assert not acquired.wait(0.05)
+    assert limiter.in_flight == 1
+
+    limiter.release()
+    assert acquired.wait(1)
+    thread.join()
+    assert limiter.in_flight == 0
+
+
+def test_increase_wakes_waiting_requests():
+    """Test a raised limit lets waiting requests through."""
+    limiter = _limiter(initial=1)
+    limiter.acquire()
+    acquired = threading.Event()
+
+    def worker():
+        with limiter.slot():
+            acquired.set()
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    limiter.record(0.1, ok=True)  # 1 -> 2
+
+    assert acquired.wait(1)
+    thread.join()
+    limiter.release()
+
+
+# ============================================================================
+# API client Tests
+# ============================================================================
+
+
+@patch("montreal_aqi_api.api.time.sleep")
+@patch("montreal_aqi_api.api.requests_session.get")
+def test_send_request_feeds_limiter(mock_get, mock_sleep):
+    """Test retryable errors lower the limit and successes raise it."""
+    import requests
+
+    ok = MagicMock(status_code=200)
+    busy = MagicMock(status_code=503)
+    busy.raise_for_status.side_effect = requests.exceptions.HTTPError(response=busy)
+    mock_get.side_effect = [busy, ok]
+
+    api._send_request([], {})
+
+    assert api._concurrency_limiter.decreases == 1
+    assert api._concurrency_limiter.in_flight == 0
+    metrics = api.get_api_metrics()
+    assert metrics["concurrency_decreases"] == 1
+    assert metrics["concurrency_in_flight"] == 0
+
+
+@patch("montreal_aqi_api.api._transport")
+def test_rejected_query_does_not_lower_limit(mock_transport):
+    """Test a 404 counts as an answered request, not congestion."""
+    mock_transport.get.side_effect = TransportError("not found", status=404)
+
+    with pytest.raises(APIInvalidResponse):
+        api._send_request([], {})
+
+    assert api._concurrency_limiter.decreases == 0
+    assert api._concurrency_limiter.in_flight == 0
+
+
+def test_configure_concurrency():
+    """Test configure_concurrency changes the bounds of the shared limiter."""
+    try:
+        api.configure_concurrency(max_limit=2)
+        assert api.get_api_metrics()["concurrency_limit"] == 2
+    finally:
+        api.configure_concurrency(max_limit=api.CONCURRENCY_MAX)
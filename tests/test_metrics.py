@@ -0,0 +1,223 @@
+"""
+Tests for the client metrics and their Prometheus exporter (metrics.py)
+"""
+
+import threading
+from contextlib import contextmanager
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from montreal_aqi_api import api, metrics
+from montreal_aqi_api.metrics import Counter, Histogram, Registry
+from montreal_aqi_api.service import get_station_aqi
+
+
+@pytest.fixture(autouse=True)
+def _reset_metrics():
+    api._api_cache.clear()
+    metrics.reset()
+    yield
+    api._api_cache.clear()
+    metrics.reset()
+
+
+# ============================================================================
+# Counter and Histogram Tests
+# ============================================================================
+
+
+def test_counter_is_thread_safe():
+    """Test that concurrent increments are not lost."""
+    counter = Counter("test_total", "Test", ("kind",))
+
+    def work():
+        for _ in range(1000):
+            counter.inc(kind="a")
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert counter.value(kind="a") == 8000
+    assert counter.total() == 8000
+
+
+def test_counter_rejects_wrong_labels():
+    """Test that labels must match the declared label names."""
+    counter = Counter("test_total", "Test", ("kind",))
+
+    with pytest.raises(ValueError):
+        counter.inc()
+    with pytest.raises(ValueError):
+        counter.inc(other="a")
+
+
+def test_counter_total_filters_labels():
+    """Test that total() sums the series matching the given labels."""
+    counter = Counter("test_total", "Test", ("resource", "result"))
+    counter.inc(resource="a", result="hit")
+    counter.inc(2, resource="b", result="hit")
+    counter.inc(resource="a", result="miss")
+
+    assert counter.total(result="hit") == 3
+    assert counter.total(resource="a") == 2
+    assert counter.total() == 4
+
+
+def test_histogram_buckets_and_sum():
+    """Test that values land in the first bucket bounding them."""
+    histogram = Histogram("test_seconds", "Test", ("stage",), buckets=(0.1, 1.0))
+    histogram.observe(0.05, stage="http")
+    histogram.observe(0.5, stage="http")
+    histogram.observe(5.0, stage="http")
+
+    assert histogram.count(stage="http") == 3
+    assert histogram.sum(stage="http") == pytest.approx(5.55)
+    assert histogram.count(stage="parse") == 0
+
+
+def test_histogram_time():
+    """Test that time() records the duration of the block."""
+    histogram = Histogram("test_seconds", "Test")
+
+    with histogram.time():
+        pass
+
+    assert histogram.count() == 1
+
+
+# ============================================================================
+# Prometheus Exporter Tests
+# ============================================================================
+
+
+def test_render_prometheus_text_format():
+    """Test the exposition format of counters, histograms and gauges."""
+    registry = Registry()
+    counter = registry.counter("test_total", "Things done", ("kind",))
+    histogram = registry.histogram("test_seconds", "Time", ("stage",), buckets=(1.0,))
+    registry.gauge("test_size", "Size", lambda: 3)
+    counter.inc(kind='a"b')
+    histogram.observe(0.5, stage="http")
+    histogram.observe(2, stage="http")
+
+    assert registry.render_prometheus() == (
+        "# HELP test_total Things done\n"
+        "# TYPE test_total counter\n"
+        'test_total{kind="a\\"b"} 1\n'
+        "# HELP test_seconds Time\n"
+        "# TYPE test_seconds histogram\n"
+        'test_seconds_bucket{stage="http",le="1"} 1\n'
+        'test_seconds_bucket{stage="http",le="+Inf"} 2\n'
+        'test_seconds_sum{stage="http"} 2.5\n'
+        'test_seconds_count{stage="http"} 2\n'
+        "# HELP test_size Size\n"
+        "# TYPE test_size gauge\n"
+        "test_size 3\n"
+    )
+
+
+def test_registry_rejects_duplicate_names():
+    """Test that a metric name can only be registered once."""
+    registry = Registry()
+    registry.counter("test_total", "Test")
+
+    with pytest.raises(ValueError):
+        registry.counter("test_total", "Test")
+
+
+# ============================================================================
+# Client Instrumentation Tests
+# ============================================================================
+
+
+def _response(records):
+    response = MagicMock()
+    response.status_code = 200
+    response.headers = {"Content-Length": "42"}
+    response.json.return_value = {"success": True, "result": {"records": records}}
+    return response
+
+
+@patch("montreal_aqi_api.api.requests_session.get")
+def test_fetch_records_stages_and_cache_lookups(mock_get):
+    """Test that a fetch and a station build fill counters and histograms."""
+    mock_get.return_value = _response(
+        [
+            {
+                "stationId": "3",
+                "pollutant": "O3",
+                "valeur": "20",
+                "date": "2025-01-01",
+                "heure": "15",
+            }
+        ]
+    )
+
+    get_station_aqi("3")
+    get_station_aqi("3")
+
+    resource = api.RESID_IQA_PAR_STATION_EN_TEMPS_REEL
+    assert metrics.API_REQUESTS.value(resource=resource) == 1
+    # The first call misses the station's latest records, then the query
+    assert metrics.CACHE_LOOKUPS.value(resource=resource, result="miss") == 2
+    assert metrics.CACHE_LOOKUPS.value(resource=resource, result="hit") == 1
+    assert metrics.RESPONSE_BYTES.value(resource=resource) == 42
+    for stage in ("http", "decode", "parse", "build"):
+        assert metrics.STAGE_SECONDS.count(stage=stage) >= 1
+
+    text = metrics.render_prometheus()
+    assert f'montreal_aqi_api_requests_total{{resource="{resource}"}} 1' in text
+    assert api.get_api_metrics()["response_bytes"] == 42
+
+
+@patch("montreal_aqi_api.api.time.sleep")
+@patch("montreal_aqi_api.api.requests_session.get")
+def test_retries_counted_by_status(mock_get, mock_sleep):
+    """Test that retried attempts are counted with their HTTP status."""
+    import requests
+
+    busy = MagicMock(status_code=503)
+    busy.raise_for_status.side_effect = requests.exceptions.HTTPError(response=busy)
+    mock_get.side_effect = [busy, _response([])]
+
+    api._fetch("test-resource-metrics-retry")
+
+    assert metrics.RETRIES.value(status=503) == 1
+    assert api.get_api_metrics()["retried_requests"] == 1
+
+
+# ============================================================================
+# Tracing Tests
+# ============================================================================
+
+
+class _FakeTracer:
+    def __init__(self):
+        self.spans = []
+
+    @contextmanager
+    def start_as_current_span(self, name, attributes=None):
+        self.spans.append((name, attributes))
+        yield
+
+
+def test_stage_opens_spans_when_tracing_enabled():
+    """Test that stages are traced only while tracing is enabled."""
+    tracer = _FakeTracer()
+
+    with metrics.stage("parse"):
+        pass
+    metrics.enable_tracing(tracer)
+    try:
+        with metrics.stage("decode", resource="r"):
+            pass
+    finally:
+        metrics.disable_tracing()
+
+    assert tracer.spans == [("montreal_aqi.decode", {"resource": "r"})]
+    assert metrics.STAGE_SECONDS.count(stage="parse") == 1
+    assert metrics.STAGE_SECONDS.count(stage="decode") == 1
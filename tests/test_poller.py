@@ -0,0 +1,224 @@
+"""
+Tests for the background poller (poller.py)
+"""
+
+import threading
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from montreal_aqi_api.api import _api_cache
+from montreal_aqi_api.config import TIMEZONE
+from montreal_aqi_api.exceptions import APIServerUnreachable
+from montreal_aqi_api.poller import Poller
+from montreal_aqi_api.service import get_station_aqi
+
+_RECORDS = {
+    "3": [
+        {
+            "stationId": "3",
+            "date": "2025-01-01",
+            "heure": "14",
+            "pollutant": "O3",
+            "valeur": "20",
+        }
+    ],
+    "80": [
+        {
+            "stationId": "80",
+            "date": "2025-01-01",
+            "heure": "15",
+            "pollutant": "PM25",
+            "valeur": "40",
+        }
+    ],
+    "99": [
+        {
+            "stationId": "99",
+            "date": "2025-01-01",
+            "heure": "15",
+            "pollutant": "NO2",
+            "valeur": "5",
+        }
+    ],
+}
+
+_OPEN_STATIONS = [
+    {"station_id": "3", "name": "A", "address": "", "borough": ""},
+    {"station_id": "80", "name": "B", "address": "", "borough": ""},
+]
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    _api_cache.clear()
+    yield
+    _api_cache.clear()
+
+
+@pytest.fixture
+def fake_api():
+    with (
+        patch(
+            "montreal_aqi_api.poller.list_open_stations", return_value=_OPEN_STATIONS
+        ) as list_open,
+        patch(
+            "montreal_aqi_api.poller.api.fetch_all_latest_records",
+            return_value=_RECORDS,
+        ) as fetch_all,
+    ):
+        yield list_open, fetch_all
+
+
+# ============================================================================
+# Refresh Tests
+# ============================================================================
+
+
+def test_refresh_publishes_open_stations(fake_api):
+    """Test that a cycle publishes a Station for every open station."""
+    poller = Poller()
+
+    stations = poller.refresh()
+
+    assert set(stations) == {"3", "80"}
+    assert poller.get_station("80").aqi == 40
+    assert poller.get_station("99") is None
+    assert poller.last_refresh is not None
+
+
+@patch("montreal_aqi_api.api.requests_session.get")
+def test_refresh_primes_station_cache(mock_get, fake_api):
+    """Test that get_station_aqi is then served without any request."""
+    Poller().refresh()
+
+    station = get_station_aqi("80")
+
+    assert station is not None
+    assert station.aqi == 40
+    mock_get.assert_not_called()
+
+
+def test_refresh_without_station_list_keeps_every_station(fake_api):
+    """Test that a failing station list does not empty the snapshot."""
+    list_open, _ = fake_api
+    list_open.side_effect = APIServerUnreachable()
+
+    assert set(Poller().refresh()) == {"3", "80", "99"}
+
+
+def test_failed_refresh_keeps_previous_snapshot(fake_api):
+    """Test that fetch errors propagate and leave the snapshot untouched."""
+    _, fetch_all = fake_api
+    poller = Poller()
+    poller.refresh()
+
+    fetch_all.side_effect = APIServerUnreachable()
+    with pytest.raises(APIServerUnreachable):
+        poller.refresh()
+
+    assert set(poller.stations) == {"3", "80"}
+
+
+# ============================================================================
+# Scheduling Tests
+# ============================================================================
+
+
+def test_next_run_waits_for_next_hourly_publication(fake_api):
+    """Test that the next cycle is aligned after the next hour."""
+    poller = Poller(publish_delay=600, retry_interval=60)
+    poller.refresh()
+
+    newest = datetime(2025, 1, 1, 15, tzinfo=ZoneInfo(TIMEZONE)).timestamp()
+
+    assert poller.next_run(now=newest + 1200) == newest + 3600 + 600
+
+
+def test_next_run_retries_while_data_is_late(fake_api):
+    """Test that late data is polled again after the retry interval."""
+    poller = Poller(publish_delay=600, retry_interval=60)
+    poller.refresh()
+
+    late = datetime(2025, 1, 1, 17, tzinfo=ZoneInfo(TIMEZONE)).timestamp()
+
+    assert poller.next_run(now=late) == late + 60
+
+
+def test_next_run_without_snapshot():
+    """Test that an empty poller retries after the retry interval."""
+    assert Poller(retry_interval=60).next_run(now=1000) == 1060
+
+
+def test_is_current_until_max_age():
+    """Test the snapshot stops being current one cycle after its refresh."""
+    poller = Poller(publish_delay=600, retry_interval=60)
+    assert poller.max_age == 3600 + 600 + 60
+    assert not poller.is_current(now=1000)
+
+    poller._last_refresh = 1000
+    assert poller.is_current(now=1000 + poller.max_age - 1)
+    assert not poller.is_current(now=1000 + poller.max_age)
+
+
+# ============================================================================
+# Thread Tests
+# ============================================================================
+
+
+def test_start_refreshes_in_background(fake_api):
+    """Test that the thread runs a cycle at once and stops cleanly."""
+    updated = threading.Event()
+    on_update = MagicMock(side_effect=lambda stations: updated.set())
+
+    with Poller(on_update=on_update) as poller:
+        assert updated.wait(timeout=5)
+
+    on_update.assert_called_once()
+    assert set(poller.stations) == {"3", "80"}
+
+
+def test_background_errors_do_not_stop_the_poller(fake_api):
+    """Test that a failed cycle is retried after the retry interval."""
+    _, fetch_all = fake_api
+    failed = threading.Event()
+    calls = []
+
+    def flaky(**kwargs):
+        calls.append(1)
+        if len(calls) == 1:
+            failed.set()
+            raise APIServerUnreachable()
+        return _RECORDS
+
+    fetch_all.side_effect = flaky
+    updated = threading.Event()
+
+    with Poller(
+        retry_interval=0.01, on_update=lambda stations: updated.set()
+    ) as poller:
+        assert failed.wait(timeout=5)
+        assert updated.wait(timeout=5)
+
+    assert set(poller.stations) == {"3", "80"}
+
+
+def test_unexpected_errors_are_logged_and_do_not_stop_the_poller(fake_api, caplog):
+    """Test that a bug in a cycle is logged with its traceback, then retried."""
+    updated = threading.Event()
+    calls = []
+
+    def on_update(stations):
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("bug")
+        updated.set()
+
+    with Poller(retry_interval=0.01, on_update=on_update):
+        assert updated.wait(timeout=5)
+
+    (crash,) = [r for r in caplog.records if r.message == "Poller refresh crashed"]
+    assert crash.levelname == "ERROR"
+    assert crash.exc_info[0] is RuntimeError
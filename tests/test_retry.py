@@ -0,0 +1,182 @@
+"""
+Tests for the retry policy and circuit breaker (retry.py)
+"""
+
+from email.utils import formatdate
+from unittest.mock import patch
+
+import pytest
+
+from montreal_aqi_api._internal.retry import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    RetryPolicy,
+    parse_retry_after,
+)
+
+# ============================================================================
+# Retry-After Tests
+# ============================================================================
+
+
+def test_parse_retry_after_seconds():
+    """Test that a delay in seconds is parsed."""
+    assert parse_retry_after("120") == 120.0
+
+
+def test_parse_retry_after_http_date():
+    """Test that an HTTP date is converted to a delay from now."""
+    header = formatdate(1_000_060, usegmt=True)
+
+    assert parse_retry_after(header, now=1_000_000) == 60.0
+    assert parse_retry_after(header, now=2_000_000) == 0.0
+
+
+def test_parse_retry_after_invalid():
+    """Test that missing or malformed headers are ignored."""
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("") is None
+    assert parse_retry_after("soon") is None
+
+
+# ============================================================================
+# RetryPolicy Tests
+# ============================================================================
+
+
+def test_delay_grows_exponentially_up_to_cap():
+    """Test exponential backoff without jitter."""
+    policy = RetryPolicy(base_delay=1.0, max_delay=5.0, jitter=False)
+
+    assert [policy.delay(attempt) for attempt in range(4)] == [1.0, 2.0, 4.0, 5.0]
+
+
+def test_delay_with_jitter_stays_within_bound():
+    """Test that jittered delays never exceed the exponential bound."""
+    policy = RetryPolicy(base_delay=1.0, max_delay=30.0)
+
+    for _ in range(100):
+        assert 0.0 <= policy.delay(2) <= 4.0
+
+
+def test_delay_honors_retry_after_up_to_cap():
+    """Test that Retry-After replaces the computed delay, capped."""
+    policy = RetryPolicy(max_delay=30.0)
+
+    assert policy.delay(0, retry_after=12.0) == 12.0
+    assert policy.delay(0, retry_after=3600.0) == 30.0
+
+
+def test_is_retryable_status():
+    """Test that only transient statuses are retried."""
+    policy = RetryPolicy()
+
+    assert policy.is_retryable_status(None)
+    assert policy.is_retryable_status(503)
+    assert policy.is_retryable_status(429)
+    assert not policy.is_retryable_status(404)
+    assert not policy.is_retryable_status(400)
+
+
+# ============================================================================
+# CircuitBreaker Tests
+# ============================================================================
+
+
+@patch("montreal_aqi_api._internal.retry.time.time")
+def test_circuit_opens_after_consecutive_failures(mock_time):
+    """Test that the circuit opens at the threshold and fails fast."""
+    mock_time.return_value = 0
+    breaker = CircuitBreaker(failure_threshold=2, cooldown=10)
+
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+    assert breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert breaker.opened == 1
+    assert not breaker.allow()
+
+
+@patch("montreal_aqi_api._internal.retry.time.time")
+def test_success_resets_failure_count(mock_time):
+    """Test that failures must be consecutive to open the circuit."""
+    mock_time.return_value = 0
+    breaker = CircuitBreaker(failure_threshold=2, cooldown=10)
+
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+
+    assert breaker.state == CLOSED
+    assert breaker.failures == 1
+
+
+@patch("montreal_aqi_api._internal.retry.time.time")
+def test_half_open_lets_one_probe_through(mock_time):
+    """Test the half-open probe after the cool-down."""
+    mock_time.return_value = 0
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=10)
+    breaker.record_failure()
+
+    mock_time.return_value = 10
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()
+    assert not breaker.allow()
+
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.allow()
+
+
+@patch("montreal_aqi_api._internal.retry.time.time")
+def test_failed_probe_reopens_circuit(mock_time):
+    """Test that a failed probe starts another cool-down."""
+    mock_time.return_value = 0
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=10)
+    breaker.record_failure()
+
+    mock_time.return_value = 10
+    assert breaker.allow()
+    breaker.record_failure()
+
+    assert breaker.state == OPEN
+    assert breaker.opened == 2
+    mock_time.return_value = 19
+    assert not breaker.allow()
+
+
+@patch("montreal_aqi_api._internal.retry.time.time")
+def test_probe_without_outcome_frees_half_open_slot(mock_time):
+    """Test a probe that raises or is cancelled lets the next request probe."""
+    mock_time.return_value = 0
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=10)
+    breaker.record_failure()
+    mock_time.return_value = 10
+
+    for error in (RuntimeError("bug"), KeyboardInterrupt()):
+        with pytest.raises(type(error)), breaker.request() as allowed:
+            assert allowed
+            with breaker.request() as concurrent:
+                assert not concurrent
+            raise error
+        assert breaker.state == HALF_OPEN
+
+    # A probe whose outcome was recorded is left alone
+    with breaker.request():
+        breaker.record_success()
+    assert breaker.state == CLOSED
+
+
+def test_reset_closes_circuit():
+    """Test that reset forgets past failures."""
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=10)
+    breaker.record_failure()
+
+    breaker.reset()
+
+    assert breaker.state == CLOSED
+    assert breaker.failures == 0
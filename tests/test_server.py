@@ -0,0 +1,319 @@
+"""
+Tests for the long-running local server (server.py)
+"""
+
+import http.client
+import json
+import logging
+import socket
+import sys
+import threading
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from montreal_aqi_api.cli import main
+from montreal_aqi_api.exceptions import APIInvalidResponse, APIServerUnreachable
+from montreal_aqi_api.server import AQIRequestHandler, make_server
+from montreal_aqi_api.station import Station
+from montreal_aqi_api.pollutants import Pollutant
+
+
+def _station(station_id, aqi):
+    return Station(
+        station_id=station_id,
+        date="2025-01-01",
+        hour=15,
+        timestamp="2025-01-01T15:00:00-05:00",
+        pollutants={
+            "O3": Pollutant(
+                name="O3",
+                fullname="ozone",
+                unit="µg/m3",
+                aqi=aqi,
+                concentration=aqi * 1.6,
+            )
+        },
+    )
+
+
+@pytest.fixture
+def tcp_server():
+    server = make_server(host="127.0.0.1", port=0)
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+def _get(server, path):
+    host, port = server.server_address[:2]
+    conn = http.client.HTTPConnection(host, port, timeout=5)
+    try:
+        conn.request("GET", path)
+        response = conn.getresponse()
+        return response.status, json.loads(response.read())
+    finally:
+        conn.close()
+
+
+# ============================================================================
+# Routing Tests
+# ============================================================================
+
+
+@patch("montreal_aqi_api.server.list_open_stations")
+def test_stations_list(mock_list, tcp_server):
+    """Test that /stations returns the CLI's stations payload."""
+    mock_list.return_value = [{"station_id": "3", "name": "A"}]
+
+    status, payload = _get(tcp_server, "/stations")
+
+    assert status == 200
+    assert payload == {
+        "version": "1",
+        "type": "stations",
+        "stations": [{"station_id": "3", "name": "A"}],
+    }
+
+
+@patch("montreal_aqi_api.server.get_station_aqi")
+def test_single_and_multiple_stations(mock_get, tcp_server):
+    """Test station payloads, as printed by --station."""
+    mock_get.side_effect = lambda sid: _station(sid, 20)
+
+    status, single = _get(tcp_server, "/stations/3")
+    _, multiple = _get(tcp_server, "/stations/3,80?pretty=1")
+
+    assert status == 200
+    assert single["type"] == "station"
+    assert single["station_id"] == "3"
+    assert single["aqi"] == 20
+    assert multiple["type"] == "stations"
+    assert [s["station_id"] for s in multiple["stations"]] == ["3", "80"]
+
+
+@patch("montreal_aqi_api.server.get_station_aqi")
+def test_station_served_from_poller_snapshot(mock_get, tcp_server):
+    """Test that the poller snapshot is used before the API."""
+    poller = MagicMock()
+    poller.get_station.side_effect = lambda sid: (
+        _station(sid, 55) if sid == "3" else None
+    )
+    poller.last_refresh = 123.0
+    tcp_server.poller = poller
+    mock_get.return_value = None
+
+    _, station = _get(tcp_server, "/stations/3")
+    status, missing = _get(tcp_server, "/stations/80")
+    _, health = _get(tcp_server, "/health")
+
+    assert station["aqi"] == 55
+    assert status == 404
+    assert missing["error"]["code"] == "NO_DATA"
+    mock_get.assert_called_once_with("80")
+    assert health == {"status": "ok", "last_refresh": 123.0}
+
+
+@patch("montreal_aqi_api.server.get_station_aqi")
+def test_outdated_poller_snapshot_falls_back_to_api(mock_get, tcp_server):
+    """Test an outdated snapshot is replaced by the API, or flagged stale."""
+    poller = MagicMock()
+    poller.get_station.side_effect = lambda sid: _station(sid, 55)
+    poller.is_current.return_value = False
+    tcp_server.poller = poller
+
+    mock_get.return_value = _station("3", 60)
+    _, fresh = _get(tcp_server, "/stations/3")
+
+    mock_get.side_effect = APIServerUnreachable("API down")
+    _, stale = _get(tcp_server, "/stations/3")
+    status, unreachable = _get(tcp_server, "/stations/80,3")
+
+    assert fresh["aqi"] == 60
+    assert "stale" not in fresh
+    assert stale["aqi"] == 55
+    assert stale["stale"] is True
+    assert status == 200
+    assert [(s["station_id"], s["stale"]) for s in unreachable["stations"]] == [
+        ("80", True),
+        ("3", True),
+    ]
+
+
+def test_metrics_prometheus_format(tcp_server):
+    """Test that /metrics?format=prometheus returns the text exposition format."""
+    host, port = tcp_server.server_address[:2]
+    conn = http.client.HTTPConnection(host, port, timeout=5)
+    try:
+        conn.request("GET", "/metrics?format=prometheus")
+        response = conn.getresponse()
+        body = response.read().decode("utf-8")
+    finally:
+        conn.close()
+
+    assert response.status == 200
+    assert response.getheader("Content-Type").startswith("text/plain")
+    assert "# TYPE montreal_aqi_stage_seconds histogram" in body
+    assert "montreal_aqi_concurrency_limit " in body
+
+    status, payload = _get(tcp_server, "/metrics")
+    assert status == 200
+    assert "total_api_requests" in payload
+
+
+@pytest.mark.parametrize(
+    ("path", "status", "code"),
+    [
+        ("/stations/abc", 400, "INVALID_STATION_ID"),
+        ("/unknown", 404, "NOT_FOUND"),
+    ],
+)
+def test_client_errors(tcp_server, path, status, code):
+    """Test that invalid requests get error payloads and 4xx statuses."""
+    actual_status, payload = _get(tcp_server, path)
+
+    assert actual_status == status
+    assert payload["version"] == "1"
+    assert payload["type"] == "error"
+    assert payload["error"]["code"] == code
+
+
+@pytest.mark.parametrize(
+    ("exc", "status", "code"),
+    [
+        (APIServerUnreachable("down"), 503, "API_UNREACHABLE"),
+        (APIInvalidResponse("bad"), 502, "API_INVALID_RESPONSE"),
+    ],
+)
+@patch("montreal_aqi_api.server.list_open_stations")
+def test_api_errors(mock_list, tcp_server, exc, status, code):
+    """Test that API failures map to the CLI's error codes."""
+    mock_list.side_effect = exc
+
+    actual_status, payload = _get(tcp_server, "/stations")
+
+    assert actual_status == status
+    assert payload["error"]["code"] == code
+
+
+@patch("montreal_aqi_api.server.get_station_aqi")
+def test_concurrent_clients(mock_get, tcp_server):
+    """Test that slow requests do not block other clients."""
+    release = threading.Event()
+
+    def slow(sid):
+        if sid == "1":
+            release.wait(5)
+        return _station(sid, 10)
+
+    mock_get.side_effect = slow
+    results = {}
+    slow_thread = threading.Thread(
+        target=lambda: results.setdefault("slow", _get(tcp_server, "/stations/1"))
+    )
+    slow_thread.start()
+
+    assert _get(tcp_server, "/stations/2")[0] == 200
+    release.set()
+    slow_thread.join()
+    assert results["slow"][0] == 200
+
+
+def test_tcp_connections_disable_nagle(tcp_server):
+    """Test TCP_NODELAY is set: headers and body are written separately."""
+    nodelay = []
+    setup = AQIRequestHandler.setup
+
+    def recording_setup(handler):
+        setup(handler)
+        nodelay.append(
+            handler.connection.getsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY)
+        )
+
+    with patch.object(AQIRequestHandler, "setup", recording_setup):
+        assert _get(tcp_server, "/health")[0] == 200
+
+    assert nodelay and all(nodelay)
+
+
+def test_unix_socket(tmp_path):
+    """Test serving over a Unix socket, replacing a stale socket file."""
+    path = str(tmp_path / "aqi.sock")
+    stale = socket.socket(socket.AF_UNIX)
+    stale.bind(path)
+    stale.close()
+
+    server = make_server(socket_path=path)
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    try:
+        client = socket.socket(socket.AF_UNIX)
+        client.connect(path)
+        client.sendall(b"GET /health HTTP/1.1\r\nHost: localhost\r\n\r\n")
+        response = http.client.HTTPResponse(client)
+        response.begin()
+        assert response.status == 200
+        assert json.loads(response.read())["status"] == "ok"
+        client.close()
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
+
+    assert not (tmp_path / "aqi.sock").exists()
+
+
+# ============================================================================
+# CLI Tests
+# ============================================================================
+
+
+@patch("montreal_aqi_api.cli.disable_disk_cache")
+@patch("montreal_aqi_api.cli.enable_disk_cache")
+@patch("montreal_aqi_api.server.serve")
+def test_cli_serve(mock_serve, mock_enable, mock_disable, monkeypatch):
+    """Test that `montreal-aqi serve` starts the server with its options."""
+    monkeypatch.setattr(
+        sys,
+        "argv",
+        ["montreal-aqi", "serve", "--socket", "/tmp/aqi.sock", "--no-prefetch"],
+    )
+
+    main()
+
+    mock_serve.assert_called_once_with(
+        host="127.0.0.1", port=8765, socket_path="/tmp/aqi.sock", prefetch=False
+    )
+    mock_enable.assert_called_once_with(None)
+    mock_disable.assert_called_once_with()
+
+
+@pytest.mark.parametrize(
+    "argv, enabled_with",
+    [
+        (["--no-cache", "serve"], None),
+        (["serve", "--no-cache"], None),
+        (["--cache-dir", "/tmp/aqi", "serve"], "/tmp/aqi"),
+        (["serve", "--cache-dir", "/tmp/aqi"], "/tmp/aqi"),
+    ],
+)
+@patch("montreal_aqi_api.cli.logging.basicConfig")
+@patch("montreal_aqi_api.cli.disable_disk_cache")
+@patch("montreal_aqi_api.cli.enable_disk_cache")
+@patch("montreal_aqi_api.server.serve")
+def test_cli_serve_options_before_or_after_subcommand(
+    mock_serve, mock_enable, mock_disable, mock_logging, argv, enabled_with, monkeypatch
+):
+    """Test options given before `serve` are not reset by the subcommand."""
+    monkeypatch.setattr(sys, "argv", ["montreal-aqi", "--debug", *argv])
+
+    main()
+
+    if "--no-cache" in argv:
+        mock_enable.assert_not_called()
+    else:
+        mock_enable.assert_called_once_with(enabled_with)
+    assert mock_logging.call_args.kwargs["level"] == logging.DEBUG
@@ -6,12 +6,17 @@ from unittest.mock import patch
 
 import pytest
 
+from montreal_aqi_api import service
+from montreal_aqi_api.api import StaleRecords
 from montreal_aqi_api.service import (
+    get_all_stations_aqi,
     get_station_aqi,
+    get_stations_aqi,
+    iter_stations_aqi,
     list_open_stations,
     _parse_station_metadata,
 )
-from montreal_aqi_api.exceptions import APIServerUnreachable
+from montreal_aqi_api.exceptions import APIInvalidResponse, APIServerUnreachable
 
 
 # ============================================================================
@@ -130,6 +135,20 @@ def test_get_station_aqi_success(mock_fetch):
     assert station.hour == 15
 
 
+@patch("montreal_aqi_api.service.fetch_latest_station_records")
+def test_get_station_aqi_flags_stale_records(mock_fetch):
+    """Test that a Station built from stale records is flagged as stale."""
+    mock_fetch.return_value = StaleRecords(
+        [{"pollutant": "PM25", "valeur": "40", "heure": "15", "date": "2025-01-01"}]
+    )
+
+    station = get_station_aqi("3")
+
+    assert station is not None
+    assert station.stale is True
+    assert station.to_dict()["stale"] is True
+
+
 @patch("montreal_aqi_api.service.fetch_latest_station_records")
 def test_get_station_aqi_no_records(mock_fetch):
     """Test get_station_aqi returns None when no records found."""
@@ -250,6 +269,230 @@ def test_get_station_aqi_api_unreachable(mock_fetch):
         get_station_aqi("3")
 
 
+# ============================================================================
+# Tests for get_stations_aqi
+# ============================================================================
+
+
+def _fake_station_records(station_id):
+    if station_id == "999":
+        raise APIServerUnreachable("API down")
+    return [
+        {"pollutant": "O3", "valeur": station_id, "heure": "15", "date": "2025-01-01"}
+    ]
+
+
+@patch("montreal_aqi_api.service.fetch_latest_station_records")
+def test_get_stations_aqi_parallel_keeps_order_and_maps_failures(mock_fetch):
+    """Test per-station queries return results in input order, None on failure."""
+    mock_fetch.side_effect = _fake_station_records
+
+    stations = get_stations_aqi(["3", "999", "80"], max_workers=2)
+
+    assert [s.station_id if s else None for s in stations] == ["3", None, "80"]
+    assert stations[2].aqi == 80
+
+
+@patch("montreal_aqi_api.service.fetch_latest_station_records")
+@patch("montreal_aqi_api.service.fetch_latest_records_for_stations")
+def test_get_stations_aqi_single_request(mock_batch, mock_single):
+    """Test the subset is fetched at once and mapped back in input order."""
+    mock_batch.return_value = {
+        "80": _fake_station_records("80"),
+        "3": _fake_station_records("3"),
+    }
+
+    stations = get_stations_aqi(["3", "999", "80"])
+
+    mock_batch.assert_called_once_with(["3", "999", "80"])
+    mock_single.assert_not_called()
+    assert [s.station_id if s else None for s in stations] == ["3", None, "80"]
+
+
+@patch("montreal_aqi_api.service.fetch_latest_station_records")
+@patch("montreal_aqi_api.service.fetch_latest_records_for_stations")
+def test_get_stations_aqi_falls_back_when_filter_rejected(mock_batch, mock_single):
+    """Test stations are queried one by one if the list filter is rejected."""
+    mock_batch.side_effect = APIInvalidResponse("HTTP 409")
+    mock_single.side_effect = _fake_station_records
+
+    stations = get_stations_aqi(["3", "80"])
+
+    assert [s.station_id for s in stations] == ["3", "80"]
+
+
+@patch("montreal_aqi_api.service.fetch_latest_records_for_stations")
+def test_get_stations_aqi_api_unreachable(mock_batch):
+    """Test an unreachable API maps every station to None."""
+    mock_batch.side_effect = APIServerUnreachable("API down")
+
+    assert get_stations_aqi(["3", "80"]) == [None, None]
+
+
+@patch("montreal_aqi_api.service.fetch_latest_station_records")
+def test_iter_stations_aqi_reuses_shared_executor(mock_fetch):
+    """Test fan-outs share one long-lived pool instead of creating one."""
+    mock_fetch.side_effect = _fake_station_records
+
+    list(iter_stations_aqi(["3", "5"]))
+    executor = service._get_executor()
+    list(iter_stations_aqi(["80", "5"]))
+
+    assert service._get_executor() is executor
+
+
+@patch("montreal_aqi_api.service.get_max_concurrency")
+def test_shared_executor_follows_max_concurrency(mock_max):
+    """Test the pool is sized from, and recreated with, the limiter's max."""
+    mock_max.return_value = 3
+    executor = service._get_executor()
+    assert executor._max_workers == 3
+    assert service._get_executor() is executor
+
+    mock_max.return_value = 5
+    resized = service._get_executor()
+    assert resized is not executor
+    assert resized._max_workers == 5
+    assert executor._shutdown
+
+
+@patch("montreal_aqi_api.service.fetch_latest_station_records")
+def test_iter_stations_aqi_yields_as_completed(mock_fetch):
+    """Test iter_stations_aqi yields each station with its input index."""
+    mock_fetch.side_effect = _fake_station_records
+
+    results = dict(iter_stations_aqi(["3", "80", "5"]))
+
+    assert sorted(results) == [0, 1, 2]
+    assert results[1].station_id == "80"
+
+
+def test_iter_stations_aqi_raises_api_errors():
+    """Test API errors propagate instead of being mapped to None."""
+    with pytest.raises(APIServerUnreachable):
+        list(iter_stations_aqi(["3", "999"], get_station=_failing_get_station))
+
+
+_STATION_RECORDS = [
+    {"pollutant": "PM25", "valeur": "40", "heure": "15", "date": "2025-01-01"},
+    {"pollutant": "O3", "valeur": "22", "heure": "15", "date": "2025-01-01"},
+]
+
+
+@patch("montreal_aqi_api.service.parse_pollutants", wraps=service.parse_pollutants)
+@patch("montreal_aqi_api.service.fetch_latest_station_records")
+def test_get_station_aqi_reuses_station_while_records_unchanged(mock_fetch, mock_parse):
+    """Test a station is parsed once per data hour and shared by callers."""
+    mock_fetch.side_effect = lambda _: [dict(r) for r in _STATION_RECORDS]
+
+    first = get_station_aqi("3")
+    second = get_station_aqi("3")
+
+    assert first is not None
+    assert second is first
+    assert mock_parse.call_count == 1
+
+
+@patch("montreal_aqi_api.service.fetch_latest_station_records")
+def test_get_station_aqi_rebuilds_station_when_records_change(mock_fetch):
+    """Test a correction published for the same hour replaces the Station."""
+    mock_fetch.return_value = _STATION_RECORDS
+    first = get_station_aqi("3")
+
+    mock_fetch.return_value = [dict(_STATION_RECORDS[0], valeur="55")]
+    corrected = get_station_aqi("3")
+
+    assert first is not None and corrected is not None
+    assert corrected is not first
+    assert corrected.aqi == 55
+    assert first.aqi == 40
+
+
+@patch("montreal_aqi_api.service.fetch_latest_station_records")
+def test_get_station_aqi_does_not_cache_stale_stations(mock_fetch):
+    """Test stations built from stale records are not served once refreshed."""
+    mock_fetch.return_value = StaleRecords(_STATION_RECORDS)
+    stale = get_station_aqi("3")
+
+    mock_fetch.return_value = _STATION_RECORDS
+    fresh = get_station_aqi("3")
+
+    assert stale is not None and stale.stale is True
+    assert fresh is not None and fresh.stale is False
+
+
+@patch("montreal_aqi_api.service.fetch_latest_station_records")
+def test_build_stations_reuses_cached_stations(mock_fetch):
+    """Test a bulk build (e.g. a poller cycle) shares the cached Stations."""
+    mock_fetch.return_value = _STATION_RECORDS
+    station = get_station_aqi("3")
+
+    stations = service._build_stations(
+        {
+            "80": [
+                {
+                    "pollutant": "NO2",
+                    "valeur": "12",
+                    "heure": "15",
+                    "date": "2025-01-01",
+                }
+            ],
+            "3": [dict(r) for r in _STATION_RECORDS],
+        }
+    )
+
+    assert list(stations) == ["80", "3"]
+    assert stations["3"] is station
+    assert get_station_aqi("3") is station
+
+
+def _failing_get_station(station_id):
+    raise APIServerUnreachable("API down")
+
+
+# ============================================================================
+# Tests for get_all_stations_aqi
+# ============================================================================
+
+
+@pytest.mark.parametrize("batch_parsing", [False, True])
+@patch("montreal_aqi_api.service.fetch_all_latest_records")
+def test_get_all_stations_aqi(mock_fetch, batch_parsing):
+    """Test get_all_stations_aqi builds one Station per station in the bulk pull."""
+    if batch_parsing:
+        pytest.importorskip("numpy")
+    mock_fetch.return_value = {
+        "3": [
+            {"pollutant": "PM25", "valeur": "40", "heure": "15", "date": "2025-01-01"},
+            {"pollutant": "O3", "valeur": "22", "heure": "15", "date": "2025-01-01"},
+        ],
+        "80": [
+            {"pollutant": "NO2", "valeur": "12", "heure": "14", "date": "2025-01-01"},
+        ],
+        "99": [
+            {"heure": "15", "date": "2025-01-01"},  # No valid pollutant data
+        ],
+    }
+
+    with patch("montreal_aqi_api.service.vectorized.HAS_NUMPY", batch_parsing):
+        stations = get_all_stations_aqi()
+
+    assert mock_fetch.call_count == 1
+    assert set(stations) == {"3", "80"}
+    assert stations["3"].aqi == 40
+    assert stations["3"].main_pollutant == "PM2.5"
+    assert stations["80"].hour == 14
+
+
+@patch("montreal_aqi_api.service.fetch_all_latest_records")
+def test_get_all_stations_aqi_api_unreachable(mock_fetch):
+    """Test that APIServerUnreachable exception is propagated from the bulk pull."""
+    mock_fetch.side_effect = APIServerUnreachable("API down")
+
+    with pytest.raises(APIServerUnreachable):
+        get_all_stations_aqi()
+
+
 # ============================================================================
 # Tests for list_open_stations
 # ============================================================================
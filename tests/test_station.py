@@ -1,3 +1,7 @@
+from dataclasses import FrozenInstanceError, replace
+
+import pytest
+
 from montreal_aqi_api.pollutants import Pollutant
 from montreal_aqi_api.station import Station
 
@@ -85,3 +89,32 @@ def test_station_to_dict_includes_published_at_iso_datetime():
     assert isinstance(data["pollutants"]["PM2.5"], dict)
     assert data["pollutants"]["PM2.5"]["aqi"] == 43
     assert data["pollutants"]["O3"]["aqi"] == 18
+
+
+def test_station_to_dict_flags_stale_data_only():
+    station = Station(
+        station_id="3",
+        date="2025-01-01",
+        hour=14,
+        timestamp="2025-01-01T14:00:00-05:00",
+        pollutants={"O3": _pollutant("O3", 62)},
+    )
+
+    assert "stale" not in station.to_dict()
+
+    station = replace(station, stale=True)
+
+    assert station.to_dict()["stale"] is True
+
+
+def test_station_is_immutable():
+    station = Station(
+        station_id="3",
+        date="2025-01-01",
+        hour=14,
+        timestamp="2025-01-01T14:00:00-05:00",
+        pollutants={"O3": _pollutant("O3", 62)},
+    )
+
+    with pytest.raises(FrozenInstanceError):
+        station.hour = 15  # type: ignore[misc]
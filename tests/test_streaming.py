@@ -0,0 +1,94 @@
+"""
+Tests for the incremental datastore response parser (streaming.py)
+"""
+
+import json
+
+import pytest
+
+from montreal_aqi_api._internal.streaming import RecordStream, StreamFormatError
+
+_RECORDS = [
+    {"stationId": "3", "heure": "14", "valeur": "20", "nom": "Décarie"},
+    {"stationId": "80", "heure": "15", "valeur": None, "note": 'a "quoted" ]'},
+    {"stationId": "99", "heure": "15", "valeur": 12.5, "tags": ["x", {"y": []}]},
+]
+
+_BODY = json.dumps(
+    {
+        "help": "https://example.org/records?x=[1]",
+        "success": True,
+        "result": {
+            "fields": [{"id": "records", "type": "text"}],
+            "records": _RECORDS,
+            "_links": {"start": "/records"},
+            "total": 3,
+        },
+    },
+    ensure_ascii=False,
+)
+
+
+def _chunks(body, size):
+    data = body.encode("utf-8")
+    return [data[i : i + size] for i in range(0, len(data), size)]
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64, 100_000])
+def test_records_are_decoded_across_chunk_boundaries(size):
+    """Test that any chunking (even splitting UTF-8 sequences) decodes the same."""
+    stream = RecordStream(_chunks(_BODY, size))
+
+    assert list(stream) == _RECORDS
+    assert stream.payload["result"]["total"] == 3
+    assert stream.payload["result"]["records"] == []
+    assert stream.payload["success"] is True
+
+
+def test_str_chunks_are_accepted():
+    """Test that already-decoded chunks work too."""
+    assert list(RecordStream([_BODY[:50], _BODY[50:]])) == _RECORDS
+
+
+def test_records_are_yielded_before_the_body_ends():
+    """Test that the first record is available from the first chunks."""
+    body = _chunks(_BODY, 16)
+    consumed = []
+
+    def chunks():
+        for chunk in body:
+            consumed.append(chunk)
+            yield chunk
+
+    first = next(iter(RecordStream(chunks())))
+
+    assert first == _RECORDS[0]
+    assert len(consumed) < len(body)
+
+
+def test_empty_records():
+    """Test an empty records array."""
+    stream = RecordStream([b'{"result": {"records": [ ], "total": 0}}'])
+
+    assert list(stream) == []
+    assert stream.payload == {"result": {"records": [], "total": 0}}
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        "",
+        "<html>not json</html>",
+        '{"result": {"records": "nope"}}',
+        '{"result": {"records": [{"a": 1}, 2]}}',
+        '{"result": {"records": [{"a": 1} {"b": 2}]}}',
+        '{"result": {"records": [{"a": 1},, {"b": 2}]}}',
+        '{"result": {"records": [{"a": 1}',
+        '{"result": {"records": [{"a": 1}]}',
+        '{"records": [{"a": 1}]}',
+    ],
+)
+def test_malformed_bodies_raise(body):
+    """Test that malformed or unexpected bodies raise StreamFormatError."""
+    with pytest.raises(StreamFormatError):
+        list(RecordStream([body.encode()]))
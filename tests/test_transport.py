@@ -0,0 +1,240 @@
+"""
+Tests for the HTTP transports (transport.py)
+"""
+
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+
+from montreal_aqi_api import api
+from montreal_aqi_api.exceptions import APIInvalidResponse
+from montreal_aqi_api.transport import RequestsTransport, TransportError
+
+
+class _StubResponse:
+    def __init__(self, payload, status_code=200, headers=None):
+        self._payload = payload
+        self.status_code = status_code
+        self.headers = headers or {}
+
+    def json(self):
+        return self._payload
+
+    def iter_content(self, chunk_size):
+        yield json.dumps(self._payload).encode()
+
+    def close(self):
+        pass
+
+
+class _StubTransport:
+    """Transport answering from a list of responses or errors."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = []
+
+    def get(self, url, *, params, headers, timeout, stream=False):
+        self.calls.append(dict(params))
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def stub_transport():
+    api._api_cache.clear()
+    yield
+    api.configure_transport()
+    api._api_cache.clear()
+
+
+def _http_error(status, headers=None):
+    response = requests.Response()
+    response.status_code = status
+    response.headers.update(headers or {})
+    return requests.exceptions.HTTPError(f"{status} Error", response=response)
+
+
+# ============================================================================
+# RequestsTransport Tests
+# ============================================================================
+
+
+def test_requests_transport_maps_http_errors():
+    """Test that HTTP error statuses keep their status and headers."""
+    session = MagicMock()
+    session.get.return_value.raise_for_status.side_effect = _http_error(
+        503, {"Retry-After": "5"}
+    )
+
+    with pytest.raises(TransportError) as excinfo:
+        RequestsTransport(session).get("http://x", params=[], headers={}, timeout=1)
+
+    assert excinfo.value.status == 503
+    assert excinfo.value.headers["Retry-After"] == "5"
+
+
+def test_requests_transport_maps_connection_errors():
+    """Test that errors without a response have no status."""
+    session = MagicMock()
+    session.get.side_effect = requests.exceptions.ConnectionError("refused")
+
+    with pytest.raises(TransportError) as excinfo:
+        RequestsTransport(session).get("http://x", params=[], headers={}, timeout=1)
+
+    assert excinfo.value.status is None
+    assert excinfo.value.headers == {}
+
+
+def test_requests_transport_maps_streaming_errors():
+    """Test that a connection dropped while streaming raises TransportError."""
+    session = MagicMock()
+
+    def chunks(chunk_size):
+        yield b'{"result": '
+        raise requests.exceptions.ChunkedEncodingError("dropped")
+
+    session.get.return_value.iter_content.side_effect = chunks
+    response = RequestsTransport(session).get(
+        "http://x", params=[], headers={}, timeout=1, stream=True
+    )
+
+    with pytest.raises(TransportError):
+        list(response.iter_content(1024))
+
+
+def test_requests_transport_pool_and_headers():
+    """Test pool sizing, keep-alive and compression options."""
+    transport = RequestsTransport(pool_size=50, keep_alive=False, compression=False)
+
+    adapter = transport.session.get_adapter("https://donnees.montreal.ca")
+    assert adapter._pool_maxsize == 50
+    assert transport.session.headers["Connection"] == "close"
+    assert transport.session.headers["Accept-Encoding"] == "identity"
+    transport.close()
+
+
+def test_configure_transport_pool_size():
+    """Test that the default transport's pool can be resized."""
+    try:
+        api.configure_transport(pool_size=64)
+        adapter = api.requests_session.get_adapter("https://donnees.montreal.ca")
+        assert adapter._pool_maxsize == 64
+        with pytest.raises(ValueError):
+            api.configure_transport(_StubTransport(), pool_size=2)
+    finally:
+        api.configure_transport()
+
+
+def test_configure_transport_closes_replaced_transport():
+    """Test a rejected call keeps the transport, and a swap closes the old one."""
+    first = MagicMock()
+    try:
+        api.configure_transport(first)
+
+        with pytest.raises(ValueError):
+            api.configure_transport(_StubTransport(), pool_size=2)
+        assert api._transport is first
+        first.close.assert_not_called()
+
+        api.configure_transport(first)
+        first.close.assert_not_called()
+    finally:
+        api.configure_transport()
+    first.close.assert_called_once_with()
+
+
+# ============================================================================
+# Client Tests with an injected transport
+# ============================================================================
+
+
+@patch("montreal_aqi_api.api.time.sleep")
+def test_fetch_uses_injected_transport(mock_sleep, stub_transport):
+    """Test that queries go through the configured transport, with retries."""
+    transport = _StubTransport(
+        TransportError("unavailable", status=503),
+        _StubResponse({"result": {"records": [{"id": 1}]}}),
+    )
+    api.configure_transport(transport)
+
+    assert api._fetch("test-transport") == [{"id": 1}]
+    assert len(transport.calls) == 2
+    assert transport.calls[0]["resource_id"] == "test-transport"
+    mock_sleep.assert_called_once()
+
+
+def test_fetch_rejected_status_not_retried(stub_transport):
+    """Test that client errors from a transport are not retried."""
+    transport = _StubTransport(TransportError("not found", status=404))
+    api.configure_transport(transport)
+
+    with pytest.raises(APIInvalidResponse):
+        api._fetch("test-transport-404")
+    assert len(transport.calls) == 1
+
+
+# ============================================================================
+# HttpxTransport Tests
+# ============================================================================
+
+
+def test_httpx_transport():
+    """Test the httpx transport against a mocked httpx client."""
+    httpx = pytest.importorskip("httpx")
+    from montreal_aqi_api.transport import HttpxTransport
+
+    seen = []
+
+    def handler(request):
+        seen.append(request)
+        if request.url.params.get("resource_id") == "down":
+            return httpx.Response(503, headers={"Retry-After": "3"})
+        return httpx.Response(200, json={"result": {"records": [{"id": 1}]}})
+
+    transport = HttpxTransport(
+        client=httpx.Client(transport=httpx.MockTransport(handler))
+    )
+    params = [("resource_id", "ok"), ("fields", "a"), ("fields", "b")]
+
+    response = transport.get("http://x/search", params=params, headers={}, timeout=1)
+    streamed = transport.get(
+        "http://x/search", params=params, headers={}, timeout=1, stream=True
+    )
+
+    assert response.status_code == 200
+    assert response.json() == {"result": {"records": [{"id": 1}]}}
+    assert json.loads(b"".join(streamed.iter_content(4))) == response.json()
+    assert seen[0].url.params.get_list("fields") == ["a", "b"]
+
+    with pytest.raises(TransportError) as excinfo:
+        transport.get(
+            "http://x/search", params=[("resource_id", "down")], headers={}, timeout=1
+        )
+    assert excinfo.value.status == 503
+    assert excinfo.value.headers["Retry-After"] == "3"
+    transport.close()
+
+
+def test_httpx_transport_connection_error():
+    """Test that httpx connection errors have no status."""
+    httpx = pytest.importorskip("httpx")
+    from montreal_aqi_api.transport import HttpxTransport
+
+    def handler(request):
+        raise httpx.ConnectError("refused")
+
+    transport = HttpxTransport(
+        client=httpx.Client(transport=httpx.MockTransport(handler))
+    )
+
+    with pytest.raises(TransportError) as excinfo:
+        transport.get("http://x", params=[], headers={}, timeout=1)
+    assert excinfo.value.status is None
@@ -0,0 +1,92 @@
+"""
+Tests for the vectorized batch parser (_internal/vectorized.py)
+"""
+
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from montreal_aqi_api._internal.parsing import parse_pollutants
+from montreal_aqi_api._internal.vectorized import parse_pollutants_batch
+from montreal_aqi_api.station import Station
+
+
+def _station(station_id, pollutants):
+    return Station(
+        station_id=station_id,
+        date="2025-01-01",
+        hour=12,
+        timestamp="2025-01-01T12:00:00-05:00",
+        pollutants=pollutants,
+    )
+
+
+def test_batch_matches_scalar_parser():
+    """Test that the vectorized path gives exactly the scalar results."""
+    rng = random.Random(42)
+    codes = ["PM", "PM25", "PM2.5", "O3", "NO2", "CO", "SO2", "XYZ", None]
+    values = ["-3", "0", "12", "12.9", "55", "55", "abc", "", None, 7, 8.5, "nan"]
+
+    records_by_station = {
+        str(station): [
+            {"pollutant": rng.choice(codes), "valeur": rng.choice(values)}
+            for _ in range(rng.randint(0, 12))
+        ]
+        for station in range(60)
+    }
+    records_by_station["polluant"] = [
+        {"polluant": "O3", "indice": "20", "pollutant": "NO2", "valeur": "90"}
+    ]
+
+    table = parse_pollutants_batch(records_by_station)
+
+    for station_id, records in records_by_station.items():
+        expected = parse_pollutants(records)
+        actual = table.pollutants(station_id)
+
+        assert actual == expected
+        assert list(actual) == list(expected)
+        if expected:
+            scalar = _station(station_id, expected)
+            assert table.station_aqi(station_id) == scalar.aqi
+            assert table.main_pollutant(station_id) == scalar.main_pollutant
+            assert station_id in table
+        else:
+            assert table.station_aqi(station_id) is None
+            assert table.main_pollutant(station_id) is None
+            assert station_id not in table
+
+
+def test_dominant_tie_goes_to_first_seen():
+    """Test that ties on the max AQI keep the first pollutant seen."""
+    table = parse_pollutants_batch(
+        {
+            "1": [
+                {"pollutant": "NO2", "valeur": "10"},
+                {"pollutant": "O3", "valeur": "40"},
+                {"pollutant": "PM", "valeur": "40"},
+            ],
+            "2": [
+                {"pollutant": "PM", "valeur": "40"},
+                {"pollutant": "O3", "valeur": "40"},
+            ],
+        }
+    )
+
+    assert table.main_pollutant("1") == "O3"
+    assert table.main_pollutant("2") == "PM2.5"
+    assert table.codes == ["NO2", "O3", "PM2.5"]
+    assert table.present.tolist() == [[True, True, True], [False, True, True]]
+
+
+def test_empty_and_unknown_batches():
+    """Test batches without any usable record."""
+    assert len(parse_pollutants_batch({})) == 0
+
+    table = parse_pollutants_batch({"1": [{"pollutant": "XYZ", "valeur": "3"}]})
+
+    assert table.pollutants("1") == {}
+    assert table.pollutants("unknown") == {}
+    assert table.main_pollutant("1") is None